@@ -0,0 +1,297 @@
+from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
+from EventManager.EventSubscriptionController import EventSubscriptionController
+from ConfigValidator.Config.Models.RunTableModel import RunTableModel
+from ConfigValidator.Config.Models.FactorModel import FactorModel
+from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
+from ConfigValidator.Config.Models.OperationType import OperationType
+from ProgressManager.Output.OutputProcedure import OutputProcedure
+
+import time
+from typing import Dict, List
+from pathlib import Path
+
+from Plugins.Profilers.FindObject2dProfiler import FindObject2dProfiler
+from Plugins.Profilers.MoveBaseProfiler import MoveBaseProfiler
+from Plugins.Profilers.PowerProfiler import PowerProfiler
+from Plugins.Profilers.ResourceProfiler import ResourceProfiler
+from Plugins.Profilers.WiresharkProfiler import WiresharkProfiler
+from Plugins.Profilers.ProfilerLifecycleManager import ProfilerLifecycleManager
+from Plugins.Readiness.ReadinessProbe import ReadinessProbe
+from ExperimentOrchestrator.Experiment.AdaptiveCooldown import CooldownSignal
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+paramiko = lazy_import('paramiko')
+
+
+class OffloadingExperimentConfig:
+    """The robot, profilers, run table columns and hooks shared by the offloading experiments.
+    A config (RobotRunnerConfig) inherits from it and declares its name, factors (create_factors),
+    mission (mission_launch_command) and, if needed, the setup_factors and launch files it varies."""
+
+    # =================================================USER SPECIFIC NECESSARY CONFIG=================================================
+    # Name for this experiment
+    name:                       str             = "offloading_experiment"
+    # Required ROS version for this experiment to be ran with
+    # NOTE: (e.g. ROS2 foxy or eloquent)
+    # NOTE: version: 2
+    # NOTE: distro: "foxy"
+    required_ros_version:       int             = 1
+    required_ros_distro:        str             = "melodic"
+    # Experiment operation types
+    operation_type:             OperationType   = OperationType.SEMI
+    # Run settings
+    time_between_runs_in_ms:    int             = 60000
+    # Path to store results at
+    # NOTE: Path does not need to exist, will be appended with 'name' as specified in this config and created on runtime
+    results_output_path:        Path             = Path("~/experiment_results")
+    # =================================================USER SPECIFIC UNNECESSARY CONFIG===============================================
+
+    # NOTE: Required configurations for experiment replication
+    robot_ip_addr:              str              = "192.168.1.7"
+    robot_username:             str              = "ubuntu"
+    robot_hostname:             str              = "ubuntu"
+    pc_ip_address:              str              = "192.168.1.9"
+    network_interface_used:     str              = "wlp0s20f3"
+    ssh_host_key_dir:           str              = "/home/milica/.ssh/known_hosts"
+    # The robot, camera and profilers are brought up once and stay up across runs (see setup_environment),
+    # only again after a failed run or after a battery swap, or when a factor in setup_factors changes the launch file
+    setup_factors:              List[str]        = []
+    # Time the robot, camera and profilers get to report they are ready in setup_environment
+    start_up_timeout_in_s:      int              = 180
+    # Only ask for a battery swap when the voltage left is not predicted to cover the next run (battery_charge_reader, set in __init__)
+    battery_min_charge:         float            = 11.0
+    # Between runs, wait until the CPU of the robot settled back to its idle baseline (cooldown_signals, set in __init__),
+    # at most time_between_runs_in_ms
+    cooldown_min_in_ms:         int              = 10000
+    cooldown_settling_window_in_ms: int          = 10000
+    # Record the idle power before every run (the resource profiler is busy with the cooldown), see __idle_power_mw
+    idle_baseline_enabled:      bool             = True
+
+    # Profilers used in the experiment
+    find_object_2d_profiler:    FindObject2dProfiler
+    move_base_profiler:         MoveBaseProfiler
+    network_profiler:           WiresharkProfiler
+    resource_profiler:          ResourceProfiler
+    power_profiler:             PowerProfiler
+    profiler_manager:           ProfilerLifecycleManager
+
+    def __init__(self):
+        """Executes immediately after program start, on config load"""
+        self.find_object_2d_profiler = FindObject2dProfiler(ip_addr=self.robot_ip_addr, username=self.robot_username, hostname=self.robot_hostname)
+        self.move_base_profiler = MoveBaseProfiler(ip_addr=self.robot_ip_addr, username=self.robot_username, hostname=self.robot_hostname)
+        self.network_profiler = WiresharkProfiler(network_interface=self.network_interface_used, pc_ip_address=self.pc_ip_address, robot_ip_adress=self.robot_ip_addr)
+        self.resource_profiler = ResourceProfiler()
+        self.power_profiler = PowerProfiler()
+        self.cooldown_signals = [CooldownSignal.profiler('robot_cpu', self.resource_profiler, band=5)]
+        self.battery_charge_reader = CooldownSignal.ros_topic_reader('/battery_state/voltage')
+
+        # Power, resource and network profilers are started and stopped simultaneously
+        self.profiler_manager = ProfilerLifecycleManager()
+        self.profiler_manager.register_profiler('power', self.power_profiler)
+        self.profiler_manager.register_profiler('resource', self.resource_profiler)
+        self.profiler_manager.register_profiler('network', self.network_profiler)
+
+        self.startup_client = None
+        self.mission_start_timestamp = None
+        self.mission_end_timestamp = None
+
+        EventSubscriptionController.subscribe_to_multiple_events([
+            (RobotRunnerEvents.SETUP_ENVIRONMENT,   self.setup_environment),
+            (RobotRunnerEvents.START_MEASUREMENT,   self.start_measurement),
+            (RobotRunnerEvents.LAUNCH_MISSION,      self.launch_mission),
+            (RobotRunnerEvents.STOP_MEASUREMENT,    self.stop_measurement),
+            (RobotRunnerEvents.TEARDOWN_ENVIRONMENT, self.teardown_environment),
+            (RobotRunnerEvents.CONTINUE,            self.signal_continue),
+            (RobotRunnerEvents.POPULATE_RUN_DATA,   self.populate_run_data)
+        ])
+
+        print("Custom config loaded")
+
+    # ===== Declared by every offloading experiment =====
+
+    def create_factors(self) -> List[FactorModel]:
+        """The factors of the run table of this experiment"""
+        raise NotImplementedError
+
+    def mission_launch_command(self, variation: Dict) -> str:
+        """The command launching the mission of a run on the robot"""
+        raise NotImplementedError
+
+    def print_variation(self, variation: Dict) -> None:
+        for factor in self.create_factors():
+            OutputProcedure.console_log_bold(f"{factor.get_factor_name()} = {variation[factor.get_factor_name()]}")
+
+    def start_up_launch_file(self, variation: Dict) -> str:
+        """The launch file bringing up the robot, camera and profilers, a factor selecting it belongs in setup_factors"""
+        return "start_up.launch"
+
+    def is_obj_recognition_offloaded(self, variation: Dict) -> bool:
+        return True
+
+    def is_navigation_offloaded(self, variation: Dict) -> bool:
+        return False
+
+    # ===== Shared hooks =====
+
+    def create_run_table(self) -> List[Dict]:
+        """Create and return the run_table here. A run_table is a List (rows) of tuples (columns),
+        representing each run robot-runner must perform"""
+        run_table = RunTableModel(
+            factors = self.create_factors(),
+            data_columns=[
+                'mission_execution_s',
+                'avg_extraction_time_ms',
+                'avg_detection_time_ms',
+                'avg_detection_result_delay_ms',
+                'recognition_ratio',
+                'avg_goal_sending_delay_ms',
+                'avg_goal_processing_s',
+                'avg_nav_result_delay_ms',
+                'num_of_packets',
+                'size_of_packets',
+                'avg_cpu_util',
+                'avg_memory_util',
+                'energy_J'
+            ],
+            num_of_repetitions=10,
+            randomize_order=True
+        )
+        run_table.create_experiment_run_table()
+        return run_table.get_experiment_run_table()
+
+    def setup_environment(self, context: RobotRunnerContext) -> None:
+        """Bring up the robot, camera and profilers, they stay up for the following runs (see setup_factors).
+        Called in the experiment process, before the first run that needs them."""
+
+        # SSH to the robot
+        self.startup_client = paramiko.SSHClient()
+        self.startup_client.load_host_keys(self.ssh_host_key_dir)
+        self.startup_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.startup_client.connect(self.robot_ip_addr, username=self.robot_username)
+
+        # Launch camera and profilers
+        stdin, stdout, ststderr = self.startup_client.exec_command(f"roslaunch sherlock {self.start_up_launch_file(context.run_variation)} frequency:=50", get_pty = True)
+
+        # Wait for the robot, camera and profilers to be ready, a bring-up that does not get ready is stopped again
+        try:
+            ReadinessProbe({
+                'turtlebot':            "Calibration End",
+                'camera':               "Video capture started",
+                'resource_profiler':    "Resource profiler ready",
+                'power_profiler':       "Initialised connection with INA219 board",
+                'obj_recognition':      "SherlockObjRecognition results subscriber started"
+            }, timeout_in_s=self.start_up_timeout_in_s).wait(stdout)
+        except Exception:
+            self.startup_client.close()
+            raise
+
+        # Outputs and inputs to this session are not needed anymore
+        stdin.close()
+        stdout.close()
+        ststderr.close()
+
+    def start_measurement(self, context: RobotRunnerContext) -> None:
+        """Perform any activity required for starting measurements."""
+
+        self.profiler_manager.start_all()
+
+    def launch_mission(self, context: RobotRunnerContext) -> None:
+        """Perform any activity interacting with the robotic
+        system in question (simulated or real-life) here."""
+        variation = context.run_variation
+        self.print_variation(variation)
+
+        # SSH to the robot
+        mission_client = paramiko.SSHClient()
+        mission_client.load_host_keys(self.ssh_host_key_dir)
+        mission_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        mission_client.connect(self.robot_ip_addr, username=self.robot_username)
+
+        # Launch the mission
+        self.mission_start_timestamp = time.time()
+        stdin, stdout, stderr = mission_client.exec_command(self.mission_launch_command(variation), get_pty = True)
+
+        # Print all otputs of the mission as it progresses
+        for line in iter(stdout.readline, ""):
+            print(line, end = "")
+
+        # Wait for the mission to end
+        exit_status = stdout.channel.recv_exit_status()
+        self.mission_end_timestamp = time.time()
+        print(70*"=")
+
+        if exit_status == 0:
+            print('Mission ended successfully!')
+        else:
+            print('ERROR DURING MISSION!!!')
+
+        # Close SSH session
+        stdin.close()
+        stdout.close()
+        stderr.close()
+        mission_client.close()
+
+    def stop_measurement(self, context: RobotRunnerContext) -> None:
+        """Perform any activity here required for stopping measurements."""
+
+        run_dir = context.run_dir.absolute()
+
+        self.profiler_manager.stop_all(run_dir)
+
+        # Pass the information if find_object_2d and move_base are offloaded or not to the log readers
+        self.find_object_2d_profiler.process_log_files(run_dir, self.is_obj_recognition_offloaded(context.run_variation))
+        self.move_base_profiler.process_log_files(run_dir, self.is_navigation_offloaded(context.run_variation))
+
+    def teardown_environment(self, context: RobotRunnerContext) -> None:
+        """Stop the robot, camera and profilers brought up by setup_environment."""
+
+        # Stop the SSH connection, which stops the launched nodes
+        self.startup_client.close()
+        print(70*"=")
+        print("Robot, camera and profilers stopped")
+
+    def signal_continue(self) -> None:
+        input('\n\n>> Press ENTER when you change the battery. <<\n\n')
+
+    def populate_run_data(self, context: RobotRunnerContext) -> tuple:
+        """Return the run data as a row for the output manager represented as a tuple"""
+        variation = context.run_variation
+        run_dir = context.run_dir.absolute()
+        # Interval in which all profilers were measuring
+        common_interval = self.profiler_manager.get_common_interval()
+
+        # Total execution time of the mission
+        variation['mission_execution_s'] = self.mission_end_timestamp - self.mission_start_timestamp
+
+        # Get averaged results from find_object_2d profiler
+        avg_extraction_time, avg_detection_time, avg_detection_result_delay, recognition_ratio = self.find_object_2d_profiler.get_average_results(run_dir)
+        variation['avg_extraction_time_ms'] = avg_extraction_time
+        variation['avg_detection_time_ms'] = avg_detection_time
+        variation['avg_detection_result_delay_ms'] = avg_detection_result_delay
+        variation['recognition_ratio'] = recognition_ratio
+
+        # Get averaged results from move_base profiler
+        avg_goal_sending_delay_ms, avg_goal_processing_s, avg_nav_result_delay_ms = self.move_base_profiler.get_average_results(run_dir)
+        variation['avg_goal_sending_delay_ms'] = avg_goal_sending_delay_ms
+        variation['avg_goal_processing_s'] = avg_goal_processing_s
+        variation['avg_nav_result_delay_ms'] = avg_nav_result_delay_ms
+
+        # Get averaged results from wireshark profiler
+        num_of_packets, size_of_packets = self.network_profiler.get_total_results(run_dir, common_interval)
+        variation['num_of_packets'] = num_of_packets
+        variation['size_of_packets'] = size_of_packets
+
+        # Get averaged results form resource profiler
+        avg_cpu_util, avg_memory_util = self.resource_profiler.get_average_results(run_dir, common_interval, self.profiler_manager.get_window('resource'))
+        variation['avg_cpu_util'] = avg_cpu_util
+        variation['avg_memory_util'] = avg_memory_util
+
+        # Get averaged results from power profiler
+        energy = self.power_profiler.get_total_results(run_dir, common_interval, self.profiler_manager.get_window('power'))
+        variation['energy_J'] = energy
+
+        return variation
+
+    # ===============================================DO NOT ALTER BELOW THIS LINE=================================================
+    # NOTE: Do not alter these values
+    experiment_path:            Path             = None
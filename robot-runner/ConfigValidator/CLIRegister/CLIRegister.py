@@ -1,11 +1,13 @@
 import os
 import uuid
 import inspect
-from typing import List
+import importlib
+from typing import Dict, List, Union
 from shutil import copyfile
-from tabulate import tabulate
 
-from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
+# NOTE: Heavy modules (tabulate, the config stack, ...) are imported inside the commands that need them,
+# NOTE: so every command only pays for its own imports at start-up. The commands that run or probe experiments
+# NOTE: live in their own module and are registered as 'module:ClassName', they are only imported when used
 from ExperimentOrchestrator.Misc.BashHeaders import BashHeaders
 from ExperimentOrchestrator.Misc.PathValidation import is_path_exists_or_creatable_portable
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
@@ -47,6 +49,8 @@ class ConfigCreate:
         if not is_path_exists_or_creatable_portable(destination):
             raise InvalidUserSpecifiedPathError(destination)
         
+        from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
+
         module = RobotRunnerConfig
         src = inspect.getmodule(module).__file__
         dest_folder = destination
@@ -87,12 +91,14 @@ class Help:
 
     @staticmethod
     def description_long() -> str:
+        from tabulate import tabulate
+
         print(BashHeaders.BOLD + "--- ROBOT_RUNNER HELP ---" + BashHeaders.ENDC)
         print("\n%-*s  %s" % (10, "Usage:", "python robot-runner/ <path_to_config.py>"))
         print("%-*s  %s" % (10, "Utility:", "python robot-runner/ <command>"))
 
         print("\nAvailable commands:\n")
-        print(tabulate([(k, v.description_params()) for k, v in CLIRegister.register.items()], ["Command", "Parameters"]))
+        print(tabulate([(k, CLIRegister.get_command(k).description_params()) for k in CLIRegister.register], ["Command", "Parameters"]))
 
         print("\nHelp can be called for each command:")
         print(BashHeaders.WARNING + "example: " + BashHeaders.ENDC + "python robot-runner/ prepare help")
@@ -101,17 +107,83 @@ class Help:
     def execute(args=None) -> None:
         Help.description_long()
 
+class BenchmarkImports:
+    @staticmethod
+    def description_params() -> str:
+        return "[path_to_config.py] [path_to_history_file]"
+
+    @staticmethod
+    def description_short() -> str:
+        return "Measures the import time of the CLI, config loading and run process spawn (python -X importtime)"
+
+    @staticmethod
+    def description_long() -> str:
+        output.console_log_bold("Measures the start-up import time of: the CLI (help command), loading a config file (the template if none is given) " +
+                                "and spawning a run process. The results are appended to a history file (default: benchmarks/import_times.jsonl " +
+                                "next to robot-runner) and compared against the previous entry.")
+
+    @staticmethod
+    def execute(args=None) -> None:
+        from datetime import datetime
+        from tabulate import tabulate
+        from ExperimentOrchestrator.Misc import ImportBenchmark
+
+        config_path = args[2] if args and len(args) > 2 else os.path.join(ImportBenchmark.ROBOT_RUNNER_DIR, 'ConfigValidator/Config/RobotRunnerConfig.py')
+        history_file = args[3] if args and len(args) > 3 else os.path.join(ImportBenchmark.ROBOT_RUNNER_DIR, '../benchmarks/import_times.jsonl')
+        if not os.path.isfile(config_path):
+            raise InvalidUserSpecifiedPathError(config_path)
+
+        history = ImportBenchmark.read_history(history_file)
+        previous = history[-1]['results'] if history else {}
+
+        results = {}
+        for name, interpreter_args in ImportBenchmark.benchmark_scenarios(os.path.abspath(config_path)).items():
+            output.console_log_WARNING(f"Benchmarking {name}...")
+            results[name] = ImportBenchmark.measure_import_time(interpreter_args)
+
+        rows = []
+        for name, result in results.items():
+            delta = result['import_ms'] - previous[name]['import_ms'] if name in previous else None
+            rows.append((name, result['import_ms'], f"{delta:+.1f}" if delta is not None else "-", result['wall_ms'],
+                         ', '.join(f"{module} ({ms}ms)" for module, ms in list(result['slowest_imports'].items())[:3])))
+        print(tabulate(rows, ["Scenario", "Import [ms]", "Delta [ms]", "Wall [ms]", "Slowest top-level imports"]))
+
+        ImportBenchmark.append_to_history(history_file, {
+            'timestamp':    datetime.now().isoformat(),
+            'revision':     ImportBenchmark.git_revision(),
+            'config':       os.path.abspath(config_path),
+            'results':      results
+        })
+        output.console_log_OK(f"Results appended to {os.path.abspath(history_file)}")
+
 class CLIRegister:
-    register = {
-        "config-create":    ConfigCreate,
-        "prepare":          Prepare,
-        "help":             Help
+    register: Dict[str, Union[type, str]] = {
+        "run":                  "ConfigValidator.CLIRegister.ExperimentCommands:RunCommand",
+        "config-create":        ConfigCreate,
+        "prepare":              Prepare,
+        "benchmark-imports":    BenchmarkImports,
+        "preflight":            "ConfigValidator.CLIRegister.ExperimentCommands:PreflightCommand",
+        "queue":                "ConfigValidator.CLIRegister.ExperimentCommands:QueueCommand",
+        "help":                 Help
     }
 
+    @staticmethod
+    def get_command(name: str) -> type:
+        command = CLIRegister.register.get(name)
+        if command is None:
+            raise CommandNotRecognisedError
+
+        # A lazily registered command is imported on first use and replaces its entry
+        if isinstance(command, str):
+            module_name, class_name = command.split(':')
+            command = getattr(importlib.import_module(module_name), class_name)
+            CLIRegister.register[name] = command
+        return command
+
     @staticmethod 
     def parse_command(args: List):
         try:
-            command_class = CLIRegister.register.get(args[1])
+            command_class = CLIRegister.get_command(args[1])
         except:
             raise CommandNotRecognisedError
 
@@ -0,0 +1,111 @@
+import os
+
+# NOTE: These commands are registered lazily in CLIRegister, this module is only imported when one of them is used.
+# NOTE: The help command lists them too, so the validation and orchestration stack is still imported inside execute
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ConfigValidator.CustomErrors.CLIErrors import *
+
+def load_config(config_path: str):
+    """Load a config file as a module and return its RobotRunnerConfig instance"""
+    from ConfigValidator.Config.ConfigLoader import load_config_module
+
+    return load_config_module(config_path).RobotRunnerConfig()                          # Instantiate config from injected file
+
+class RunCommand:
+    @staticmethod
+    def description_params() -> str:
+        return "<path_to_config.py>"
+
+    @staticmethod
+    def description_short() -> str:
+        return "Validates a config and runs its experiment (the same as: python robot-runner/ <path_to_config.py>)"
+
+    @staticmethod
+    def description_long() -> str:
+        output.console_log_bold("Run validates the config, preflights its targets (unless preflight_enabled is False) and performs " +
+                                "every run of its run table. An experiment started again continues with the runs that are not done.")
+
+    @staticmethod
+    def execute(args=None) -> None:
+        from ConfigValidator.Config.Validation.ConfigValidator import ConfigValidator
+        from ExperimentOrchestrator.Experiment.ExperimentController import ExperimentController
+
+        if args is None or len(args) != 3 or not args[2].endswith('.py'):
+            raise CommandNotRecognisedError
+
+        config = load_config(args[2])
+        ConfigValidator.validate_config(config)                     # Validate config as a valid RobotRunnerConfig
+        ExperimentController(config).do_experiment()                # Instantiate controller with config and start experiment
+
+class PreflightCommand:
+    @staticmethod
+    def description_params() -> str:
+        return "<path_to_config.py>"
+
+    @staticmethod
+    def description_short() -> str:
+        return "Validates a config and concurrently probes its targets (SSH, ROS services, capture permissions, disk space)"
+
+    @staticmethod
+    def description_long() -> str:
+        output.console_log_bold("Preflight validates the config and probes every target it declares, without running any experiment hook:\n" +
+                                "SSH login and the remote ROS log dir (robot_ip_addr, robot_username and profilers with an ip_addr), " +
+                                "the ROS services required by the profilers, capture permissions on network_interface_used " +
+                                "and free disk space in results_output_path.")
+
+    @staticmethod
+    def execute(args=None) -> None:
+        from ConfigValidator.Config.Validation.ConfigValidator import ConfigValidator
+        from ConfigValidator.Config.Validation.Preflight import Preflight
+        from ConfigValidator.CustomErrors.ConfigErrors import ConfigInvalidError, ConfigPreflightFailedError
+
+        if args is None or len(args) != 3 or not os.path.isfile(args[2]):
+            raise CommandNotRecognisedError
+
+        config = load_config(args[2])
+        config_error = None
+        try:
+            ConfigValidator.validate_config(config)
+        except ConfigInvalidError as e:     # Still probe the targets, so all problems are reported at once
+            config_error = e
+
+        results = Preflight.run(config)
+        Preflight.print_report(results)
+        if config_error is not None:
+            raise config_error
+        if Preflight.has_failures(results):
+            raise ConfigPreflightFailedError
+        output.console_log_OK("Preflight completed, all targets are ready")
+
+class QueueCommand:
+    @staticmethod
+    def description_params() -> str:
+        return "[--interleave] <path_to_config.py> ..."
+
+    @staticmethod
+    def description_short() -> str:
+        return "Validates all configs up front and runs their experiments back to back, unattended"
+
+    @staticmethod
+    def description_long() -> str:
+        output.console_log_bold("Queue validates and preflights every config before the first experiment starts, then runs the experiments " +
+                                "one after the other in the same robot-runner process. With --interleave, the experiments take turns " +
+                                "one run at a time on the same targets. The state of the queue is kept in experiment_queue.json " +
+                                "in the results_output_path of the first config: starting the same queue again skips the completed " +
+                                "experiments and restarts the interrupted one where it stopped.")
+
+    @staticmethod
+    def execute(args=None) -> None:
+        from ExperimentOrchestrator.Experiment.ExperimentQueue import ExperimentQueue
+
+        if args is None:
+            raise CommandNotRecognisedError
+
+        interleave = '--interleave' in args[2:]
+        config_paths = [arg for arg in args[2:] if arg != '--interleave']
+        if not config_paths or not all(path.endswith('.py') and os.path.isfile(path) for path in config_paths):
+            raise CommandNotRecognisedError
+
+        queue = ExperimentQueue(config_paths, interleave)
+        queue.validate()
+        queue.run()
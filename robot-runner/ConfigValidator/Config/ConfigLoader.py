@@ -0,0 +1,24 @@
+import os
+import sys
+from importlib import util
+
+from ConfigValidator.CustomErrors.ConfigErrors import ConfigInvalidClassNameError
+
+def load_config_module(config_path: str):
+    '''
+    Load a config file as a module and return it, it must define a RobotRunnerConfig class.
+    Like a script run with python, the directory of the config is importable, so configs
+    can share code through modules next to them (e.g. a common base class).
+    '''
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    if config_dir not in sys.path:
+        sys.path.append(config_dir)     # Appended, a config directory never shadows robot-runner's own modules
+
+    module_name = os.path.basename(config_path).replace('.py', '')
+    spec = util.spec_from_file_location(module_name, config_path)
+    config_file = util.module_from_spec(spec)
+    sys.modules[module_name] = config_file
+    spec.loader.exec_module(config_file)
+    if not hasattr(config_file, 'RobotRunnerConfig'):
+        raise ConfigInvalidClassNameError
+    return config_file
@@ -1,10 +1,18 @@
+import hashlib
 import itertools
+import json
 import random
 from typing import Dict, List, Tuple
 from ConfigValidator.CustomErrors.ConfigErrors import ConfigRunTableCreationError
 from ProgressManager.RunTable.Models.RunProgress import RunProgress
 from ConfigValidator.Config.Models.FactorModel import FactorModel
 
+class RunTable(list):
+    """The rows of a run table, remembering the RunTableModel (design) they were created from"""
+    def __init__(self, model: 'RunTableModel', rows: List[Dict] = ()):
+        super().__init__(rows)
+        self.model = model
+
 class RunTableModel:
     __factors:       List[FactorModel] = None
     __experiment_run_table:          List[Dict]  = None
@@ -12,15 +20,25 @@ class RunTableModel:
     __data_columns:                  List[str]   = None
     __num_of_repetitions:            int         = 1
     __randomize_order:              bool        = False
+    __seed:                          int         = None
+    __factor_change_costs:           Dict[str, float] = None
+    __block_per_repetition:          bool        = False
 
     def __init__(self, factors: List[FactorModel], exclude_variations: List[Dict] = None, data_columns: List[str] = None, 
-    num_of_repetitions: int = 1, randomize_order: bool = False):
+    num_of_repetitions: int = 1, randomize_order: bool = False, seed: int = None,
+    factor_change_costs: Dict[str, float] = None, block_per_repetition: bool = False):
         self.__factors = factors
-        self.__experiment_run_table = []
+        self.__experiment_run_table = RunTable(self)
         self.__exclude_variations = exclude_variations
         self.__data_columns = data_columns
         self.__num_of_repetitions = num_of_repetitions
         self.__randomize_order = randomize_order
+        self.__seed = seed      # Makes a randomized order reproducible
+        # Restricted randomization: the seconds it costs to change the treatment of a factor between two runs (e.g. a relaunch).
+        # Runs are grouped by the treatments of the costly factors (most expensive outermost), the order of the groups and
+        # the runs within them is randomized. block_per_repetition keeps every repetition as a separate (randomized) block.
+        self.__factor_change_costs = {factor: cost for factor, cost in (factor_change_costs or {}).items() if cost > 0}
+        self.__block_per_repetition = block_per_repetition
 
     def get_factors(self) -> List[FactorModel]:
         return self.__factors
@@ -28,6 +46,65 @@ class RunTableModel:
     def get_experiment_run_table(self) -> List[Dict]:
         return self.__experiment_run_table
 
+    def get_factor_change_costs(self) -> Dict[str, float]:
+        return self.__factor_change_costs
+
+    def get_column_names(self) -> List[str]:
+        column_names = ['__run_id', '__done']   # Needed for robot-runner functionality
+        for factor in self.__factors:
+            column_names.append(factor.get_factor_name())
+
+        if self.__num_of_repetitions > 1:
+            column_names.append('repetition')
+
+        if self.__data_columns:
+            for data_column in self.__data_columns:
+                column_names.append(data_column)
+
+        return column_names
+
+    def get_design(self) -> Dict:
+        """Everything that determines the rows of the run table, available without creating them"""
+        design = {
+            'factors':              [[factor.get_factor_name(), [str(treatment) for treatment in factor.get_treatments()]]
+                                     for factor in self.__factors],
+            'exclude_variations':   sorted(sorted(str(treatment) for treatment in exclusion) for exclusion in (self.__exclude_variations or [])),
+            'num_of_repetitions':   self.__num_of_repetitions,
+            'randomize_order':      self.__randomize_order,
+            'seed':                 self.__seed,
+            'columns':              self.get_column_names()
+        }
+        if self.__factor_change_costs:
+            design['factor_change_costs'] = self.__factor_change_costs
+            design['block_per_repetition'] = self.__block_per_repetition
+        return design
+
+    def get_fingerprint(self) -> str:
+        return hashlib.sha256(json.dumps(self.get_design(), sort_keys=True).encode()).hexdigest()
+
+    def get_transition_cost_estimate(self) -> Dict[str, float]:
+        """The summed factor change costs of the run order, compared to the expected costs of a uniformly randomized order"""
+        factor_names = [factor.get_factor_name() for factor in self.__factors]
+        costs = {factor: cost for factor, cost in self.__factor_change_costs.items() if factor in factor_names}
+        rows = self.__experiment_run_table
+
+        ordered_cost = sum(cost for previous, current in zip(rows, rows[1:])
+                           for factor, cost in costs.items() if previous[factor] != current[factor])
+
+        # In a uniformly random order, two consecutive runs differ in a factor with the probability that two random runs do
+        uniform_cost, total = 0.0, len(rows)
+        for factor, cost in costs.items():
+            if total < 2:
+                break
+            counts = {}
+            for row in rows:
+                counts[row[factor]] = counts.get(row[factor], 0) + 1
+            same = sum(count * (count - 1) for count in counts.values()) / (total * (total - 1))
+            uniform_cost += cost * (total - 1) * (1 - same)
+
+        return {'transition_cost_in_s': ordered_cost, 'uniform_transition_cost_in_s': uniform_cost,
+                'saved_in_s': uniform_cost - ordered_cost}
+
     def create_experiment_run_table(self) -> None:
         def __filter_list(filter_list: List[Tuple]):
             if self.__exclude_variations is None:
@@ -46,16 +123,7 @@ class RunTableModel:
         filtered_list = __filter_list(combinations_list)
         filtered_list = self.add_repetitions(filtered_list)
 
-        column_names = ['__run_id', '__done']   # Needed for robot-runner functionality
-        for factor in self.__factors:
-            column_names.append(factor.get_factor_name())
-
-        if self.__num_of_repetitions > 1:
-            column_names.append('repetition')
-
-        if self.__data_columns:
-            for data_column in self.__data_columns:
-                column_names.append(data_column)
+        column_names = self.get_column_names()
 
         for i in range(0, len(filtered_list)):
             row_list = list(filtered_list[i])
@@ -72,6 +140,10 @@ class RunTableModel:
         if self.__num_of_repetitions < 1:
             raise ConfigRunTableCreationError()
 
+        shuffler = random.Random(self.__seed)
+        if self.__randomize_order and self.__factor_change_costs:
+            return self.__arrange_by_change_cost(treatments_list, shuffler)
+
         if self.__num_of_repetitions > 1:
             final_list = []
 
@@ -80,7 +152,7 @@ class RunTableModel:
                     final_list.append(list(treatment))
             
             if self.__randomize_order:
-                random.shuffle(final_list)
+                shuffler.shuffle(final_list)
 
             for treatment in treatments_list:
                 repetition = 1
@@ -92,6 +164,54 @@ class RunTableModel:
             return final_list
         else:
             if self.__randomize_order:
-                return random.sample(treatments_list, len(treatments_list))
+                return shuffler.sample(treatments_list, len(treatments_list))
             else:
-                return treatments_list
\ No newline at end of file
+                return treatments_list
+
+    def __arrange_by_change_cost(self, treatments_list, shuffler: random.Random):
+        factor_names = [factor.get_factor_name() for factor in self.__factors]
+        costly_factors = sorted([factor_names.index(factor) for factor in self.__factor_change_costs if factor in factor_names],
+                                key=lambda index: -self.__factor_change_costs[factor_names[index]])
+
+        rows = [list(treatment) + ([repetition] if self.__num_of_repetitions > 1 else [])
+                for repetition in range(1, self.__num_of_repetitions + 1) for treatment in treatments_list]
+        shuffler.shuffle(rows)
+
+        if self.__block_per_repetition and self.__num_of_repetitions > 1:
+            blocks = [[row for row in rows if row[-1] == repetition] for repetition in range(1, self.__num_of_repetitions + 1)]
+        else:
+            blocks = [rows]
+
+        arranged = []
+        for block in blocks:
+            arranged.extend(self.__group_by_factors(block, costly_factors, arranged[-1] if arranged else None, shuffler))
+
+        if self.__num_of_repetitions > 1 and len(blocks) == 1:
+            # Repetitions are numbered in run order, as for a uniformly randomized order
+            repetitions = {}
+            for row in arranged:
+                treatment = tuple(row[:-1])
+                repetitions[treatment] = repetitions.get(treatment, 0) + 1
+                row[-1] = repetitions[treatment]
+        return arranged
+
+    def __group_by_factors(self, rows, factor_indexes: List[int], previous, shuffler: random.Random):
+        if not factor_indexes:
+            return rows
+
+        index = factor_indexes[0]
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[index], []).append(row)
+
+        treatments = list(groups)
+        shuffler.shuffle(treatments)
+        # Continue with the treatment of the previous run, so the boundary between two groups costs nothing
+        if previous is not None and previous[index] in groups:
+            treatments.remove(previous[index])
+            treatments.insert(0, previous[index])
+
+        arranged = []
+        for treatment in treatments:
+            arranged.extend(self.__group_by_factors(groups[treatment], factor_indexes[1:], arranged[-1] if arranged else previous, shuffler))
+        return arranged
\ No newline at end of file
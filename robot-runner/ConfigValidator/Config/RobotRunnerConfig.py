@@ -4,8 +4,9 @@ from ConfigValidator.Config.Models.RunTableModel import RunTableModel
 from ConfigValidator.Config.Models.FactorModel import FactorModel
 from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
 from ConfigValidator.Config.Models.OperationType import OperationType
+from ExperimentOrchestrator.Experiment.AdaptiveCooldown import CooldownSignal
 
-from typing import Dict, List
+from typing import Callable, Dict, List
 from pathlib import Path
 
 class RobotRunnerConfig:
@@ -25,6 +26,68 @@ class RobotRunnerConfig:
     # Path to store results at
     # NOTE: Path does not need to exist, will be appended with 'name' as specified in this config and created on runtime
     results_output_path:        Path             = Path("~/Documents/experiments")
+    # Adaptive cooldown: instead of waiting time_between_runs_in_ms, wait until the signals stayed within their band of the idle
+    # baseline for the settling window, at least cooldown_min_in_ms and at most cooldown_max_in_ms (default: time_between_runs_in_ms)
+    # NOTE: e.g. [CooldownSignal.host_cpu_util(band=5), CooldownSignal.ros_topic('/battery_state/voltage', band=0.05),
+    # NOTE:       CooldownSignal.profiler('robot_cpu', self.resource_profiler, band=5)] (set in __init__)
+    # NOTE: Signals read on the robot (CooldownSignal.profiler) need setup_factors set, setup_environment brings up their profilers
+    # NOTE: Baselines that are not given are measured before the first run, once its environment is set up
+    cooldown_signals:           List[CooldownSignal] = []
+    cooldown_min_in_ms:         int              = 0
+    cooldown_max_in_ms:         int              = None
+    cooldown_settling_window_in_ms: int          = 5000
+    # Idle baseline: keep the power and resource profilers (found on the config) measuring during the time between runs, the
+    # mean idle power, CPU and memory just before each run are stored in its __idle_power_mw, __idle_cpu_util and __idle_mem_util
+    # NOTE: These columns are only added to the run table when enabled, also to the run table of an existing experiment
+    # NOTE: The profilers need setup_factors set, the baseline is only recorded while setup_environment has them up
+    # NOTE: Runs without a cooldown before them get a dedicated idle window of idle_baseline_window_in_ms once their environment
+    # NOTE: is set up, e.g. the first run, a run after a failed run or a new setup, and in SEMI mode a run after CONTINUE
+    # NOTE: Profilers read by cooldown_signals are not used, they cannot measure for both at once
+    idle_baseline_enabled:      bool             = False
+    idle_baseline_window_in_ms: int              = 10000
+    # Battery scheduling (SEMI mode): CONTINUE (e.g. an operator swapping the battery) is only raised when the charge left after
+    # a run is not predicted to cover the next run, based on the charge each variation used in the runs so far
+    # NOTE: battery_charge_reader returns the charge (e.g. percentage or voltage) and is called in the run process after
+    # NOTE: start_run and stop_measurement, set it in __init__ (a function set here would become a method of the config),
+    # NOTE: e.g. self.battery_charge_reader = CooldownSignal.ros_topic_reader('/battery_state/voltage')
+    # NOTE: battery_min_charge is the charge that must be left after a run, usage predictions are multiplied by the safety margin
+    battery_charge_reader:      Callable[[], float] = None
+    battery_min_charge:         float            = 0.0
+    battery_safety_margin:      float            = 1.2
+    # Tracing: nested timing spans written as Chrome trace event JSON (trace.json) per run and per experiment
+    # NOTE: Open the files in Perfetto (ui.perfetto.dev) or chrome://tracing
+    # NOTE: None traces all categories: 'orchestration', 'event', 'hook', 'profiler', 'ssh', 'readiness'
+    tracing_enabled:            bool             = True
+    trace_categories:           List[str]        = None
+    # Profiling of the config hooks inside the run process, written to <run_dir>/profiling and merged in <experiment>/profiling
+    # NOTE: Modes: 'cprofile' (hooks.pstats, hooks.collapsed for flamegraphs), 'tracemalloc' (allocations.txt, top N per hook)
+    # NOTE: Profiling adds overhead to the runs, only enable it to investigate slow hooks
+    profiling_modes:            List[str]        = []
+    profiling_top_n:            int              = 25
+    # Preflight: probe SSH targets, profiler ROS services, capture permissions and disk space before before_experiment
+    # NOTE: Can also be run on its own with: python robot-runner/ preflight <path_to_config.py>
+    preflight_enabled:          bool             = True
+    preflight_min_free_disk_in_mb: int           = 1024
+    # Setup factors: setup_environment is only called when the treatments of these factors change between consecutive runs,
+    # what it brings up (e.g. a roslaunch over SSH) stays up for the runs in between, teardown_environment stops it again
+    # NOTE: None disables both hooks, [] brings the environment up once for all runs
+    # NOTE: Both hooks are called in the experiment process, the runs can use what they stored on the config
+    # NOTE: The environment is also set up again after a failed run and, in SEMI mode, after CONTINUE (e.g. a battery swap)
+    # NOTE: Combine with factor_change_costs in create_run_table to group the runs by these factors
+    setup_factors:              List[str]        = None
+    # Design migration: when the run table of an existing experiment no longer matches the config (e.g. a treatment, repetitions
+    # or a data column was added), keep the rows with the same treatments and repetition (incl. their results) and add the new rows
+    # NOTE: The old run table is backed up in the experiment folder, rows that are no longer in the design are dropped
+    allow_design_migration:     bool             = False
+    # Watchdog: a run (or event) exceeding its timeout is terminated, marked TIMEOUT and the experiment continues
+    # NOTE: None disables the timeout, e.g. event_timeouts_in_ms = {RobotRunnerEvents.LAUNCH_MISSION: 600000}
+    # NOTE: After a FAILED or TIMEOUT run, cleanup_run is called (e.g. to stop processes on the robot)
+    run_timeout_in_ms:          int              = None
+    event_timeouts_in_ms:       Dict             = None
+    # Retries: a FAILED or TIMEOUT run is requeued at the end of the run table, after the backoff, up to max_run_attempts attempts
+    # NOTE: The attempts and the error summary of the last failed attempt are stored in the __attempts and __error columns
+    max_run_attempts:           int              = 1
+    retry_backoff_in_ms:        int              = 0
     # =================================================USER SPECIFIC UNNECESSARY CONFIG===============================================
 
     # Dynamic configurations can be one-time satisfied here before the program takes the config as-is
@@ -32,23 +95,34 @@ class RobotRunnerConfig:
     def __init__(self):
         """Executes immediately after program start, on config load"""
 
+        # NOTE: Events can have multiple subscribers, called in subscription order.
+        # NOTE: A third tuple element True marks a subscriber concurrent: consecutive concurrent subscribers
+        # NOTE: (e.g. starting several profilers) run in parallel threads. Async (coroutine) callbacks are supported.
         EventSubscriptionController.subscribe_to_multiple_events([ 
             (RobotRunnerEvents.BEFORE_EXPERIMENT,   self.before_experiment), 
             (RobotRunnerEvents.BEFORE_RUN,          self.before_run),
+            (RobotRunnerEvents.SETUP_ENVIRONMENT,   self.setup_environment),
             (RobotRunnerEvents.START_RUN,           self.start_run),
             (RobotRunnerEvents.START_MEASUREMENT,   self.start_measurement),
             (RobotRunnerEvents.LAUNCH_MISSION,      self.launch_mission),
             (RobotRunnerEvents.STOP_MEASUREMENT,    self.stop_measurement),
             (RobotRunnerEvents.STOP_RUN,            self.stop_run),
             (RobotRunnerEvents.POPULATE_RUN_DATA,   self.populate_run_data),
+            (RobotRunnerEvents.CLEANUP_RUN,         self.cleanup_run),
+            (RobotRunnerEvents.TEARDOWN_ENVIRONMENT, self.teardown_environment),
             (RobotRunnerEvents.AFTER_EXPERIMENT,    self.after_experiment)
         ])
         
         print("Custom config loaded")
 
-    def create_run_table(self) -> List[Dict]:
+    def create_run_table(self) -> RunTableModel:
         """Create and return the run_table here. A run_table is a List (rows) of tuples (columns), 
-        representing each run robot-runner must perform"""
+        representing each run robot-runner must perform.
+        NOTE: Returning the RunTableModel itself (instead of run_table.get_experiment_run_table()) lets robot-runner
+        validate a restart on the fingerprint of the design, without creating the rows.
+        NOTE: Pass a seed to make a randomized order reproducible.
+        NOTE: Pass factor_change_costs (seconds per treatment change, e.g. {"example_factor": 120}) to group the runs of a
+        randomized order by the treatments of expensive factors instead of shuffling uniformly."""
         run_table = RunTableModel(
             factors = [
                 FactorModel("example_factor", ['example_treatment1', 'example_treatment2'])
@@ -58,8 +132,7 @@ class RobotRunnerConfig:
                 {"example_treatment1", "example_treatment2"} # all runs having the combination <treatment1, treatment2> will be excluded
             ] 
         )
-        run_table.create_experiment_run_table()
-        return run_table.get_experiment_run_table()
+        return run_table
 
     def before_experiment(self) -> None:
         """Perform any activity required before starting the experiment here"""
@@ -70,6 +143,12 @@ class RobotRunnerConfig:
         """Perform any activity required before starting a run, no context is available 
         here as the run is not yet active (BEFORE RUN)"""
 
+    def setup_environment(self, context: RobotRunnerContext) -> None:
+        """Bring up what the runs with the setup factor treatments of this run share, only called when
+        the setup factors change (see setup_factors). The context is the one of the first run using it."""
+
+        print("Config.setup_environment() called!")
+
     def start_run(self, context: RobotRunnerContext) -> None:
         """Perform any activity required for starting the run here. 
         Activities before and after starting the run should also be performed here."""
@@ -100,6 +179,18 @@ class RobotRunnerConfig:
         """Return the run data as a row for the output manager represented as a tuple"""
         return None
 
+    def cleanup_run(self, context: RobotRunnerContext) -> None:
+        """Called in the experiment process after a run FAILED or hit a TIMEOUT and its process tree was terminated.
+        Clean up anything the run left behind outside of robot-runner (e.g. processes launched on the robot)."""
+
+        print("Config.cleanup_run() called!")
+
+    def teardown_environment(self, context: RobotRunnerContext) -> None:
+        """Stop what setup_environment brought up, called before the setup factors change, after a failed run,
+        before CONTINUE in SEMI mode and at the end of the experiment. The context is the one of the last run that used it."""
+
+        print("Config.teardown_environment() called!")
+
     def after_experiment(self) -> None:
         """Perform any activity required after stopping the experiment here"""
 
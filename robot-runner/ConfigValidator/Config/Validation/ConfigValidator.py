@@ -1,103 +1,150 @@
 import os
-import subprocess
-from typing import List
+from typing import Any, Callable, List, Tuple
 from pathlib import Path
-from tabulate import tabulate
 
-from ExperimentOrchestrator.Misc.DictConversion import class_to_dict
-from ExperimentOrchestrator.Misc.PathValidation import is_path_exists_or_creatable_portable
+from ExperimentOrchestrator.Misc.DictConversion import config_to_dict
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
 from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
 from ConfigValidator.Config.Models.OperationType import OperationType
+from ConfigValidator.Config.Validation.EnvironmentProbe import EnvironmentProbe
 from ConfigValidator.CustomErrors.ConfigErrors import (ConfigInvalidError, ConfigAttributeInvalidError)
 
+tabulate = lazy_import('tabulate')
+
+# A check returns a (attribute, found, expected) tuple for every problem it finds
+ConfigCheck = Callable[[RobotRunnerConfig], List[Tuple[str, Any, Any]]]
+
+###     =========================================================
+###     |                                                       |
+###     |                    ConfigValidator                    |
+###     |       - Pipeline of independent checks, run in the    |
+###     |         order they are registered in                  |
+###     |       - Expensive probes are cached by fingerprint,   |
+###     |         see EnvironmentProbe                          |
+###     |       - Additional checks can be registered           |
+###     |                                                       |
+###     =========================================================
 class ConfigValidator:
     config_values_or_exception_dict: dict = {}
     error_found:                     bool = False
+    checks:                          List[Tuple[str, ConfigCheck]] = []
 
     @staticmethod
-    def __check_expression(name, value, expected, expression):
-        if expression(value, expected):
-            ConfigValidator \
-                .config_values_or_exception_dict[name] = str(ConfigValidator.config_values_or_exception_dict[name]) + \
-                                                    f"\n\n{ConfigAttributeInvalidError(name, value, expected)}"
-            ConfigValidator.error_found = True
+    def register_check(name: str, check: ConfigCheck):
+        ConfigValidator.checks.append((name, check))
 
     @staticmethod
-    def validate_config(config: RobotRunnerConfig):
-
-        def subprocess_check_output_friendly_string(command_in_array: List[str]):
-            def subprocess_check_output(command_in_array: List[str]):
-                return subprocess.check_output(command_in_array)
-
-            return str(subprocess_check_output(command_in_array) \
-                        .strip()) \
-                        .replace('\n', '') \
-                        .replace('b', '') \
-                        .replace("'", "")
+    def __report_invalid(name, value, expected):
+        ConfigValidator \
+            .config_values_or_exception_dict[name] = str(ConfigValidator.config_values_or_exception_dict.get(name, '')) + \
+                                                f"\n\n{ConfigAttributeInvalidError(name, value, expected)}"
+        ConfigValidator.error_found = True
 
+    @staticmethod
+    def validate_config(config: RobotRunnerConfig):
         # Runtime set experiment_path
         config.experiment_path = Path(str(config.results_output_path) + f"/{config.name}")
         if '~' in str(config.experiment_path):
             config.experiment_path = config.experiment_path.expanduser()
-        
-        # Convert class to dictionary with utility method
-        ConfigValidator.config_values_or_exception_dict = class_to_dict(config)
 
-        # required_ros_version
-        if config.required_ros_version is not None:                                                                             # ROS is required (not None)
+        # Convert the data attributes of the config to a dictionary
+        ConfigValidator.config_values_or_exception_dict = config_to_dict(config)
+        ConfigValidator.error_found = False
+
+        def run_check(named_check: Tuple[str, ConfigCheck]) -> List[Tuple[str, Any, Any]]:
+            name, check = named_check
             try:
-                installed_ros_version = int(os.environ['ROS_VERSION'])                                                          # Get system variable ROS_VERSION
-            except KeyError:
-                installed_ros_version = 'not_installed'                                                                         # If not installed, set to not_installed
-
-            if config.required_ros_version is not any or installed_ros_version == 'not_installed':                              # In case a specific ROS version is required (not any) check found vs expected.
-                # required_ros_version                                                                                          # In case ROS is not_installed but ROS was required (not None), check vs expected and raise error.
-                ConfigValidator.__check_expression('required_ros_version', installed_ros_version, config.required_ros_version,
-                                        (lambda a, b: a != b)
-                                    )
-            
-            if config.required_ros_distro is not None:                                                                          # ROS is required (not None)
-                try:
-                    installed_ros_distro = subprocess_check_output_friendly_string(['printenv','ROS_DISTRO'])                   # Get system variable ROS_DISTRO
-                except:
-                    installed_ros_distro = 'not_installed'                                                                      # If not installed, set to not_installed
-
-                if config.required_ros_distro is not any or installed_ros_distro == 'not_installed':                            # In case a specific ROS distribution is required (not any) check found vs expected
-                    # required_ros_distro                                                                                       # In case ROS is not_installed but ROS was required (not None), check vs expected and raise error.
-                    ConfigValidator.__check_expression('required_ros_version', installed_ros_distro, config.required_ros_distro,
-                                            (lambda a, b: a != b)
-                                        )
-
-        # operation_type
-        ConfigValidator.__check_expression('operation_type', config.operation_type, OperationType, 
-                                (lambda a, b: not isinstance(type(a), type(b)))
-                            )
-        # time_between_runs_in_ms
-        ConfigValidator.__check_expression('time_between_runs_in_ms', config.time_between_runs_in_ms, int,
-                                (lambda a, b: not isinstance(a, b))
-                            )
-
-        # Results output path
-        ConfigValidator.__check_expression("results_output_path", 
-                            config.results_output_path,
-                            Path,
-                            (lambda a, b: not isinstance(a, b))
-                        )
-
-        ConfigValidator.__check_expression("results_output_path", 
-                            config.experiment_path,
-                            "path must be valid and writable",
-                            (lambda a, b: is_path_exists_or_creatable_portable(a))
-                        )
+                return check(config)
+            except Exception as e:
+                return [(f"check '{name}'", f"failed with: {e}", "check to complete")]
+
+        # The checks are cheap lookups (the slow probes belong to Preflight), they run one after the other
+        for named_check in ConfigValidator.checks:
+            for name, found, expected in run_check(named_check):
+                ConfigValidator.__report_invalid(name, found, expected)
 
         # Display config in user-friendly manner, including potential errors found
         print(
-            tabulate(
-                ConfigValidator.config_values_or_exception_dict.items(), 
-                ['Key', 'Value'], 
+            tabulate.tabulate(
+                ConfigValidator.config_values_or_exception_dict.items(),
+                ['Key', 'Value'],
                 tablefmt="rst"
             )
         )
 
         if ConfigValidator.error_found:
-            raise ConfigInvalidError
\ No newline at end of file
+            raise ConfigInvalidError
+
+    # ===== Default checks =====
+
+    @staticmethod
+    def check_ros(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        problems = []
+        if config.required_ros_version is None:                                                                                 # ROS is not required
+            return problems
+
+        ros = EnvironmentProbe.ros_installation()
+        installed_ros_version = int(ros['version']) if ros['version'] else 'not_installed'
+
+        if config.required_ros_version is not any or installed_ros_version == 'not_installed':                                  # In case a specific ROS version is required (not any) check found vs expected.
+            if installed_ros_version != config.required_ros_version:                                                            # In case ROS is not_installed but ROS was required (not None), report it.
+                problems.append(('required_ros_version', installed_ros_version, config.required_ros_version))
+
+        if config.required_ros_distro is not None:
+            installed_ros_distro = ros['distro'] or 'not_installed'
+            if config.required_ros_distro is not any or installed_ros_distro == 'not_installed':
+                if installed_ros_distro != config.required_ros_distro:
+                    problems.append(('required_ros_distro', installed_ros_distro, config.required_ros_distro))
+
+        return problems
+
+    @staticmethod
+    def check_attribute_types(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        problems = []
+        if not isinstance(config.operation_type, OperationType):
+            problems.append(('operation_type', config.operation_type, OperationType))
+        if not isinstance(config.time_between_runs_in_ms, int):
+            problems.append(('time_between_runs_in_ms', config.time_between_runs_in_ms, int))
+        if not isinstance(config.results_output_path, Path):
+            problems.append(('results_output_path', config.results_output_path, Path))
+        return problems
+
+    @staticmethod
+    def check_experiment_path(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        # The experiment path is created on runtime, so the nearest existing parent must be writable
+        path = config.experiment_path.absolute()
+        while not path.exists() and path != path.parent:
+            path = path.parent
+
+        if not (path.is_dir() and os.access(path, os.W_OK)):
+            return [('results_output_path', config.experiment_path, "path must be valid and writable")]
+        return []
+
+    @staticmethod
+    def check_tshark(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        if getattr(config, 'network_interface_used', None) and EnvironmentProbe.tshark_available()['tshark'] is None:
+            return [('network_interface_used', "tshark not found on PATH", "tshark installed for network profiling")]
+        return []
+
+    @staticmethod
+    def check_cooldown_signals(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        # Signals read on the robot (e.g. CooldownSignal.profiler) are only warm while setup_environment has it up
+        signals = [signal.name for signal in getattr(config, 'cooldown_signals', None) or [] if getattr(signal, 'needs_environment', False)]
+        if signals and getattr(config, 'setup_factors', None) is None:
+            return [('cooldown_signals', ", ".join(signals), "setup_factors set (e.g. []), the signals need setup_environment to bring up their profilers")]
+        return []
+
+    @staticmethod
+    def check_idle_baseline(config: RobotRunnerConfig) -> List[Tuple[str, Any, Any]]:
+        # The power and resource profilers run on the robot, the idle baseline is recorded while setup_environment has it up
+        if getattr(config, 'idle_baseline_enabled', False) and getattr(config, 'setup_factors', None) is None:
+            return [('idle_baseline_enabled', True, "setup_factors set (e.g. []), the profilers need setup_environment to bring them up")]
+        return []
+
+
+ConfigValidator.register_check('ros', ConfigValidator.check_ros)
+ConfigValidator.register_check('attribute_types', ConfigValidator.check_attribute_types)
+ConfigValidator.register_check('experiment_path', ConfigValidator.check_experiment_path)
+ConfigValidator.register_check('tshark', ConfigValidator.check_tshark)
+ConfigValidator.register_check('cooldown_signals', ConfigValidator.check_cooldown_signals)
+ConfigValidator.register_check('idle_baseline', ConfigValidator.check_idle_baseline)
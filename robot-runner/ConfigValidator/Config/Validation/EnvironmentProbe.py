@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+###     =========================================================
+###     |                                                       |
+###     |                    EnvironmentProbe                   |
+###     |       - Probes of the environment an experiment       |
+###     |         depends on (ROS, SSH, tshark)                 |
+###     |       - Results are cached on disk, keyed by a        |
+###     |         fingerprint of what they depend on, so a      |
+###     |         changed environment is probed again           |
+###     |                                                       |
+###     =========================================================
+class EnvironmentProbe:
+    cache_file: Path = Path(os.environ.get('XDG_CACHE_HOME') or '~/.cache').expanduser() / 'robot-runner' / 'probes.json'
+
+    __cache: Dict[str, Dict] = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def cached(name: str, fingerprint: str, probe: Callable[[], Any], ttl_in_s: float, cache_if: Callable[[Any], bool] = lambda result: True):
+        """Return the cached result of the probe if its fingerprint is unchanged and it is younger than ttl_in_s,
+        otherwise probe again. Only results for which cache_if holds are stored (e.g. only successful connections)."""
+        key = f"{name}:{hashlib.sha1(fingerprint.encode()).hexdigest()}"
+        with EnvironmentProbe.__lock:
+            entry = EnvironmentProbe.__load().get(key)
+        if entry is not None and time.time() - entry['probed_at'] < ttl_in_s:
+            return entry['result']
+
+        result = probe()
+        if cache_if(result):
+            with EnvironmentProbe.__lock:
+                EnvironmentProbe.__load()[key] = {'probed_at': time.time(), 'result': result}
+                EnvironmentProbe.__save()
+        return result
+
+    @staticmethod
+    def clear_cache():
+        with EnvironmentProbe.__lock:
+            EnvironmentProbe.__cache = {}
+            EnvironmentProbe.__save()
+
+    # ===== Probes =====
+
+    @staticmethod
+    def ros_installation() -> Dict[str, Optional[str]]:
+        """ROS version and distribution of the sourced environment, read in-process"""
+        version, distro = os.environ.get('ROS_VERSION'), os.environ.get('ROS_DISTRO')
+        install_dir = f"/opt/ros/{distro}" if distro else None
+        fingerprint = f"{version}|{distro}|{EnvironmentProbe.__mtime(install_dir)}"
+
+        def probe():
+            return {
+                'version':      version,
+                'distro':       distro,
+                'install_dir':  install_dir if install_dir and os.path.isdir(install_dir) else None
+            }
+
+        return EnvironmentProbe.cached('ros_installation', fingerprint, probe, ttl_in_s=24 * 3600)
+
+    @staticmethod
+    def ssh_reachable(host: str, port: int = 22, timeout_in_s: float = 2.0) -> bool:
+        """Whether a TCP connection to the SSH port can be opened, only successes are cached (for 10 minutes)"""
+        def probe():
+            try:
+                with socket.create_connection((host, port), timeout=timeout_in_s):
+                    return True
+            except OSError:
+                return False
+
+        return EnvironmentProbe.cached('ssh_reachable', f"{host}:{port}", probe, ttl_in_s=600, cache_if=lambda reachable: reachable)
+
+    @staticmethod
+    def tshark_available() -> Dict[str, Optional[str]]:
+        """Paths of tshark and dumpcap (used for capturing) on the PATH, None if missing"""
+        path = os.environ.get('PATH', '')
+        fingerprint = path + '|' + '|'.join(str(EnvironmentProbe.__mtime(directory)) for directory in path.split(os.pathsep))
+
+        def probe():
+            return {'tshark': shutil.which('tshark'), 'dumpcap': shutil.which('dumpcap')}
+
+        return EnvironmentProbe.cached('tshark_available', fingerprint, probe, ttl_in_s=24 * 3600)
+
+    # ===== Cache file =====
+
+    @staticmethod
+    def __load() -> Dict[str, Dict]:
+        if EnvironmentProbe.__cache is None:
+            try:
+                with open(EnvironmentProbe.cache_file, 'r') as cache_file:
+                    EnvironmentProbe.__cache = json.load(cache_file)
+            except (OSError, ValueError):     # Missing, unreadable or corrupt, the probes simply run again
+                EnvironmentProbe.__cache = {}
+        return EnvironmentProbe.__cache
+
+    @staticmethod
+    def __save():
+        try:
+            EnvironmentProbe.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so concurrent robot-runner processes never read a partial file
+            with tempfile.NamedTemporaryFile('w', dir=EnvironmentProbe.cache_file.parent, delete=False) as temporary_file:
+                json.dump(EnvironmentProbe.__cache, temporary_file)
+            os.replace(temporary_file.name, EnvironmentProbe.cache_file)
+        except OSError:
+            pass    # The cache is an optimisation only, e.g. a read-only HOME just means probing again
+
+    @staticmethod
+    def __mtime(path: Optional[str]) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime if path else None
+        except OSError:
+            return None
@@ -0,0 +1,206 @@
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+from ConfigValidator.Config.Validation.EnvironmentProbe import EnvironmentProbe
+
+paramiko = lazy_import('paramiko')
+tabulate = lazy_import('tabulate')
+
+
+class PreflightResult:
+    OK:     str = 'OK'
+    WARN:   str = 'WARN'    # Might resolve itself during the experiment (e.g. a node that is launched in start_run)
+    FAIL:   str = 'FAIL'
+
+    def __init__(self, probe: str, target: str, status: str, detail: str = "", duration_ms: float = 0.0):
+        self.probe = probe
+        self.target = target
+        self.status = status
+        self.detail = detail
+        self.duration_ms = duration_ms
+
+
+###     =========================================================
+###     |                                                       |
+###     |                       Preflight                       |
+###     |       - Probes every target declared in the config    |
+###     |         concurrently, before any experiment hook      |
+###     |         runs: SSH login, remote ROS log dir, ROS      |
+###     |         services of the profilers, capture            |
+###     |         permissions and free disk space               |
+###     |       - Targets are discovered from the config and    |
+###     |         the objects it holds (e.g. profilers)         |
+###     |                                                       |
+###     =========================================================
+class Preflight:
+    timeout_in_s:           float = 5.0
+    min_free_disk_in_mb:    int = 1024
+
+    @staticmethod
+    def run(config) -> List[PreflightResult]:
+        return Preflight.run_many([config])
+
+    @staticmethod
+    def run_many(configs: list) -> List[PreflightResult]:
+        """Probe the targets of several configs at once, a target shared by configs (e.g. the robot) is probed once"""
+        probes = {}
+        for config in configs:
+            for key, probe in Preflight.__collect_probes(config).items():
+                probes.setdefault(key, probe)
+        if not probes:
+            return []
+
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            results = list(executor.map(Preflight.__timed, probes.values()))
+
+        return [result for probe_results in results for result in probe_results]
+
+    @staticmethod
+    def print_report(results: List[PreflightResult]) -> None:
+        rows = [(result.probe, result.target, result.status, f"{result.duration_ms:.0f}", result.detail) for result in results]
+        print(tabulate.tabulate(rows, ['Probe', 'Target', 'Status', 'Time [ms]', 'Detail'], tablefmt="rst"))
+
+    @staticmethod
+    def has_failures(results: List[PreflightResult]) -> bool:
+        return any(result.status == PreflightResult.FAIL for result in results)
+
+    # ===== Target discovery =====
+
+    @staticmethod
+    def __collect_probes(config) -> Dict[Tuple, Callable[[], List[PreflightResult]]]:
+        # Keyed by probe and target
+        probes = {}
+        for host, username, known_hosts in Preflight.__ssh_targets(config):
+            probes[('ssh', host, username)] = lambda host=host, username=username, known_hosts=known_hosts: Preflight.probe_ssh(host, username, known_hosts)
+
+        services = Preflight.__required_ros_services(config)
+        if services:
+            probes[('ros_services', tuple(sorted(services)))] = lambda: Preflight.probe_ros_services(sorted(services))
+
+        network_interface = getattr(config, 'network_interface_used', None)
+        if network_interface:
+            probes[('capture', network_interface)] = lambda: Preflight.probe_capture_permissions(network_interface)
+
+        results_output_path = getattr(config, 'results_output_path', None)
+        if results_output_path is not None:
+            probes[('disk', str(results_output_path))] = lambda: Preflight.probe_disk_space(Path(str(results_output_path)).expanduser(),
+                                                                                             getattr(config, 'preflight_min_free_disk_in_mb', Preflight.min_free_disk_in_mb))
+        return probes
+
+    @staticmethod
+    def __config_objects(config) -> list:
+        return [config] + [value for value in vars(config).values() if hasattr(value, '__dict__') and not callable(value)]
+
+    @staticmethod
+    def __ssh_targets(config) -> Set[Tuple[str, str, str]]:
+        targets = set()
+        robot_ip_addr = getattr(config, 'robot_ip_addr', None)
+        if robot_ip_addr and getattr(config, 'robot_username', None):
+            targets.add((robot_ip_addr, config.robot_username, getattr(config, 'ssh_host_key_dir', None)))
+
+        # Profilers that read remote log files declare their own targets
+        for obj in Preflight.__config_objects(config)[1:]:
+            if getattr(obj, 'ip_addr', None) and getattr(obj, 'username', None):
+                if not any(target[:2] == (obj.ip_addr, obj.username) for target in targets):
+                    targets.add((obj.ip_addr, obj.username, None))
+        return targets
+
+    @staticmethod
+    def __required_ros_services(config) -> Set[str]:
+        services = set()
+        for obj in Preflight.__config_objects(config):
+            services.update(getattr(obj, 'required_ros_services', []))
+        return services
+
+    # ===== Probes =====
+
+    @staticmethod
+    def probe_ssh(host: str, username: str, known_hosts: str = None) -> List[PreflightResult]:
+        target = f"{username}@{host}"
+        if not EnvironmentProbe.ssh_reachable(host, timeout_in_s=Preflight.timeout_in_s):
+            return [PreflightResult('ssh_connect', target, PreflightResult.FAIL, "port 22 unreachable")]
+
+        ssh_client = paramiko.SSHClient()
+        try:
+            if known_hosts:
+                ssh_client.load_host_keys(os.path.expanduser(known_hosts))
+            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            ssh_client.connect(host, username=username, timeout=Preflight.timeout_in_s, banner_timeout=Preflight.timeout_in_s,
+                               auth_timeout=Preflight.timeout_in_s)
+        except Exception as e:
+            ssh_client.close()
+            return [PreflightResult('ssh_connect', target, PreflightResult.FAIL, f"{type(e).__name__}: {e}")]
+
+        results = [PreflightResult('ssh_connect', target, PreflightResult.OK, "authenticated")]
+        try:
+            _, stdout, _ = ssh_client.exec_command("test -d ~/.ros/log && echo present", timeout=Preflight.timeout_in_s)
+            present = stdout.read().decode().strip() == 'present'
+            results.append(PreflightResult('remote_ros_log_dir', f"{target}:~/.ros/log", PreflightResult.OK if present else PreflightResult.FAIL,
+                                           "" if present else "directory does not exist"))
+        except Exception as e:
+            results.append(PreflightResult('remote_ros_log_dir', f"{target}:~/.ros/log", PreflightResult.FAIL, f"{type(e).__name__}: {e}"))
+        finally:
+            ssh_client.close()
+        return results
+
+    @staticmethod
+    def probe_ros_services(services: List[str]) -> List[PreflightResult]:
+        try:
+            process = subprocess.run(['rosservice', 'list'], capture_output=True, text=True, timeout=Preflight.timeout_in_s)
+            if process.returncode != 0:
+                raise RuntimeError(process.stderr.strip() or f"exit code {process.returncode}")
+            available = set(process.stdout.split())
+        except Exception as e:
+            detail = "rosservice not found" if isinstance(e, FileNotFoundError) else f"ROS master not reachable: {e}"
+            return [PreflightResult('ros_service', service, PreflightResult.WARN, detail) for service in services]
+
+        # Profiler nodes are often launched in start_run, so a missing service is a warning only
+        return [PreflightResult('ros_service', service, PreflightResult.OK if service in available else PreflightResult.WARN,
+                                "" if service in available else "not advertised (yet)") for service in services]
+
+    @staticmethod
+    def probe_capture_permissions(network_interface: str) -> List[PreflightResult]:
+        dumpcap = EnvironmentProbe.tshark_available()['dumpcap']
+        if dumpcap is None:
+            return [PreflightResult('capture_permissions', network_interface, PreflightResult.FAIL, "dumpcap (wireshark) not found on PATH")]
+
+        try:
+            # dumpcap only lists the interfaces the user is allowed to capture on
+            process = subprocess.run([dumpcap, '-D'], capture_output=True, text=True, timeout=Preflight.timeout_in_s)
+        except Exception as e:
+            return [PreflightResult('capture_permissions', network_interface, PreflightResult.FAIL, f"{type(e).__name__}: {e}")]
+
+        interfaces = [line.split('.', 1)[1].strip().split(' ')[0] for line in process.stdout.splitlines() if '.' in line]
+        if network_interface in interfaces:
+            return [PreflightResult('capture_permissions', network_interface, PreflightResult.OK)]
+        return [PreflightResult('capture_permissions', network_interface, PreflightResult.FAIL,
+                                process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "interface not available for capturing")]
+
+    @staticmethod
+    def probe_disk_space(path: Path, min_free_in_mb: int) -> List[PreflightResult]:
+        existing = path.absolute()
+        while not existing.exists() and existing != existing.parent:
+            existing = existing.parent
+
+        free_in_mb = shutil.disk_usage(existing).free / (1024 * 1024)
+        status = PreflightResult.OK if free_in_mb >= min_free_in_mb else PreflightResult.FAIL
+        return [PreflightResult('disk_space', str(path), status, f"{free_in_mb:.0f} MB free (minimum {min_free_in_mb} MB)")]
+
+    @staticmethod
+    def __timed(probe: Callable[[], List[PreflightResult]]) -> List[PreflightResult]:
+        start = time.perf_counter()
+        try:
+            results = probe()
+        except Exception as e:
+            results = [PreflightResult('probe', getattr(probe, '__name__', 'probe'), PreflightResult.FAIL, f"{type(e).__name__}: {e}")]
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        for result in results:
+            result.duration_ms = duration_ms
+        return results
@@ -20,6 +20,15 @@ class ConfigAttributeInvalidError(ConfigBaseError):
                             "%-*s  %s\n" % (10, "FOUND:", found) +
                             "%-*s  %s" % (10, "EXPECTED:", expected) + BashHeaders.ENDC)
 
+class ConfigPreflightFailedError(ConfigBaseError):
+    def __init__(self):
+        super().__init__("One or more preflight probes failed, please refer to the preflight table. Set preflight_enabled = False to skip them.")
+
 class ConfigRunTableCreationError(ConfigBaseError):
     def __init__(self):
         super().__init__("Run table could not be created succesffully. Check the allowed attribute values of RunTableModel class.")
+
+class ConfigQueueInvalidError(ConfigBaseError):
+    def __init__(self, invalid_configs):
+        super().__init__("The experiment queue was not started, these configs are invalid:\n" +
+                         "\n".join(f"  {config_path}: {reason}" for config_path, reason in invalid_configs))
@@ -7,7 +7,8 @@ class ExperimentOutputPathAlreadyExistsError(BaseError):
             "The experiment_path (output_path + experiment_name) already exists!\n" +
             "The config file and the CSV found in the output path do not seem to correspond!\n\n" +
             "Experiment stopped to prevent " + 
-            BashHeaders.UNDERLINE + "overwriting existing results" + BashHeaders.ENDC + "."
+            BashHeaders.UNDERLINE + "overwriting existing results" + BashHeaders.ENDC + BashHeaders.FAIL + ".\n" +
+            "Set allow_design_migration = True in the config to extend the existing experiment instead."
         )
 
 class ExperimentOutputFileDoesNotExistError(BaseError):
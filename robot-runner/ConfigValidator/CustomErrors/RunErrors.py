@@ -0,0 +1,11 @@
+from ConfigValidator.CustomErrors.BaseError import BaseError
+
+class RunBaseError(BaseError):
+    def __init__(self, text: str):
+        super().__init__(text)
+
+class ReadinessTimeoutError(RunBaseError):
+    def __init__(self, timeout_in_s: float, missing_components: list, stream_ended: bool = False):
+        self.missing_components = missing_components
+        reason = "The output stream ended before readiness" if stream_ended else f"Readiness not reached within {timeout_in_s}s"
+        super().__init__(f"{reason}, still waiting for: {', '.join(missing_components)}")
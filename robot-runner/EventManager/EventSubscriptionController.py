@@ -1,34 +1,124 @@
-from typing import Callable, List, Tuple
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
+from EventManager.Models.EventSubscription import EventSubscription
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Tracing.Tracer import Tracer
+from ProgressManager.Profiling.HookProfiler import HookProfiler
 
+###     =========================================================
+###     |                                                       |
+###     |              EventSubscriptionController              |
+###     |       - Any number of ordered subscribers per event   |
+###     |       - Consecutive concurrent subscribers run in     |
+###     |         parallel threads, the next sequential one     |
+###     |         waits for all of them                         |
+###     |       - Coroutine (async) callbacks are awaited       |
+###     |       - A failing subscriber does not stop the        |
+###     |         others, the first error is re-raised after    |
+###     |         all subscribers ran                           |
+###     |                                                       |
+###     =========================================================
 class EventSubscriptionController:
-    __call_back_register: dict = dict()
+    __call_back_register: Dict[RobotRunnerEvents, List[EventSubscription]] = dict()
 
     @staticmethod
-    def subscribe_to_single_event(event: RobotRunnerEvents, callback_method: Callable):
-            EventSubscriptionController.__call_back_register[event] = callback_method
+    def subscribe_to_single_event(event: RobotRunnerEvents, callback_method: Callable, concurrent: bool = False):
+        EventSubscriptionController.__call_back_register.setdefault(event, []).append(EventSubscription(callback_method, concurrent))
 
     @staticmethod
-    def subscribe_to_multiple_events(subscriptions: List[Tuple[RobotRunnerEvents, Callable]]):
+    def subscribe_to_multiple_events(subscriptions: List[Tuple]):
+        # Each subscription is (event, callback) or (event, callback, concurrent)
         for sub in subscriptions:
             event, callback = sub[0], sub[1]
-            EventSubscriptionController.subscribe_to_single_event(event, callback)
+            concurrent = sub[2] if len(sub) > 2 else False
+            EventSubscriptionController.subscribe_to_single_event(event, callback, concurrent)
+
+    @staticmethod
+    def unsubscribe_from_single_event(event: RobotRunnerEvents, callback_method: Callable):
+        subscriptions = EventSubscriptionController.__call_back_register.get(event, [])
+        EventSubscriptionController.__call_back_register[event] = [sub for sub in subscriptions if sub.callback != callback_method]
+
+    @staticmethod
+    def clear_subscriptions():
+        EventSubscriptionController.__call_back_register = dict()
+
+    @staticmethod
+    def get_subscriptions() -> Dict[RobotRunnerEvents, List[EventSubscription]]:
+        return EventSubscriptionController.__call_back_register
+
+    @staticmethod
+    def set_subscriptions(register: Dict[RobotRunnerEvents, List[EventSubscription]]):
+        EventSubscriptionController.__call_back_register = register
 
     @staticmethod
     def raise_event(event: RobotRunnerEvents, robot_runner_context = None):
-        try:
-            event_callback = EventSubscriptionController.__call_back_register[event]
-        except KeyError:
-            return None
+        """Call all subscribers of the event and return the result of the last subscriber that returned a value"""
+        returned = [result for result in EventSubscriptionController.raise_event_and_gather(event, robot_runner_context) if result is not None]
+        return returned[-1] if returned else None
+
+    @staticmethod
+    def raise_event_and_gather(event: RobotRunnerEvents, robot_runner_context = None) -> List[Any]:
+        """Call all subscribers of the event and return their results in subscription order"""
+        subscriptions = EventSubscriptionController.__call_back_register.get(event, [])
+        results: List[Any] = [None] * len(subscriptions)
+        errors: List[BaseException] = []
+
+        def call(index: int):
+            callback_name = getattr(subscriptions[index].callback, '__qualname__', str(subscriptions[index].callback))
+            try:
+                with Tracer.span(callback_name, 'hook'):
+                    results[index] = HookProfiler.call(f"{event.name}: {callback_name}", EventSubscriptionController.__invoke,
+                                                       subscriptions[index].callback, robot_runner_context)
+            except Exception as e:
+                output.console_log_FAIL(f"Subscriber {callback_name} of {event.name} failed: {e}")
+                errors.append(e)
+
+        with Tracer.span(event.name, 'event', subscribers=len(subscriptions)):
+            index = 0
+            while index < len(subscriptions):
+                if not subscriptions[index].concurrent:
+                    call(index)
+                    index += 1
+                    continue
+
+                # Run a group of consecutive concurrent subscribers in parallel
+                group = []
+                while index < len(subscriptions) and subscriptions[index].concurrent:
+                    group.append(index)
+                    index += 1
 
+                with ThreadPoolExecutor(max_workers=len(group)) as executor:
+                    list(executor.map(call, group))
+
+        if errors:
+            raise errors[0]
+
+        return results
+
+    @staticmethod
+    def get_event_callback(event: RobotRunnerEvents):
+        callbacks = EventSubscriptionController.get_event_callbacks(event)
+        return callbacks[0] if callbacks else None
+
+    @staticmethod
+    def get_event_callbacks(event: RobotRunnerEvents) -> List[Callable]:
+        return [sub.callback for sub in EventSubscriptionController.__call_back_register.get(event, [])]
+
+    @staticmethod
+    def __invoke(callback: Callable, robot_runner_context):
         if robot_runner_context:
-            return event_callback(robot_runner_context)
+            result = callback(robot_runner_context)
         else:
-            return event_callback()
+            result = callback()
+
+        if inspect.isawaitable(result):
+            result = asyncio.run(EventSubscriptionController.__await(result))
+
+        return result
 
     @staticmethod
-    def get_event_callback(event: RobotRunnerEvents):
-        try:
-            return EventSubscriptionController.__call_back_register[event]
-        except KeyError:
-            return None
+    async def __await(awaitable):
+        return await awaitable
@@ -0,0 +1,9 @@
+from typing import Callable
+
+class EventSubscription:
+    callback:   Callable
+    concurrent: bool
+
+    def __init__(self, callback: Callable, concurrent: bool = False):
+        self.callback = callback
+        self.concurrent = concurrent
@@ -10,4 +10,7 @@ class RobotRunnerEvents(Enum):
     STOP_MEASUREMENT = 7
     STOP_RUN = 8
     POPULATE_RUN_DATA = 9
-    AFTER_EXPERIMENT = 10
\ No newline at end of file
+    AFTER_EXPERIMENT = 10
+    CLEANUP_RUN = 11          # Raised in the experiment process after a run failed or was terminated
+    SETUP_ENVIRONMENT = 12    # Raised in the experiment process when the treatments of the setup factors change
+    TEARDOWN_ENVIRONMENT = 13 # Raised in the experiment process before the next setup, after a failed run and at the end
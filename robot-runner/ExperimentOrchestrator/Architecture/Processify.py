@@ -14,6 +14,18 @@ class Sentinel:
     pass
 
 
+def rebuild_exception(ex_type, ex_message, tb_str):
+    '''The exception of the subprocess, with its traceback in the message.
+    Exceptions whose __init__ does not take a single message are
+    raised as a RuntimeError that keeps their type name.
+    '''
+    message = '%s (in subprocess)\n%s' % (ex_message, tb_str)
+    try:
+        return ex_type(message)
+    except Exception:
+        return RuntimeError(f"{ex_type.__name__}: {message}")
+
+
 def processify(func):
     '''Decorator to run a function as a process.
     Be sure that every argument and the return value
@@ -35,7 +47,7 @@ def processify(func):
                 error = None
             except Exception:
                 ex_type, ex_value, tb = sys.exc_info()
-                error = ex_type, ex_value, ''.join(traceback.format_tb(tb))
+                error = ex_type, str(ex_value), ''.join(traceback.format_tb(tb))   # Not every exception can be unpickled
                 result = None
             q.put((result, error))
 
@@ -44,7 +56,7 @@ def processify(func):
             result = func(*args, **kwargs)
         except Exception:
             ex_type, ex_value, tb = sys.exc_info()
-            error = ex_type, ex_value, ''.join(traceback.format_tb(tb))
+            error = ex_type, str(ex_value), ''.join(traceback.format_tb(tb))   # Not every exception can be unpickled
             result = None
         else:
             error = None
@@ -64,9 +76,7 @@ def processify(func):
         p.join()
 
         if error:
-            ex_type, ex_value, tb_str = error
-            message = '%s (in subprocess)\n%s' % (str(ex_value), tb_str)
-            raise ex_type(message)
+            raise rebuild_exception(*error)
 
         return result
 
@@ -90,9 +100,7 @@ def processify(func):
         p.join()
 
         if error:
-            ex_type, ex_value, tb_str = error
-            message = '%s (in subprocess)\n%s' % (str(ex_value), tb_str)
-            raise ex_type(message)
+            raise rebuild_exception(*error)
 
     @wraps(func)
     def wrapper(*args, **kwargs):
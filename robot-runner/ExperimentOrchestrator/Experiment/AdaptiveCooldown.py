@@ -0,0 +1,150 @@
+import statistics
+import subprocess
+import time
+from typing import Callable, List, Optional
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+
+class CooldownSignal:
+    """A live signal the cooldown waits on, e.g. the CPU utilization or power draw of the robot.
+    read returns the current value; the signal is settled when it is within band of its idle baseline
+    (band is a fraction of the baseline when relative). Without a baseline, it is measured before the first run.
+    Signals that need_environment can only be read while setup_environment has the robot up (see setup_factors)."""
+
+    def __init__(self, name: str, read: Callable[[], float], band: float, relative: bool = False, baseline: float = None,
+                 needs_environment: bool = False):
+        self.name = name
+        self.read = read
+        self.band = band
+        self.relative = relative
+        self.baseline = baseline
+        self.needs_environment = needs_environment
+        self.source_profiler = None     # The profiler read, set by CooldownSignal.profiler
+
+    def is_settled(self, value: float) -> bool:
+        allowed = abs(self.baseline) * self.band if self.relative else self.band
+        return abs(value - self.baseline) <= allowed
+
+    @staticmethod
+    def host_cpu_util(band: float = 5.0, sample_window_in_s: float = 0.5, baseline: float = None) -> 'CooldownSignal':
+        """CPU utilization (%) of this machine, e.g. when the robot is simulated (Gazebo) on it"""
+        def read() -> float:
+            first = CooldownSignal.__read_proc_stat()
+            time.sleep(sample_window_in_s)
+            second = CooldownSignal.__read_proc_stat()
+            total, idle = second[0] - first[0], second[1] - first[1]
+            return 100.0 * (total - idle) / total if total > 0 else 0.0
+        return CooldownSignal('host_cpu_util', read, band, baseline=baseline)
+
+    @staticmethod
+    def profiler(name: str, profiler, band: float, relative: bool = False, baseline: float = None, window_in_s: float = 1.0) -> 'CooldownSignal':
+        """The reading of a profiler with read_sample (e.g. the CPU utilization of a ResourceProfiler) over a short window,
+        the profiler runs on the robot and is brought up by setup_environment"""
+        signal = CooldownSignal(name, lambda: profiler.read_sample(window_in_s), band, relative, baseline, needs_environment=True)
+        signal.source_profiler = profiler
+        return signal
+
+    @staticmethod
+    def ros_topic(topic_field: str, band: float, relative: bool = False, baseline: float = None, timeout_in_s: float = 5.0) -> 'CooldownSignal':
+        """The numeric value of a ROS topic field, e.g. '/battery_state/voltage' of a TurtleBot3"""
+        return CooldownSignal(topic_field, CooldownSignal.ros_topic_reader(topic_field, timeout_in_s), band, relative, baseline)
+
+    @staticmethod
+    def ros_topic_reader(topic_field: str, timeout_in_s: float = 5.0) -> Callable[[], float]:
+        """A function reading the next value published on a numeric ROS topic field"""
+        def read() -> float:
+            process = subprocess.run(['rostopic', 'echo', '-n', '1', topic_field], check=True, capture_output=True, text=True, timeout=timeout_in_s)
+            return float(process.stdout.split()[0])
+        return read
+
+    @staticmethod
+    def __read_proc_stat():
+        with open('/proc/stat', 'r') as stat_file:
+            values = [int(value) for value in stat_file.readline().split()[1:]]
+        return sum(values), values[3] + values[4]     # total, idle + iowait
+
+
+###     =========================================================
+###     |                                                       |
+###     |                    AdaptiveCooldown                   |
+###     |       - Replaces the fixed time between runs: waits   |
+###     |         until all cooldown signals stayed within      |
+###     |         their band of the idle baseline for the       |
+###     |         settling window                               |
+###     |       - Bounded by a minimum and maximum cooldown     |
+###     |                                                       |
+###     =========================================================
+class AdaptiveCooldown:
+    signals: List[CooldownSignal]
+
+    def __init__(self, signals: List[CooldownSignal], min_in_ms: int = 0, max_in_ms: int = 60000,
+                 settling_window_in_ms: int = 5000, poll_interval_in_ms: int = 1000):
+        self.signals = list(signals or [])
+        self.min_in_s = (min_in_ms or 0) / 1000
+        self.max_in_s = max((max_in_ms or 0) / 1000, self.min_in_s)
+        self.settling_window_in_s = (settling_window_in_ms or 0) / 1000
+        self.poll_interval_in_s = (poll_interval_in_ms or 0) / 1000
+
+    def is_enabled(self) -> bool:
+        return len(self.signals) > 0
+
+    def needs_environment(self) -> bool:
+        return any(signal.needs_environment for signal in self.signals)
+
+    def measure_baselines(self, samples: int = 5) -> None:
+        """Measure the idle baseline (median of a few readings) of the signals that were not given one"""
+        for signal in list(self.signals):
+            if signal.baseline is not None:
+                continue
+            try:
+                readings = []
+                for _ in range(samples):
+                    readings.append(signal.read())
+                    time.sleep(self.poll_interval_in_s)
+                signal.baseline = statistics.median(readings)
+                output.console_log_OK(f"Cooldown: idle baseline of {signal.name} is {signal.baseline:.2f}")
+            except Exception as e:
+                output.console_log_FAIL(f"Cooldown: cannot read {signal.name} ({type(e).__name__}: {e}), not waiting on it")
+                self.signals.remove(signal)
+
+    def wait(self, environment_up: bool = True) -> float:
+        """Block until the signals settled (or the maximum cooldown passed) and return the cooldown in seconds.
+        Without the environment up (e.g. after a failed run), the signals that need it are not read."""
+        start = time.monotonic()
+        time.sleep(self.min_in_s)
+
+        signals = [signal for signal in self.signals if environment_up or not signal.needs_environment]
+        settled_since: Optional[float] = None
+        while True:
+            values = self.__read_signals(signals)
+            now = time.monotonic()
+
+            available = [signal for signal in signals if values.get(signal.name) is not None]
+            if available and all(signal.is_settled(values[signal.name]) for signal in available):
+                settled_since = settled_since if settled_since is not None else now
+                if now - settled_since >= self.settling_window_in_s:
+                    output.console_log_OK(f"Cooldown: signals settled after {now - start:.1f}s ({self.__describe(values)})")
+                    return now - start
+            else:
+                settled_since = None
+
+            if now - start >= self.max_in_s:
+                output.console_log_WARNING(f"Cooldown: signals did not settle within {self.max_in_s:.0f}s, "
+                                           f"continuing anyway ({self.__describe(values)})")
+                return now - start
+
+            time.sleep(max(min(self.poll_interval_in_s, self.max_in_s - (now - start)), 0))
+
+    def __read_signals(self, signals: List[CooldownSignal]) -> dict:
+        values = {}
+        for signal in signals:
+            try:
+                values[signal.name] = signal.read()
+            except Exception:
+                values[signal.name] = None     # A failed reading does not count for or against settling
+        return values
+
+    def __describe(self, values: dict) -> str:
+        return ", ".join(f"{signal.name} {values[signal.name]:.2f} (baseline {signal.baseline:.2f})" if values.get(signal.name) is not None
+                         else f"{signal.name} unavailable" for signal in self.signals)
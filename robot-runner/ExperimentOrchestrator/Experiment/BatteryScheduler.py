@@ -0,0 +1,81 @@
+import json
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+###     =========================================================
+###     |                                                       |
+###     |                    BatteryScheduler                   |
+###     |       - Learns the charge every variation uses from   |
+###     |         the readings at the start and end of its runs |
+###     |       - In SEMI mode, only asks for a battery swap     |
+###     |         (CONTINUE) when the remaining charge is not   |
+###     |         predicted to cover the next run               |
+###     |       - The learned usage is kept in the experiment   |
+###     |         folder (battery_model.json) across restarts   |
+###     |                                                       |
+###     =========================================================
+class BatteryScheduler:
+    model_file_name:    str = 'battery_model.json'
+
+    __usage: Dict[str, List[float]]
+
+    def __init__(self, experiment_path: str, factor_names: List[str] = None, min_charge: float = 0.0, safety_margin: float = 1.2):
+        self.model_path = Path(experiment_path) / BatteryScheduler.model_file_name
+        self.factor_names = factor_names
+        self.min_charge = min_charge
+        self.safety_margin = safety_margin
+        self.charge: Optional[float] = None     # Last known charge of the battery in the robot
+        self.__usage = self.__load()
+
+    def record_run(self, variation: Dict, charge_before: Optional[float], charge_after: Optional[float]) -> None:
+        self.charge = charge_after
+        if charge_before is None or charge_after is None:
+            output.console_log_WARNING("Battery: no charge readings for this run, its usage is not learned")
+            return
+
+        used = charge_before - charge_after
+        self.__usage.setdefault(self.__key(variation), []).append(used)
+        self.__save()
+        output.console_log_OK(f"Battery: run used {used:.3f} (charge left {charge_after:.3f})")
+
+    def predict_usage(self, variation: Dict) -> Optional[float]:
+        """Predicted charge the variation uses, from its own runs or else from all runs (None if nothing is learned yet)"""
+        usage = self.__usage.get(self.__key(variation)) or [used for usages in self.__usage.values() for used in usages]
+        if not usage:
+            return None
+        return statistics.mean(usage) * self.safety_margin
+
+    def needs_swap(self, next_variation: Dict) -> bool:
+        """Whether the battery has to be swapped before the next run. Without a charge reading after the last run
+        (or any learned usage) it cannot tell, and asks for a swap as it would without the scheduler."""
+        predicted = self.predict_usage(next_variation)
+        if self.charge is None or predicted is None:
+            return True
+
+        remaining = self.charge - predicted
+        if remaining < self.min_charge:
+            output.console_log_WARNING(f"Battery: charge {self.charge:.3f} is not predicted to cover the next run "
+                                       f"(uses ~{predicted:.3f}, minimum {self.min_charge:.3f})")
+            return True
+
+        output.console_log_OK(f"Battery: charge {self.charge:.3f} covers the next run (uses ~{predicted:.3f}), no swap needed")
+        return False
+
+    def __key(self, variation: Dict) -> str:
+        if self.factor_names is None:
+            return 'all'
+        return json.dumps([str(variation.get(factor)) for factor in self.factor_names])
+
+    def __load(self) -> Dict[str, List[float]]:
+        try:
+            with open(self.model_path, 'r') as model_file:
+                return json.load(model_file)['usage']
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def __save(self) -> None:
+        with open(self.model_path, 'w') as model_file:
+            json.dump({'factors': self.factor_names, 'usage': self.__usage}, model_file, indent=2)
@@ -7,11 +7,21 @@ from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
 from ProgressManager.RunTable.RunTableManager import RunTableManager
 from ProgressManager.Output.CSVOutputManager import CSVOutputManager
 from ExperimentOrchestrator.Experiment.Run.RunController import RunController
+from ExperimentOrchestrator.Experiment.Run.RunWatchdog import RunWatchdog
+from ExperimentOrchestrator.Experiment.Run.RunRetryQueue import RunRetryQueue
+from ExperimentOrchestrator.Experiment.SetupEnvironmentManager import SetupEnvironmentManager
+from ExperimentOrchestrator.Experiment.AdaptiveCooldown import AdaptiveCooldown
+from ExperimentOrchestrator.Experiment.IdleBaselineRecorder import IdleBaselineRecorder
+from ExperimentOrchestrator.Experiment.BatteryScheduler import BatteryScheduler
 from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
 from ConfigValidator.CustomErrors.ExperimentOutputErrors import ExperimentOutputPathAlreadyExistsError
 from EventManager.EventSubscriptionController import EventSubscriptionController
 from ConfigValidator.CustomErrors.ProgressErrors import AllRunsCompletedOnRestartError
+from ConfigValidator.CustomErrors.ConfigErrors import ConfigPreflightFailedError
+from ConfigValidator.Config.Validation.Preflight import Preflight
+from ProgressManager.Tracing.Tracer import Tracer
+from ProgressManager.Profiling.HookProfiler import HookProfiler
 
 ###     =========================================================
 ###     |                                                       |
@@ -30,78 +40,288 @@ class ExperimentController:
     config: RobotRunnerConfig      = None
     run_table: List[Dict]          = None
     restarted: bool                = False
+    pending_run_ids: set           = None
     experiment_path_as_string: str = None
     data_manager: CSVOutputManager = None
+    environment: SetupEnvironmentManager = None
+    cooldown: AdaptiveCooldown = None
+    idle_baseline: IdleBaselineRecorder = None
+    battery: BatteryScheduler = None
+    run_queue: RunRetryQueue = None
+    failed_runs: set = None
+    idle_baseline_measured: Dict = None
 
     def __init__(self, config: RobotRunnerConfig):
         self.config = config
+        self.environment = SetupEnvironmentManager(getattr(self.config, 'setup_factors', None))
+        self.cooldown = AdaptiveCooldown(getattr(self.config, 'cooldown_signals', None),
+                                         getattr(self.config, 'cooldown_min_in_ms', 0),
+                                         getattr(self.config, 'cooldown_max_in_ms', None) or self.config.time_between_runs_in_ms,
+                                         getattr(self.config, 'cooldown_settling_window_in_ms', 5000))
+        self.idle_baseline = IdleBaselineRecorder.from_config(self.config)
         self.experiment_path_as_string = str(self.config.experiment_path.absolute())
+        self.configure_instrumentation()
 
         self.data_manager = CSVOutputManager()
         self.data_manager.set_experiment_output_path(self.experiment_path_as_string)
 
-        self.run_table = self.config.create_run_table()
-        self.create_experiment_output_folder()
+        # A RunTableModel is only turned into rows for a new experiment, a restart is validated on its fingerprint
+        design = self.config.create_run_table()
+        if getattr(self.config, 'battery_charge_reader', None) is not None and self.config.operation_type is OperationType.SEMI:
+            model = RunTableManager.get_model(design)
+            self.battery = BatteryScheduler(self.experiment_path_as_string,
+                                            [factor.get_factor_name() for factor in model.get_factors()] if model is not None else None,
+                                            getattr(self.config, 'battery_min_charge', 0.0), getattr(self.config, 'battery_safety_margin', 1.2))
+        self.create_experiment_output_folder(design)
         
         if not self.restarted:
+            self.run_table = RunTableManager.get_run_table(design)
+            RunTableManager.add_missing_reserved_columns(self.run_table, self.idle_baseline.get_columns())
             self.data_manager.write_run_table_to_csv(self.run_table)
+            RunTableManager.write_fingerprint(self.experiment_path_as_string, design)
+            self.pending_run_ids = {variation['__run_id'] for variation in self.run_table}
+            self.report_transition_costs(design)
         else:
             output.console_log_WARNING(">> WARNING << -- Experiment is restarted!")
         
         output.console_log_WARNING("Experiment run table created...")
 
-    def do_experiment(self):
+    def do_experiment(self, preflight: bool = True):
+        try:
+            with Tracer.span("do_experiment", experiment=self.config.name):
+                self.begin_experiment(preflight)
+                try:
+                    while self.perform_next_run():
+                        pass
+                finally:
+                    # Whatever the last setup brought up is stopped, also when the experiment is interrupted
+                    self.environment.teardown()
+                self.end_experiment()
+        finally:
+            self.write_experiment_trace()
+            HookProfiler.merge_run_reports(self.experiment_path_as_string)
+
+    def begin_experiment(self, preflight: bool = True):
         output.console_log_OK("Experiment setup completed...")
+
+        # -- Preflight, before any hook runs (an experiment queue preflights all its experiments at once instead)
+        if preflight and getattr(self.config, 'preflight_enabled', True):
+            with Tracer.span("preflight"):
+                self.run_preflight()
         
         # -- Before experiment
         output.console_log_WARNING("Calling before_experiment config hook")
         
         EventSubscriptionController.raise_event(RobotRunnerEvents.BEFORE_EXPERIMENT)
 
-        # -- Experiment
-        for variation in self.run_table:
-            if variation['__done'] == RunProgress.DONE:
-                continue
-            
-            EventSubscriptionController.raise_event(RobotRunnerEvents.BEFORE_RUN)
-
-            run_controller = RunController(variation, self.config, (self.run_table.index(variation) + 1), len(self.run_table))
-            perform_run = multiprocessing.Process(
-                target=run_controller.do_run,
-                args=[]
-            )
-            perform_run.start()
-            perform_run.join()
-
-            time_btwn_runs = self.config.time_between_runs_in_ms
-            if time_btwn_runs > 0:
-                output.console_log_bold(f"Run fully ended, waiting for: {time_btwn_runs}ms == {time_btwn_runs / 1000}s")
-                time.sleep(time_btwn_runs / 1000)
-            
-            if self.config.operation_type is OperationType.SEMI:
-                EventSubscriptionController.raise_event(RobotRunnerEvents.CONTINUE)
+        # Failed rows are requeued at the end of the run table, up to max_run_attempts attempts
+        self.run_queue = RunRetryQueue([variation for variation in self.run_table
+                                        if variation['__done'] != RunProgress.DONE and variation['__run_id'] in self.pending_run_ids],
+                                       getattr(self.config, 'max_run_attempts', 1), getattr(self.config, 'retry_backoff_in_ms', 0))
+        self.failed_runs = set()
+        self.idle_baseline_measured = None
+
+    def perform_next_run(self) -> bool:
+        """Perform the next run of the experiment (including the time between runs), returns whether runs are left"""
+        if not self.run_queue:
+            return False
+
+        variation = self.run_queue.pop()
         
-        output.console_log_OK("Experiment completed...")
+        EventSubscriptionController.raise_event(RobotRunnerEvents.BEFORE_RUN)
+
+        run_controller = RunController(variation, self.config, (self.run_table.index(variation) + 1), len(self.run_table))
+        with Tracer.span(f"run {variation['__run_id']}"):
+            run_outcome, reason, reports = self.perform_run(run_controller)
+
+        if self.battery is not None:
+            self.battery.record_run(variation, reports.get('battery_before'), reports.get('battery_after'))
+
+        if run_outcome != RunProgress.DONE:
+            self.handle_unsuccessful_run(run_controller, run_outcome, reason)
+            if not self.run_queue.requeue(variation):
+                self.failed_runs.add(variation['__run_id'])
+
+        # The run process wrote its own (nested) spans, merge them into the experiment timeline,
+        # which is written once the experiment ends or is interrupted (see do_experiment)
+        Tracer.add_events(Tracer.read_events_from_file(str(run_controller.run_dir.absolute()) + '/trace.json'))
+
+        # In SEMI mode the operator is asked to continue (e.g. swap the battery) after the cooldown, with a battery scheduler only when needed
+        continue_follows = self.config.operation_type is OperationType.SEMI and \
+                           (self.battery is None or (self.run_queue and self.battery.needs_swap(self.run_queue.peek())))
+
+        # The idle baseline of the next run is recorded during the cooldown, unless the robot is handled after it
+        # or what the profilers run on is not up (e.g. after a failed run)
+        time_btwn_runs = self.config.time_between_runs_in_ms
+        if self.idle_baseline.is_enabled() and self.run_queue and not continue_follows and self.environment.is_set_up() \
+                and (self.cooldown.is_enabled() or time_btwn_runs > 0):
+            self.idle_baseline.start()
+            try:
+                self.cool_down()
+            finally:
+                self.idle_baseline_measured = self.idle_baseline.stop()
+        else:
+            self.cool_down()
+    
+        if continue_follows:
+            # The operator handles the robot (e.g. swaps its battery), what the setup brought up does not survive that
+            self.environment.teardown()
+            EventSubscriptionController.raise_event(RobotRunnerEvents.CONTINUE)
+
+        return bool(self.run_queue)
+
+    def end_experiment(self):
+        if self.failed_runs:
+            output.console_log_FAIL(f"Experiment completed with {len(self.failed_runs)} failed run(s): {', '.join(sorted(self.failed_runs))}, "
+                                    f"restart the experiment to run them again")
+        else:
+            output.console_log_OK("Experiment completed...")
 
         # -- After experiment
         output.console_log_WARNING("Calling after_experiment config hook")
 
         EventSubscriptionController.raise_event(RobotRunnerEvents.AFTER_EXPERIMENT)
 
-    def create_experiment_output_folder(self):
+    def cool_down(self):
+        time_btwn_runs = self.config.time_between_runs_in_ms
+        if self.cooldown.is_enabled():
+            # Waits for the cooldown signals to settle instead of a fixed time
+            with Tracer.span("cooldown"):
+                self.cooldown.wait(environment_up=self.environment.is_set_up())
+        elif time_btwn_runs > 0:
+            output.console_log_bold(f"Run fully ended, waiting for: {time_btwn_runs}ms == {time_btwn_runs / 1000}s")
+            with Tracer.span("time_between_runs"):
+                time.sleep(time_btwn_runs / 1000)
+
+    def perform_run(self, run_controller: RunController):
+        try:
+            if self.environment.prepare(run_controller.run_context):
+                self.idle_baseline_measured = None      # Recorded on the environment that was replaced
+        except Exception as e:
+            self.idle_baseline_measured = None
+            return RunProgress.FAILED, f"setup_environment failed: {type(e).__name__}: {e}", {}
+
+        # The signals are read on what the setup brought up (e.g. the profilers on the robot), so their idle
+        # baselines are measured once it is up, before the first run
+        if self.cooldown.is_enabled():
+            with Tracer.span("cooldown_baseline"):
+                self.cooldown.measure_baselines()
+
+        if self.idle_baseline.is_enabled():
+            # Recorded during the cooldown before this run, or in a dedicated window if none was
+            if self.idle_baseline_measured is None:
+                with Tracer.span("idle_baseline"):
+                    self.idle_baseline_measured = self.idle_baseline.record(getattr(self.config, 'idle_baseline_window_in_ms', 10000) / 1000)
+            IdleBaselineRecorder.apply(run_controller.variation, self.idle_baseline_measured)
+            self.idle_baseline_measured = None
+
+        perform_run = multiprocessing.Process(
+            target=run_controller.do_run,
+            args=[]
+        )
+        perform_run.start()
+
+        # Enforces the run and event timeouts, a hung run is terminated instead of stalling the experiment
+        watchdog = RunWatchdog(perform_run, run_controller.status_queue,
+                               getattr(self.config, 'run_timeout_in_ms', None), getattr(self.config, 'event_timeouts_in_ms', None))
+        return watchdog.supervise(), watchdog.reason, watchdog.reports
+
+    def handle_unsuccessful_run(self, run_controller: RunController, run_outcome: RunProgress, reason: str):
+        output.console_log_FAIL(f"Run {run_controller.variation['__run_id']} {run_outcome.name}: {reason}")
+
+        # Give the config the chance to clean up what the run left behind (e.g. remote processes)
+        output.console_log_WARNING("Calling cleanup_run config hook")
+        try:
+            EventSubscriptionController.raise_event(RobotRunnerEvents.CLEANUP_RUN, run_controller.run_context)
+        except Exception as e:
+            output.console_log_FAIL(f"cleanup_run config hook failed: {e}")
+
+        # The state of the environment after a failed run is unknown, the next run sets it up again
+        try:
+            self.environment.teardown()
+        except Exception as e:
+            output.console_log_FAIL(f"teardown_environment config hook failed: {e}")
+
+        # Rows that did not complete are marked, and are retried or run again when the experiment is restarted
+        run_controller.variation['__done'] = run_outcome
+        RunRetryQueue.record_error(run_controller.variation, reason)
+        self.data_manager.update_row_data(dict(run_controller.variation))
+        output.console_log_WARNING("Continuing with the next run...")
+
+    def configure_instrumentation(self):
+        # Tracing and profiling are process wide, an experiment queue re-applies them when it switches experiments
+        Tracer.configure(getattr(self.config, 'tracing_enabled', True), getattr(self.config, 'trace_categories', None))
+        HookProfiler.configure(getattr(self.config, 'profiling_modes', None), getattr(self.config, 'profiling_top_n', 25))
+
+    def run_preflight(self):
+        output.console_log_WARNING("Running preflight probes...")
+        results = Preflight.run(self.config)
+        if results:
+            Preflight.print_report(results)
+
+        if Preflight.has_failures(results):
+            raise ConfigPreflightFailedError
+        output.console_log_OK("Preflight completed...")
+
+    def write_experiment_trace(self):
+        if Tracer.is_traced('orchestration'):
+            Tracer.write_to_file(self.experiment_path_as_string + '/trace.json', process_name="robot-runner")
+
+    def report_transition_costs(self, design):
+        model = RunTableManager.get_model(design)
+        if model is None or not model.get_factor_change_costs() or not self.run_table:
+            return
+
+        estimate = model.get_transition_cost_estimate()
+        output.console_log_OK(f"Run order groups the factor changes: ~{estimate['transition_cost_in_s'] / 60:.1f} min of transitions instead of "
+                              f"~{estimate['uniform_transition_cost_in_s'] / 60:.1f} min for a uniformly randomized order "
+                              f"(estimated {estimate['saved_in_s'] / 60:.1f} min saved)")
+
+    def migrate_design(self, design):
+        output.console_log_WARNING("The design in the config changed, migrating the run table of the existing experiment...")
+        run_table, summary = RunTableManager.migrate_run_table(self.experiment_path_as_string, design,
+                                                               self.data_manager.read_run_table_from_csv())
+
+        self.data_manager.write_run_table_to_csv(run_table)
+        RunTableManager.write_fingerprint(self.experiment_path_as_string, design)
+
+        output.console_log_OK(f"Run table migrated (old run table backed up as run_table.backup_{summary['backup_suffix']}.csv): "
+                              f"{summary['kept_done']} completed and {summary['kept_todo']} pending runs kept, {summary['added']} runs added")
+        if summary['dropped']:
+            output.console_log_WARNING(f"Runs no longer in the design (dropped): {', '.join(summary['dropped'])}")
+        if summary['added_columns']:
+            output.console_log_WARNING(f"Columns added (empty for the kept runs): {', '.join(summary['added_columns'])}")
+        if summary['dropped_columns']:
+            output.console_log_WARNING(f"Columns dropped: {', '.join(summary['dropped_columns'])}")
+
+    def create_experiment_output_folder(self, design):
         try:
             self.config.experiment_path.mkdir(parents=True, exist_ok=False)
         except FileExistsError:
-            if RunTableManager.are_config_and_restart_csv_equal(self.config):
-                self.run_table = self.data_manager.read_run_table_from_csv()
-                self.restarted = True
-                todo_run_found = False
-                
-                for variation in self.run_table:
-                    todo_run_found = (variation['__done'] != RunProgress.DONE)
-                    if todo_run_found: return
-
-                if self.restarted and not todo_run_found:
+            if not RunTableManager.are_config_and_restart_design_equal(self.experiment_path_as_string, design):
+                if not getattr(self.config, 'allow_design_migration', False):
+                    raise ExperimentOutputPathAlreadyExistsError
+                self.migrate_design(design)
+
+            # The progress index answers whether anything is left without reading the run table
+            pending_run_ids = self.data_manager.read_pending_run_ids()
+            if pending_run_ids is not None and not pending_run_ids:
+                raise AllRunsCompletedOnRestartError
+
+            self.run_table = self.data_manager.read_run_table_from_csv()
+            self.restarted = True
+
+            added_columns = RunTableManager.add_missing_reserved_columns(self.run_table, self.idle_baseline.get_columns())
+            if added_columns:
+                # Written as copies, the CSV writer turns the progress of the rows it writes into strings
+                self.data_manager.write_run_table_to_csv([dict(variation) for variation in self.run_table])
+                output.console_log_WARNING(f"Columns added to the run table of the existing experiment (empty for its runs): {', '.join(added_columns)}")
+
+            if pending_run_ids is None:     # Experiments started before the progress index existed
+                pending_run_ids = [variation['__run_id'] for variation in self.run_table if variation['__done'] != RunProgress.DONE]
+                if not pending_run_ids:
                     raise AllRunsCompletedOnRestartError
-            else:
-                raise ExperimentOutputPathAlreadyExistsError
+                self.data_manager.write_progress_index(pending_run_ids)
+                RunTableManager.write_fingerprint(self.experiment_path_as_string, design)
+
+            self.pending_run_ids = set(pending_run_ids)
@@ -0,0 +1,255 @@
+import json
+import os
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
+from EventManager.Models.EventSubscription import EventSubscription
+from EventManager.EventSubscriptionController import EventSubscriptionController
+from ConfigValidator.Config.ConfigLoader import load_config_module
+from ConfigValidator.Config.Validation.ConfigValidator import ConfigValidator
+from ConfigValidator.Config.Validation.Preflight import Preflight
+from ConfigValidator.CustomErrors.BaseError import BaseError
+from ConfigValidator.CustomErrors.ConfigErrors import (ConfigInvalidError, ConfigInvalidClassNameError,
+                                                       ConfigQueueInvalidError, ConfigPreflightFailedError)
+from ConfigValidator.CustomErrors.ProgressErrors import AllRunsCompletedOnRestartError
+from ExperimentOrchestrator.Experiment.ExperimentController import ExperimentController
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Profiling.HookProfiler import HookProfiler
+from ProgressManager.Tracing.Tracer import Tracer
+
+
+class QueuedExperiment:
+    """A config in the queue, with the event subscriptions it made when it was instantiated"""
+    __active: 'QueuedExperiment' = None
+
+    def __init__(self, config_path: str, config, subscriptions: Dict[RobotRunnerEvents, List[EventSubscription]]):
+        self.config_path = config_path
+        self.config = config
+        self.subscriptions = subscriptions
+        self.controller: ExperimentController = None
+        self.trace_events: List[dict] = []
+
+    def activate(self) -> None:
+        """Make the hooks (and tracing and profiling settings) of this experiment the ones in use"""
+        EventSubscriptionController.set_subscriptions(self.subscriptions)
+        if self.controller is not None:
+            self.controller.configure_instrumentation()
+
+        # Every experiment has its own trace, the one of the experiment switched away from is kept until it is active again
+        if QueuedExperiment.__active is not self:
+            previous_events = Tracer.swap_events(self.trace_events)
+            if QueuedExperiment.__active is not None:
+                QueuedExperiment.__active.trace_events = previous_events
+            QueuedExperiment.__active = self
+
+
+###     =========================================================
+###     |                                                       |
+###     |                    ExperimentQueue                    |
+###     |       - Validates and preflights all configs before   |
+###     |         the first experiment starts                   |
+###     |       - Runs the experiments back to back in this     |
+###     |         process, in sequence or interleaved run by    |
+###     |         run on the same targets                       |
+###     |       - Keeps its state next to the results, a queue  |
+###     |         started again skips the completed             |
+###     |         experiments and restarts the interrupted one  |
+###     |                                                       |
+###     =========================================================
+class ExperimentQueue:
+    state_file_name: str = 'experiment_queue.json'
+
+    experiments: List[QueuedExperiment]
+    state: Dict = None
+    state_path: Path = None
+
+    def __init__(self, config_paths: List[str], interleave: bool = False):
+        self.config_paths = [os.path.abspath(config_path) for config_path in config_paths]
+        self.interleave = interleave
+        self.experiments = []
+
+    @staticmethod
+    def load_experiment(config_path: str) -> QueuedExperiment:
+        config_file = load_config_module(config_path)
+
+        # Every config subscribes its hooks when it is instantiated, each experiment keeps its own
+        EventSubscriptionController.clear_subscriptions()
+        config = config_file.RobotRunnerConfig()
+        subscriptions = EventSubscriptionController.get_subscriptions()
+        EventSubscriptionController.clear_subscriptions()
+        return QueuedExperiment(config_path, config, subscriptions)
+
+    def validate(self) -> None:
+        """Load and validate every config, then preflight all their targets at once (a shared target is probed once)"""
+        invalid = []
+        for config_path in self.config_paths:
+            output.console_log_bold(f"Validating {config_path}")
+            try:
+                experiment = ExperimentQueue.load_experiment(config_path)
+                ConfigValidator.validate_config(experiment.config)
+            except ConfigInvalidError:
+                invalid.append((config_path, "invalid attributes, see its config attribute table"))
+                continue
+            except ConfigInvalidClassNameError:
+                invalid.append((config_path, "does not have a RobotRunnerConfig class"))
+                continue
+            except Exception as e:
+                invalid.append((config_path, f"could not be loaded ({type(e).__name__})"))
+                continue
+
+            same_path = next((other for other in self.experiments if other.config.experiment_path == experiment.config.experiment_path), None)
+            if same_path is not None:
+                invalid.append((config_path, f"writes to the same experiment_path as {same_path.config_path}"))
+                continue
+            self.experiments.append(experiment)
+
+        if invalid:
+            raise ConfigQueueInvalidError(invalid)
+
+        preflight_configs = [experiment.config for experiment in self.experiments if getattr(experiment.config, 'preflight_enabled', True)]
+        if preflight_configs:
+            output.console_log_WARNING("Running preflight probes for all experiments in the queue...")
+            results = Preflight.run_many(preflight_configs)
+            if results:
+                Preflight.print_report(results)
+            if Preflight.has_failures(results):
+                raise ConfigPreflightFailedError
+
+        output.console_log_OK(f"All {len(self.experiments)} experiment(s) in the queue are valid")
+
+    def run(self) -> None:
+        self.load_state()
+
+        pending = [experiment for experiment in self.experiments if experiment.config_path not in self.state['completed']]
+        if len(pending) < len(self.experiments):
+            output.console_log_OK(f"Skipping {len(self.experiments) - len(pending)} experiment(s) the queue completed before")
+
+        if self.interleave:
+            self.__run_interleaved(pending)
+        else:
+            self.__run_in_sequence(pending)
+
+        failed = [config_path for config_path in self.config_paths if config_path in self.state['failed']]
+        if failed:
+            output.console_log_FAIL(f"Experiment queue completed with {len(failed)} failed experiment(s): {', '.join(failed)}, "
+                                    f"start the queue again to retry them")
+        else:
+            output.console_log_OK(f"Experiment queue completed, all {len(self.experiments)} experiment(s) done")
+
+    def load_state(self) -> None:
+        # The queue is identified by its configs, the same queue started again is resumed
+        self.state_path = Path(str(self.experiments[0].config.results_output_path)).expanduser() / ExperimentQueue.state_file_name
+        try:
+            with open(self.state_path, 'r') as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            state = None
+
+        if state is not None and state.get('configs') == self.config_paths:
+            output.console_log_WARNING(">> WARNING << -- Experiment queue is restarted!")
+            self.state = state
+        else:
+            if state is not None:
+                output.console_log_WARNING(f"Replacing the state of a different experiment queue in {self.state_path}")
+            self.state = {'configs': self.config_paths, 'completed': [], 'failed': {}, 'current': None}
+
+        self.state['interleave'] = self.interleave
+        self.save_state()
+
+    def save_state(self) -> None:
+        self.state['updated_at'] = datetime.now().isoformat()
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w') as state_file:
+            json.dump(self.state, state_file, indent=2)
+
+    def __run_in_sequence(self, pending: List[QueuedExperiment]) -> None:
+        for index, experiment in enumerate(pending):
+            output.console_log_bold(f"Experiment queue: starting {experiment.config.name} ({index + 1} of {len(pending)})")
+            self.state['current'] = experiment.config_path
+            self.save_state()
+
+            experiment.activate()
+            try:
+                experiment.controller = ExperimentController(experiment.config)
+                experiment.controller.do_experiment(preflight=False)     # Preflighted by validate
+            except AllRunsCompletedOnRestartError:
+                output.console_log_OK(f"All runs of {experiment.config.name} were already completed")
+            except Exception as e:
+                self.__fail(experiment, e)
+                continue
+            self.__complete(experiment)
+
+        self.state['current'] = None
+        self.save_state()
+
+    def __run_interleaved(self, pending: List[QueuedExperiment]) -> None:
+        active = []
+        for experiment in pending:
+            experiment.activate()
+            try:
+                experiment.controller = ExperimentController(experiment.config)
+                experiment.controller.begin_experiment(preflight=False)  # Preflighted by validate
+                active.append(experiment)
+            except AllRunsCompletedOnRestartError:
+                output.console_log_OK(f"All runs of {experiment.config.name} were already completed")
+                self.__complete(experiment)
+            except Exception as e:
+                self.__fail(experiment, e)
+
+        # One run of every experiment in turn, so their runs are spread evenly over the session
+        try:
+            while active:
+                for experiment in list(active):
+                    # The experiments share their targets, only one of them has its environment set up at a time
+                    for other in active:
+                        if other is not experiment and other.controller.environment.current_setup is not None:
+                            other.activate()
+                            self.__teardown_environment(other)
+
+                    experiment.activate()
+                    try:
+                        if experiment.controller.perform_next_run():
+                            continue
+                        self.__teardown_environment(experiment)
+                        experiment.controller.end_experiment()
+                        self.__complete(experiment)
+                    except Exception as e:
+                        self.__teardown_environment(experiment)
+                        self.__fail(experiment, e)
+
+                    experiment.controller.write_experiment_trace()
+                    HookProfiler.merge_run_reports(experiment.controller.experiment_path_as_string)
+                    active.remove(experiment)
+        finally:
+            # Whatever is still set up is stopped, also when the queue is interrupted
+            for experiment in active:
+                experiment.activate()
+                self.__teardown_environment(experiment)
+                experiment.controller.write_experiment_trace()
+
+    def __complete(self, experiment: QueuedExperiment) -> None:
+        output.console_log_OK(f"Experiment queue: {experiment.config.name} completed")
+        if experiment.config_path not in self.state['completed']:
+            self.state['completed'].append(experiment.config_path)
+        self.state['failed'].pop(experiment.config_path, None)
+        self.save_state()
+
+    def __fail(self, experiment: QueuedExperiment, error: Exception) -> None:
+        # A failed experiment does not stop the queue, it is started again when the queue is
+        if isinstance(error, BaseError):
+            print(f"\n{error}")
+        else:
+            traceback.print_exception(type(error), error, error.__traceback__)
+        output.console_log_FAIL(f"Experiment queue: {experiment.config.name} failed, continuing with the next experiment")
+        self.state['failed'][experiment.config_path] = type(error).__name__ if isinstance(error, BaseError) else f"{type(error).__name__}: {error}"[:200]
+        self.save_state()
+
+    @staticmethod
+    def __teardown_environment(experiment: QueuedExperiment) -> None:
+        try:
+            experiment.controller.environment.teardown()
+        except Exception as e:
+            output.console_log_FAIL(f"teardown_environment config hook of {experiment.config.name} failed: {e}")
@@ -0,0 +1,102 @@
+import time
+from typing import Dict, List, Optional
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+###     =========================================================
+###     |                                                       |
+###     |                  IdleBaselineRecorder                 |
+###     |       - Keeps the power and resource profilers        |
+###     |         measuring while the robot idles between runs  |
+###     |       - Stores the mean idle power, CPU and memory    |
+###     |         just before a run in its reserved columns,    |
+###     |         for baseline-subtracted energy at analysis    |
+###     |       - The columns are only added to the run table   |
+###     |         when idle baselines are recorded              |
+###     |                                                       |
+###     =========================================================
+class IdleBaselineRecorder:
+    # Reserved run table columns, added to the run table and filled in before every run when idle baselines are recorded
+    power_column:       str = '__idle_power_mw'
+    cpu_column:         str = '__idle_cpu_util'
+    mem_column:         str = '__idle_mem_util'
+    reserved_columns:   List[str] = [power_column, cpu_column, mem_column]
+
+    __started: list
+
+    def __init__(self, power_profiler=None, resource_profiler=None):
+        # Profilers with start_sample / stop_sample (e.g. PowerProfiler, ResourceProfiler)
+        self.power_profiler = power_profiler
+        self.resource_profiler = resource_profiler
+        self.__started = []
+
+    @staticmethod
+    def from_config(config) -> 'IdleBaselineRecorder':
+        from Plugins.Profilers.PowerProfiler import PowerProfiler
+        from Plugins.Profilers.ResourceProfiler import ResourceProfiler
+
+        if not getattr(config, 'idle_baseline_enabled', False):
+            return IdleBaselineRecorder()
+
+        # Profilers read by the cooldown signals are busy between runs, they cannot measure for both at once
+        cooldown_profilers = [getattr(signal, 'source_profiler', None) for signal in getattr(config, 'cooldown_signals', None) or []]
+        profilers = [value for value in vars(config).values() if not any(value is profiler for profiler in cooldown_profilers)]
+        return IdleBaselineRecorder(next((profiler for profiler in profilers if isinstance(profiler, PowerProfiler)), None),
+                                    next((profiler for profiler in profilers if isinstance(profiler, ResourceProfiler)), None))
+
+    def is_enabled(self) -> bool:
+        return self.power_profiler is not None or self.resource_profiler is not None
+
+    def get_columns(self) -> List[str]:
+        """The reserved columns of the profilers in use"""
+        columns = [IdleBaselineRecorder.power_column] if self.power_profiler is not None else []
+        if self.resource_profiler is not None:
+            columns += [IdleBaselineRecorder.cpu_column, IdleBaselineRecorder.mem_column]
+        return columns
+
+    def start(self) -> None:
+        self.__started = []
+        for profiler in [self.power_profiler, self.resource_profiler]:
+            if profiler is None:
+                continue
+            try:
+                profiler.start_sample()
+                self.__started.append(profiler)
+            except Exception as e:
+                output.console_log_FAIL(f"Idle baseline: could not start {type(profiler).__name__} ({type(e).__name__}: {e})")
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        """Stop the profilers started by start and return the mean idle values per reserved column (None if not measured)"""
+        baseline = {column: None for column in IdleBaselineRecorder.reserved_columns}
+        for profiler in self.__started:
+            try:
+                samples = profiler.stop_sample()
+            except Exception as e:
+                output.console_log_FAIL(f"Idle baseline: could not stop {type(profiler).__name__} ({type(e).__name__}: {e})")
+                continue
+
+            if profiler is self.power_profiler:
+                baseline[IdleBaselineRecorder.power_column] = IdleBaselineRecorder.__mean(samples.get('power_mW'))
+            else:
+                baseline[IdleBaselineRecorder.cpu_column] = IdleBaselineRecorder.__mean(samples.get('cpu_util'))
+                baseline[IdleBaselineRecorder.mem_column] = IdleBaselineRecorder.__mean(samples.get('mem_util'))
+
+        self.__started = []
+        return baseline
+
+    def record(self, window_in_s: float) -> Dict[str, Optional[float]]:
+        """Measure a dedicated idle window, for runs that are not preceded by a cooldown (e.g. the first run)"""
+        output.console_log_bold(f"Recording the idle baseline for {window_in_s}s...")
+        self.start()
+        time.sleep(window_in_s)
+        return self.stop()
+
+    @staticmethod
+    def apply(variation: Dict, baseline: Dict[str, Optional[float]]) -> None:
+        for column, value in baseline.items():
+            if column in variation and value is not None:
+                variation[column] = round(value, 3)
+
+    @staticmethod
+    def __mean(values) -> Optional[float]:
+        return sum(values) / len(values) if values else None
@@ -1,7 +1,7 @@
 from ProgressManager.Output.CSVOutputManager import CSVOutputManager
 from pathlib import Path
 from abc import ABC, abstractmethod
-from multiprocessing import Event
+from multiprocessing import Event, Queue
 
 from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
 from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
@@ -25,6 +25,8 @@ class IRunController(ABC):
         self.data_manager = CSVOutputManager(str(self.config.experiment_path.absolute()))
 
         self.run_completed_event = Event()
+        # The run process reports its progress (e.g. the event it is handling) to the experiment process
+        self.status_queue = Queue()
 
         print(f"\n-----------------NEW RUN [{current_run} / {total_runs}]-----------------\n")
 
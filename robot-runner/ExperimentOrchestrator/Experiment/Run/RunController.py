@@ -1,42 +1,86 @@
+import time
 from ProgressManager.RunTable.Models.RunProgress import RunProgress
 from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
 from EventManager.EventSubscriptionController import EventSubscriptionController
 from ExperimentOrchestrator.Architecture.Processify import processify
 from ExperimentOrchestrator.Experiment.Run.IRunController import IRunController
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Tracing.Tracer import Tracer
+from ProgressManager.Profiling.HookProfiler import HookProfiler
+from ExperimentOrchestrator.Misc.SelfOverheadMonitor import SelfOverheadMonitor
 
 class RunController(IRunController):
     @processify
     def do_run(self):
+        # The run process inherits the spans recorded so far by the experiment, the run trace only covers this run
+        Tracer.reset()
+        HookProfiler.begin_run()
+        try:
+            with Tracer.span(f"do_run {self.variation['__run_id']}", run_nr=self.current_run):
+                self.__perform_run()
+        except Exception as e:
+            # The summary ends up in the run table, the full traceback is printed by processify
+            self.status_queue.put(('error', f"{type(e).__name__}: {e}", time.time()))
+            raise
+        finally:
+            HookProfiler.end_run(str(self.run_dir.absolute()))
+            if Tracer.is_traced('orchestration'):
+                Tracer.write_to_file(str(self.run_dir.absolute()) + '/trace.json', process_name=f"run {self.variation['__run_id']}")
+
+    def __perform_run(self):
+        # The CPU time, memory and context switches of robot-runner itself (incl. the processes spawned by the hooks)
+        # are accounted per phase, so they can be separated from the measured system.
+        overhead = SelfOverheadMonitor()
+
         # -- Start run
         output.console_log_WARNING("Calling start_run config hook")
-        EventSubscriptionController.raise_event(RobotRunnerEvents.START_RUN, self.run_context)
+        self.__raise_phase_event(overhead, 'start_run', RobotRunnerEvents.START_RUN)
+        self.__report_battery_charge('battery_before')
 
         # -- Start measurement
         output.console_log_WARNING("... Starting measurement ...")
-        EventSubscriptionController.raise_event(RobotRunnerEvents.START_MEASUREMENT, self.run_context)
+        self.__raise_phase_event(overhead, 'start_measurement', RobotRunnerEvents.START_MEASUREMENT)
 
         # -- Start interaction
         output.console_log_WARNING("Calling interaction config hook")
 
-        EventSubscriptionController.raise_event(RobotRunnerEvents.LAUNCH_MISSION, self.run_context)
+        self.__raise_phase_event(overhead, 'launch_mission', RobotRunnerEvents.LAUNCH_MISSION)
         output.console_log_OK("... Run completed ...")
 
         # -- Stop measurement
         output.console_log_WARNING("... Stopping measurement ...")
-        EventSubscriptionController.raise_event(RobotRunnerEvents.STOP_MEASUREMENT, self.run_context)
+        self.__raise_phase_event(overhead, 'stop_measurement', RobotRunnerEvents.STOP_MEASUREMENT)
+        self.__report_battery_charge('battery_after')
 
         # -- Stop run
         output.console_log_WARNING("Calling stop_run config hook")
-        EventSubscriptionController.raise_event(RobotRunnerEvents.STOP_RUN, self.run_context)
-
-        updated_run_data = EventSubscriptionController.raise_event(RobotRunnerEvents.POPULATE_RUN_DATA, self.run_context)
-        if updated_run_data is None:
-            row = self.run_context.run_variation
-            row['__done'] = RunProgress.DONE
-            self.data_manager.update_row_data(row)
-        else:
-            updated_run_data['__done'] = RunProgress.DONE
-            self.data_manager.update_row_data(updated_run_data)
-
-        
+        self.__raise_phase_event(overhead, 'stop_run', RobotRunnerEvents.STOP_RUN)
+
+        updated_run_data = self.__raise_phase_event(overhead, 'populate_run_data', RobotRunnerEvents.POPULATE_RUN_DATA)
+        overhead.write_to_file(str(self.run_dir.absolute()) + '/overhead.csv')
+
+        row = self.run_context.run_variation if updated_run_data is None else updated_run_data
+        for column, value in overhead.get_summary().items():
+            if column in row:
+                row[column] = value
+
+        row['__done'] = RunProgress.DONE
+        self.data_manager.update_row_data(row)
+
+    def __report_battery_charge(self, key: str):
+        # Read while the run has the robot up, the battery scheduler in the experiment process learns the usage per variation
+        reader = getattr(self.config, 'battery_charge_reader', None)
+        if reader is None:
+            return
+        try:
+            self.status_queue.put(('report', key, float(reader())))
+        except Exception as e:
+            output.console_log_WARNING(f"Could not read the battery charge: {type(e).__name__}: {e}")
+
+    def __raise_phase_event(self, overhead: SelfOverheadMonitor, phase: str, event: RobotRunnerEvents):
+        self.status_queue.put(('event', event.name, time.time()))     # Lets the watchdog enforce per-event timeouts
+        overhead.begin_phase(phase)
+        try:
+            return EventSubscriptionController.raise_event(event, self.run_context)
+        finally:
+            overhead.end_phase()
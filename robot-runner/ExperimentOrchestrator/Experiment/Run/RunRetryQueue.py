@@ -0,0 +1,81 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+###     =========================================================
+###     |                                                       |
+###     |                     RunRetryQueue                     |
+###     |       - Hands out the rows of the run table that      |
+###     |         still have to be performed, in order          |
+###     |       - Failed rows are requeued at the end, and      |
+###     |         only handed out again after the backoff,      |
+###     |         until they used up their attempts             |
+###     |                                                       |
+###     =========================================================
+class RunRetryQueue:
+    # Reserved run table columns, filled in by robot-runner
+    attempts_column:    str = '__attempts'
+    error_column:       str = '__error'
+    reserved_columns:   List[str] = [attempts_column, error_column]
+
+    max_error_length:   int = 200
+
+    __pending: Deque[Tuple[float, Dict]]
+    __attempts: Dict[str, int]
+
+    def __init__(self, run_table: List[Dict], max_attempts: int = 1, backoff_in_ms: int = 0):
+        self.max_attempts = max(max_attempts or 1, 1)
+        self.backoff_in_s = (backoff_in_ms or 0) / 1000
+        # Attempts are counted per session, a restarted experiment gives failed rows a fresh set of attempts
+        self.__attempts = {}
+        self.__pending = deque((0.0, variation) for variation in run_table)
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def pop(self) -> Dict:
+        """The next row that is due, waits for the backoff if every pending row is still backing off"""
+        now = time.monotonic()
+        for i, (ready_at, variation) in enumerate(self.__pending):
+            if ready_at <= now:
+                del self.__pending[i]
+                return self.__start_attempt(variation)
+
+        ready_at, variation = min(self.__pending, key=lambda item: item[0])
+        output.console_log_bold(f"Waiting {ready_at - now:.1f}s before retrying {variation['__run_id']}")
+        time.sleep(ready_at - now)
+        self.__pending.remove((ready_at, variation))
+        return self.__start_attempt(variation)
+
+    def peek(self) -> Dict:
+        """The row pop returns next (if no backoff ends in the meantime)"""
+        now = time.monotonic()
+        due = [variation for ready_at, variation in self.__pending if ready_at <= now]
+        return due[0] if due else min(self.__pending, key=lambda item: item[0])[1]
+
+    def requeue(self, variation: Dict) -> bool:
+        """Requeue a failed row at the end of the queue, returns False if it used up its attempts"""
+        attempts = self.__attempts.get(variation['__run_id'], 0)
+        if attempts >= self.max_attempts:
+            output.console_log_FAIL(f"Run {variation['__run_id']} failed {attempts} attempt(s), giving up on it")
+            return False
+
+        self.__pending.append((time.monotonic() + self.backoff_in_s, variation))
+        output.console_log_WARNING(f"Run {variation['__run_id']} requeued (attempt {attempts + 1} of {self.max_attempts} "
+                                   f"after {self.backoff_in_s}s backoff)")
+        return True
+
+    @staticmethod
+    def record_error(variation: Dict, reason: str) -> None:
+        if RunRetryQueue.error_column in variation:
+            summary = " ".join(str(reason).split())
+            variation[RunRetryQueue.error_column] = summary[:RunRetryQueue.max_error_length]
+
+    def __start_attempt(self, variation: Dict) -> Dict:
+        self.__attempts[variation['__run_id']] = self.__attempts.get(variation['__run_id'], 0) + 1
+        if RunRetryQueue.attempts_column in variation:
+            previous = variation[RunRetryQueue.attempts_column]
+            variation[RunRetryQueue.attempts_column] = (previous if isinstance(previous, int) else 0) + 1
+        return variation
@@ -0,0 +1,107 @@
+import queue
+import time
+from multiprocessing import Process, Queue
+from typing import Dict, Optional
+
+from ExperimentOrchestrator.Misc import ProcessTree
+from ProgressManager.RunTable.Models.RunProgress import RunProgress
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+###     =========================================================
+###     |                                                       |
+###     |                      RunWatchdog                      |
+###     |       - Supervises a run process from the             |
+###     |         experiment process                            |
+###     |       - Enforces the run timeout and per-event        |
+###     |         timeouts, using the progress the run          |
+###     |         process reports on its status queue           |
+###     |       - Terminates the whole run process tree on      |
+###     |         expiry                                        |
+###     |                                                       |
+###     =========================================================
+class RunWatchdog:
+    poll_interval_in_s: float = 0.5
+    grace_period_in_s:  float = 5.0
+    final_drain_wait_in_s: float = 0.1
+
+    process: Process
+    status_queue: Queue
+    run_timeout_in_s: Optional[float]
+    event_timeouts_in_s: Dict[str, float]
+
+    current_event: str = None
+    current_event_at: float = None
+    error: str = None
+    reason: str = None
+    reports: Dict = None
+
+    def __init__(self, process: Process, status_queue: Queue, run_timeout_in_ms: int = None, event_timeouts_in_ms: Dict = None):
+        self.process = process
+        self.status_queue = status_queue
+        self.reports = {}   # Values the run process reported for the experiment process (e.g. battery charge readings)
+        self.run_timeout_in_s = run_timeout_in_ms / 1000 if run_timeout_in_ms else None
+        # Keys can be RobotRunnerEvents or their names
+        self.event_timeouts_in_s = {getattr(event, 'name', event): timeout / 1000 for event, timeout in (event_timeouts_in_ms or {}).items()}
+
+    def supervise(self) -> RunProgress:
+        """Wait for the (started) run process and return how the run ended: DONE, FAILED or TIMEOUT"""
+        run_deadline = time.monotonic() + self.run_timeout_in_s if self.run_timeout_in_s else None
+        event_deadline = None
+
+        while True:
+            self.process.join(timeout=self.poll_interval_in_s)
+
+            if self.__handle_messages(self.__drain_status_queue()):
+                timeout = self.event_timeouts_in_s.get(self.current_event)
+                # Measured from when the event was raised in the run process
+                event_deadline = time.monotonic() - (time.time() - self.current_event_at) + timeout if timeout else None
+
+            if not self.process.is_alive():
+                break
+
+            now = time.monotonic()
+            if run_deadline is not None and now >= run_deadline:
+                return self.__terminate(f"run exceeded its timeout of {self.run_timeout_in_s}s (during {self.current_event})")
+            if event_deadline is not None and now >= event_deadline:
+                return self.__terminate(f"{self.current_event} exceeded its timeout of {self.event_timeouts_in_s[self.current_event]}s")
+
+        # The process can exit between draining and the liveness check, its last messages (e.g. the error) are still queued
+        self.__handle_messages(self.__drain_status_queue(wait_in_s=self.final_drain_wait_in_s))
+
+        if self.process.exitcode != 0:
+            self.reason = f"{self.error} (during {self.current_event})" if self.error else \
+                          f"run process exited with code {self.process.exitcode} (during {self.current_event})"
+            return RunProgress.FAILED
+        return RunProgress.DONE
+
+    def __handle_messages(self, messages: list) -> bool:
+        """Apply the messages of the run process, returns whether a new event started"""
+        event_started = False
+        for message in messages:
+            if message[0] == 'event':
+                self.current_event, self.current_event_at = message[1], message[2]
+                event_started = True
+            elif message[0] == 'error':
+                self.error = message[1]
+            elif message[0] == 'report':
+                self.reports[message[1]] = message[2]
+        return event_started
+
+    def __terminate(self, reason: str) -> RunProgress:
+        self.reason = reason
+        output.console_log_FAIL(f"Watchdog: {reason}, terminating the run process tree")
+        killed = ProcessTree.terminate_tree(self.process.pid, self.grace_period_in_s)
+        if killed:
+            output.console_log_WARNING(f"Watchdog: killed {len(killed)} process(es) that ignored SIGTERM")
+        self.process.join()
+        self.__handle_messages(self.__drain_status_queue(wait_in_s=self.final_drain_wait_in_s))
+        return RunProgress.TIMEOUT
+
+    def __drain_status_queue(self, wait_in_s: float = 0.0) -> list:
+        """All queued messages, waiting up to wait_in_s for every next one (messages of an exited process can still be in transit)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.status_queue.get(timeout=wait_in_s) if wait_in_s else self.status_queue.get_nowait())
+            except (queue.Empty, OSError, ValueError):
+                return messages
@@ -0,0 +1,75 @@
+from typing import List, Optional, Tuple
+
+from EventManager.Models.RobotRunnerEvents import RobotRunnerEvents
+from EventManager.EventSubscriptionController import EventSubscriptionController
+from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Tracing.Tracer import Tracer
+
+###     =========================================================
+###     |                                                       |
+###     |                SetupEnvironmentManager                |
+###     |       - Raises SETUP_ENVIRONMENT in the experiment    |
+###     |         process only when the treatments of the       |
+###     |         setup factors change between consecutive      |
+###     |         runs, TEARDOWN_ENVIRONMENT before the next    |
+###     |         setup and at the end of the experiment        |
+###     |       - What the setup brings up stays warm across    |
+###     |         the runs in between (the run processes are    |
+###     |         forked from the experiment process)           |
+###     |       - Without setup factors ([]), the environment   |
+###     |         is set up once for all runs                   |
+###     |                                                       |
+###     =========================================================
+class SetupEnvironmentManager:
+    setup_factors: Optional[List[str]]
+    current_setup: Optional[Tuple] = None
+    current_context: Optional[RobotRunnerContext] = None
+
+    def __init__(self, setup_factors: List[str] = None):
+        # None disables the setup hooks
+        self.setup_factors = list(setup_factors) if setup_factors is not None else None
+
+    def is_enabled(self) -> bool:
+        return self.setup_factors is not None
+
+    def is_set_up(self) -> bool:
+        return self.current_setup is not None
+
+    def prepare(self, run_context: RobotRunnerContext) -> bool:
+        """Make sure the environment of the upcoming run is set up, re-using the current one if its setup factors match.
+        Returns whether it was (newly) set up."""
+        if not self.is_enabled():
+            return False
+
+        setup = tuple(run_context.run_variation[factor] for factor in self.setup_factors)
+        if setup == self.current_setup:
+            output.console_log_OK(f"Re-using the environment set up for {self.__describe(setup)}")
+            self.current_context = run_context
+            return False
+
+        self.teardown()
+
+        output.console_log_WARNING(f"Calling setup_environment config hook for {self.__describe(setup)}")
+        with Tracer.span("setup_environment", setup=self.__describe(setup)):
+            EventSubscriptionController.raise_event(RobotRunnerEvents.SETUP_ENVIRONMENT, run_context)
+
+        # Only a completed setup is re-used, a failed one is set up again for the next run
+        self.current_setup = setup
+        self.current_context = run_context
+        return True
+
+    def teardown(self) -> None:
+        if self.current_setup is None:
+            return
+
+        output.console_log_WARNING(f"Calling teardown_environment config hook for {self.__describe(self.current_setup)}")
+        try:
+            with Tracer.span("teardown_environment", setup=self.__describe(self.current_setup)):
+                EventSubscriptionController.raise_event(RobotRunnerEvents.TEARDOWN_ENVIRONMENT, self.current_context)
+        finally:
+            self.current_setup = None
+            self.current_context = None
+
+    def __describe(self, setup: Tuple) -> str:
+        return ", ".join(f"{factor}={value}" for factor, value in zip(self.setup_factors, setup)) or "all runs"
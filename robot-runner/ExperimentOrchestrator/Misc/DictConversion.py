@@ -1,4 +1,6 @@
 import inspect
+from enum import Enum
+from pathlib import PurePath
 from typing import Dict, List
 
 def class_to_dict(obj):
@@ -9,6 +11,25 @@ def class_to_dict(obj):
             pr[name] = value
     return pr
 
+def config_to_dict(obj) -> Dict:
+    """Like class_to_dict, but only for the data attributes declared on the class (annotated or assigned) or set on the instance.
+    Objects such as profilers and clients are left out, and no getattr is done for every name in dir(obj)."""
+    data_types = (str, int, float, bool, PurePath, Enum, list, tuple, dict, set, type(None))
+
+    names = set(vars(obj))
+    for cls in type(obj).__mro__[:-1]:     # Without object
+        names.update(vars(cls))
+        names.update(vars(cls).get('__annotations__', {}))
+
+    pr = {}
+    for name in sorted(names):
+        if name.startswith('_'):
+            continue
+        value = getattr(obj, name, None)
+        if isinstance(value, data_types):
+            pr[name] = value
+    return pr
+
 def pop_from_each_dict_in_list(list_of_dicts: List[Dict], to_be_popped_key: str, default = None) -> List[Dict]:
     for dict in list_of_dicts:
         dict.pop(to_be_popped_key, default)
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROBOT_RUNNER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Loading a config file the same way __main__ does
+CONFIG_LOAD_CODE = """
+import sys
+from ConfigValidator.Config.ConfigLoader import load_config_module
+load_config_module(sys.argv[1]).RobotRunnerConfig()
+"""
+
+# What a run process imports when it is spawned instead of forked
+WORKER_SPAWN_CODE = "import ExperimentOrchestrator.Experiment.Run.RunController"
+
+
+def benchmark_scenarios(config_path: str) -> Dict[str, List[str]]:
+    """The measured start-up paths, each as the arguments of a fresh python interpreter"""
+    return {
+        'cli_help':     [ROBOT_RUNNER_DIR, 'help'],
+        'config_load':  ['-c', CONFIG_LOAD_CODE, config_path],
+        'worker_spawn': ['-c', WORKER_SPAWN_CODE]
+    }
+
+
+def measure_import_time(interpreter_args: List[str], repetitions: int = 5) -> Dict:
+    """Run the interpreter with -X importtime and return the median total import time and the slowest top-level imports"""
+    totals, wall_times, slowest = [], [], {}
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-X', 'importtime'] + interpreter_args, cwd=ROBOT_RUNNER_DIR,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall_times.append(time.perf_counter() - start)
+
+        total_us, top_level = 0, {}
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, module = [field.strip() for field in line[len('import time:'):].split('|')]
+            total_us += int(self_us)
+            if not module.startswith(' '):
+                top_level[module.strip()] = int(cumulative_us)
+
+        totals.append(total_us)
+        if not slowest:
+            slowest = top_level
+
+    return {
+        'import_ms':        round(sorted(totals)[len(totals) // 2] / 1000, 1),
+        'wall_ms':          round(sorted(wall_times)[len(wall_times) // 2] * 1000, 1),
+        'slowest_imports':  {module: round(us / 1000, 1) for module, us in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:5]}
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROBOT_RUNNER_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def read_history(history_file: str) -> List[Dict]:
+    try:
+        with open(history_file, 'r') as history:
+            return [json.loads(line) for line in history if line.strip()]
+    except (OSError, ValueError):
+        return []
+
+
+def append_to_history(history_file: str, entry: Dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(history_file)), exist_ok=True)
+    with open(history_file, 'a') as history:
+        history.write(json.dumps(entry) + '\n')
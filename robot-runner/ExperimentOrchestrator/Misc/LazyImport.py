@@ -0,0 +1,43 @@
+import importlib
+import sys
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that is imported on first attribute access.
+    Heavy optional dependencies (pandas, paramiko, pyshark, ...) are then only loaded by the code paths that use them,
+    instead of by every command that happens to import a module referencing them."""
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__dict__['_LazyModule__module'] = None
+        self.__dict__['_LazyModule__lock'] = threading.Lock()
+
+    def __getattr__(self, name: str):
+        return getattr(self.__load(), name)
+
+    def __dir__(self):
+        return dir(self.__load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_LazyModule__module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+    def __load(self) -> ModuleType:
+        module = self.__dict__['_LazyModule__module']
+        if module is None:
+            with self.__dict__['_LazyModule__lock']:
+                module = self.__dict__['_LazyModule__module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_LazyModule__module'] = module
+        return module
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """Return the module if it is already imported, otherwise a LazyModule that imports it on first use"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    return LazyModule(module_name)
+
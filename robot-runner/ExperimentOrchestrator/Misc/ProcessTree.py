@@ -0,0 +1,70 @@
+import os
+import signal
+import time
+from typing import Dict, List
+
+
+def descendants(root_pid: int) -> List[int]:
+    """All live descendants of a process, found by walking the parent pids in /proc (empty without procfs)"""
+    children_of: Dict[int, List[int]] = {}
+    try:
+        pids = [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return []
+
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", 'r') as stat_file:
+                # Fields after the command name, which is enclosed in parentheses and may contain spaces
+                parent_pid = int(stat_file.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue    # The process exited in the meantime
+        children_of.setdefault(parent_pid, []).append(pid)
+
+    found, to_visit = [], list(children_of.get(root_pid, []))
+    while to_visit:
+        pid = to_visit.pop()
+        found.append(pid)
+        to_visit.extend(children_of.get(pid, []))
+
+    return found
+
+
+def terminate_tree(root_pid: int, grace_period_in_s: float = 5.0) -> List[int]:
+    """SIGTERM a process and all its descendants, SIGKILL whatever is still alive after the grace period.
+    Returns the pids that had to be killed."""
+    # Collect the tree first, terminated children are re-parented and cannot be found through the root anymore
+    tree = descendants(root_pid) + [root_pid]
+    _signal_all(tree, signal.SIGTERM)
+
+    deadline = time.monotonic() + grace_period_in_s
+    alive = tree
+    while alive and time.monotonic() < deadline:
+        time.sleep(0.05)
+        alive = [pid for pid in alive if _is_alive(pid)]
+
+    _signal_all(alive, signal.SIGKILL)
+    return alive
+
+
+def _signal_all(pids: List[int], sig: int) -> None:
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def _is_alive(pid: int) -> bool:
+    if not os.path.isdir('/proc'):
+        try:
+            os.kill(pid, 0)
+            return True
+        except OSError:
+            return False
+
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as stat_file:
+            return stat_file.read().rsplit(')', 1)[1].split()[0] != 'Z'    # Zombies have exited already
+    except (OSError, IndexError):
+        return False
@@ -0,0 +1,96 @@
+import csv
+import os
+import resource
+from typing import Dict, List
+from ExperimentOrchestrator.Misc import ProcessTree
+
+###     =========================================================
+###     |                                                       |
+###     |                  SelfOverheadMonitor                  |
+###     |       - Accounts the CPU time, memory and context     |
+###     |         switches of the robot-runner process tree     |
+###     |         (this process, its reaped children and its    |
+###     |         live descendants) per run phase               |
+###     |       - Sources: getrusage and /proc                  |
+###     |                                                       |
+###     =========================================================
+class SelfOverheadMonitor:
+    # Reserved run table columns, filled in for every run
+    cpu_column:                 str = '__rr_cpu_s'
+    max_rss_column:             str = '__rr_max_rss_mb'
+    ctx_switches_column:        str = '__rr_ctx_switches'
+    reserved_columns:           List[str] = [cpu_column, max_rss_column, ctx_switches_column]
+
+    __phases: List[Dict]
+    __phase_start: Dict = None
+    __phase_name: str = None
+
+    def __init__(self):
+        self.__phases = []
+        self.__clock_ticks = os.sysconf('SC_CLK_TCK')
+
+    def begin_phase(self, name: str) -> None:
+        self.__phase_name = name
+        self.__phase_start = self.snapshot()
+
+    def end_phase(self) -> None:
+        if self.__phase_start is None:
+            return
+
+        end = self.snapshot()
+        self.__phases.append({
+            'phase':            self.__phase_name,
+            'cpu_s':            round(end['cpu_s'] - self.__phase_start['cpu_s'], 6),
+            'max_rss_mb':       round(end['max_rss_mb'], 1),
+            'ctx_switches':     end['ctx_switches'] - self.__phase_start['ctx_switches']
+        })
+        self.__phase_start = None
+
+    def snapshot(self) -> Dict:
+        self_usage = resource.getrusage(resource.RUSAGE_SELF)
+        children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)     # Children that have been waited for
+        live_cpu_s, live_max_rss_kb, live_ctx_switches = self.__live_descendants_usage()
+
+        return {
+            'cpu_s':        self_usage.ru_utime + self_usage.ru_stime + children_usage.ru_utime + children_usage.ru_stime + live_cpu_s,
+            # Approximation of the peak of the tree: peak of this process, largest reaped child and peaks of live descendants
+            'max_rss_mb':   (self_usage.ru_maxrss + children_usage.ru_maxrss + live_max_rss_kb) / 1024,
+            'ctx_switches': self_usage.ru_nvcsw + self_usage.ru_nivcsw + children_usage.ru_nvcsw + children_usage.ru_nivcsw + live_ctx_switches
+        }
+
+    def get_phases(self) -> List[Dict]:
+        return self.__phases
+
+    def get_summary(self) -> Dict:
+        """Totals over all phases, keyed by the reserved run table columns"""
+        return {
+            self.cpu_column:            round(sum(phase['cpu_s'] for phase in self.__phases), 3),
+            self.max_rss_column:        round(max((phase['max_rss_mb'] for phase in self.__phases), default=0.0), 1),
+            self.ctx_switches_column:   sum(phase['ctx_switches'] for phase in self.__phases)
+        }
+
+    def write_to_file(self, file_path: str) -> None:
+        with open(file_path, 'w', newline='') as overhead_file:
+            writer = csv.DictWriter(overhead_file, fieldnames=['phase', 'cpu_s', 'max_rss_mb', 'ctx_switches'])
+            writer.writeheader()
+            writer.writerows(self.__phases)
+
+    def __live_descendants_usage(self):
+        cpu_s, max_rss_kb, ctx_switches = 0.0, 0, 0
+        for pid in ProcessTree.descendants(os.getpid()):
+            try:
+                with open(f"/proc/{pid}/stat", 'r') as stat_file:
+                    # Fields after the command name, which is enclosed in parentheses and may contain spaces
+                    fields = stat_file.read().rsplit(')', 1)[1].split()
+                cpu_s += (int(fields[11]) + int(fields[12])) / self.__clock_ticks     # utime + stime
+
+                with open(f"/proc/{pid}/status", 'r') as status_file:
+                    for line in status_file:
+                        if line.startswith('VmHWM:'):
+                            max_rss_kb += int(line.split()[1])
+                        elif line.startswith(('voluntary_ctxt_switches:', 'nonvoluntary_ctxt_switches:')):
+                            ctx_switches += int(line.split()[1])
+            except (OSError, IndexError, ValueError):
+                continue    # The process exited in the meantime
+
+        return cpu_s, max_rss_kb, ctx_switches
@@ -0,0 +1,120 @@
+import os
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ArtifactCache:
+    """Content-addressed on-disk cache for parsed profiler artifacts.
+    Entries are keyed by a hash of the input data and the parser version, so a changed
+    input file or a bumped parser version never returns a stale result.
+    The total size of the cache is bounded, least recently used entries are evicted first."""
+
+    cache_folder_name:  str = "artifact_cache"
+    entry_suffix:       str = ".pkl"
+    # Digests of the input files hashed so far, by path, size and modification time
+    __file_digests: Dict[Tuple[str, int, int], str] = {}
+
+    __cache_dir: Path
+    __max_size_in_bytes: int
+
+    def __init__(self, cache_dir, max_size_in_bytes: int = 256 * 1024 * 1024):
+        self.__cache_dir = Path(cache_dir)
+        self.__cache_dir.mkdir(parents=True, exist_ok=True)
+        self.__max_size_in_bytes = max_size_in_bytes
+
+    @staticmethod
+    def for_run_dir(run_dir, max_size_in_bytes: int = 256 * 1024 * 1024) -> 'ArtifactCache':
+        # Run folders live directly in the experiment folder, so the cache is shared by the whole experiment
+        return ArtifactCache(Path(run_dir).parent / ArtifactCache.cache_folder_name, max_size_in_bytes)
+
+    @staticmethod
+    def key_for_file(file_path, parser_version: str, *intervals: Optional[Tuple[float, float]]) -> str:
+        digest = hashlib.sha256(parser_version.encode('utf8'))
+        digest.update(ArtifactCache.file_digest(file_path).encode('utf8'))
+        for interval in intervals:
+            # Rounded to the millisecond, the same interval computed twice gives the same key
+            digest.update((f"{interval[0]:.3f}-{interval[1]:.3f}" if interval is not None else "none").encode('utf8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def file_digest(file_path) -> str:
+        """SHA-256 of the file contents, an unchanged file is only hashed once (e.g. by all getters of a run)"""
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in ArtifactCache.__file_digests:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as input_file:
+                for chunk in iter(lambda: input_file.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            ArtifactCache.__file_digests[memo_key] = digest.hexdigest()
+
+        return ArtifactCache.__file_digests[memo_key]
+
+    @staticmethod
+    def key_for_bytes(data: bytes, parser_version: str) -> str:
+        digest = hashlib.sha256(parser_version.encode('utf8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry_path = self.__entry_path(key)
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                value = pickle.load(entry_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        # Refresh the modification time, it is used as the recency for LRU eviction
+        os.utime(entry_path)
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        entry_path = self.__entry_path(key)
+        temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+
+        with open(temp_path, 'wb') as entry_file:
+            pickle.dump(value, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+
+        self.__evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        for entry_path in self.__cache_dir.glob(f"*{self.entry_suffix}"):
+            entry_path.unlink()
+
+    def __entry_path(self, key: str) -> Path:
+        return self.__cache_dir / f"{key}{self.entry_suffix}"
+
+    def __evict(self) -> None:
+        entries = []
+        total_size = 0
+        for entry_path in self.__cache_dir.glob(f"*{self.entry_suffix}"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        # Oldest entries first
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, entry_path in entries:
+            if total_size <= self.__max_size_in_bytes:
+                break
+
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
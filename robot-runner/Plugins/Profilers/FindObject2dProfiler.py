@@ -1,12 +1,18 @@
 import os
-import pandas as pd
 from datetime import datetime
-from paramiko import SSHClient, AutoAddPolicy
 from Plugins.Profilers.LogFileProfiler import LogFileProfiler
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from Plugins.Profilers.QuantileSketch import save_sketches, load_sketches, sketches_from_data_frame
 from ProgressManager.Output.OutputProcedure import OutputProcedure
+from ProgressManager.Tracing.Tracer import Tracer
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+pd = lazy_import('pandas')
+paramiko = lazy_import('paramiko')
 
 
 class FindObject2dProfiler(LogFileProfiler):
+    sketch_columns = ['extraction_time_ms', 'detection_time_ms', 'result_delay_ms']
 
     def __init__(self, ip_addr, username, hostname) -> None:
         super().__init__(ip_addr, username, hostname)
@@ -19,10 +25,11 @@ class FindObject2dProfiler(LogFileProfiler):
 
         # SSH to the remote machine
         try:
-            ssh_client = SSHClient()
+            ssh_client = paramiko.SSHClient()
             ssh_client.load_host_keys(f"/home/{os.environ['USERNAME']}/.ssh/known_hosts")
-            ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-            ssh_client.connect(self.ip_addr, username=self.username)
+            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            with Tracer.span('ssh.connect', 'ssh', host=self.ip_addr):
+                ssh_client.connect(self.ip_addr, username=self.username)
             sftp_client = ssh_client.open_sftp()
             
             # If find_object_2d node is executed on this PC, fetch the log file locally
@@ -33,11 +40,11 @@ class FindObject2dProfiler(LogFileProfiler):
                 find_object_2d_log_file = self.open_remote_log_file(ssh_client, sftp_client, "find_object_2d")
 
             # Process log file
-            find_object_2d_df = self.process_find_object_2d_log_file(find_object_2d_log_file)
+            find_object_2d_df = self.parse_log_file(find_object_2d_log_file, output_folder, self.process_find_object_2d_log_file)
 
             # Fetch remotely and process obj_recognition_results log file
             obj_recognition_results_log_file = self.open_remote_log_file(ssh_client, sftp_client, "sherlock_obj_recognition")
-            obj_recognition_results_df = self.process_obj_recognition_results(obj_recognition_results_log_file)
+            obj_recognition_results_df = self.parse_log_file(obj_recognition_results_log_file, output_folder, self.process_obj_recognition_results)
 
             # Calculate the delay of receiving the detection result at the side of obj_recognition_results node in ms
             find_object_2d_df['detection_received_at'] = obj_recognition_results_df['result_received']
@@ -45,6 +52,8 @@ class FindObject2dProfiler(LogFileProfiler):
             find_object_2d_df['result_delay_ms'] = find_object_2d_df['result_delay_ms'].apply(lambda x: x.total_seconds() * 1000)
 
             find_object_2d_df.to_csv(os.path.join(output_folder, "find_object_2d_results.csv"), index=False, header=True)
+            # Mergeable distribution summaries, used for percentiles over runs without re-reading the results
+            save_sketches(os.path.join(output_folder, "find_object_2d_sketches.json"), sketches_from_data_frame(find_object_2d_df, self.sketch_columns))
             OutputProcedure.console_log_OK("FindObject2d profiler done")
 
         except BaseException as e:
@@ -136,10 +145,19 @@ class FindObject2dProfiler(LogFileProfiler):
 
     def get_average_results(self, input_folder):
         input_file = os.path.join(input_folder, "find_object_2d_results.csv")
+        cache = ArtifactCache.for_run_dir(input_folder)
+        key = cache.key_for_file(input_file, f"FindObject2dProfiler.get_average_results.v{self.parser_version}")
+        return cache.get_or_compute(key, lambda: self.__compute_average_results(input_file))
+
+    def __compute_average_results(self, input_file):
         results_df = pd.read_csv(input_file)
         recognition_ratio = results_df['id_of_detected_object'].count() / len(results_df['id_of_detected_object']) * 100
         return results_df['extraction_time_ms'].mean(), results_df['detection_time_ms'].mean(), results_df['result_delay_ms'].mean(), recognition_ratio
 
+    def get_percentile_results(self, input_folder, column='result_delay_ms', quantiles=(0.95, 0.99)):
+        sketches = load_sketches(os.path.join(input_folder, "find_object_2d_sketches.json"))
+        return tuple(sketches[column].quantiles(quantiles))
+
 
 if __name__ == "__main__":
     fp = FindObject2dProfiler(ip_addr="192.168.1.7", username="ubuntu", hostname="ubuntu")
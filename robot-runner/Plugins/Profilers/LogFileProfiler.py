@@ -2,11 +2,14 @@ from io import TextIOWrapper
 import os
 import re
 import textwrap
-from typing import List
-from paramiko.sftp_file import SFTPFile
+from typing import Callable, List
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from ProgressManager.Tracing.Tracer import Tracer
 
 
 class LogFileProfiler:
+    # Bump whenever the parsing logic changes, so cached parse results are invalidated
+    parser_version: int = 1
 
     def __init__(self, ip_addr = "", username = "", hostname = "") -> None:
         self.ip_addr = ip_addr
@@ -41,7 +44,8 @@ class LogFileProfiler:
         channel.close()
         return log_file_names.split()
 
-    def open_remote_log_file(self, ssh_client, sftp_client, node_name) -> SFTPFile:
+    @Tracer.traced('ssh.open_remote_log_file', 'ssh')
+    def open_remote_log_file(self, ssh_client, sftp_client, node_name) -> 'paramiko.SFTPFile':
         # Get names of all log files on a remote machine
         log_file_names = self.get_remote_log_file_names(ssh_client)
 
@@ -72,4 +76,9 @@ class LogFileProfiler:
         # File not found
         raise FileNotFoundError(f"Log file of the node '{node_name}' not found!")
 
-
+    def parse_log_file(self, log_file, output_folder, parse_func: Callable):
+        # Identical log files (e.g. when reprocessing a run) are parsed only once
+        lines = log_file.readlines()
+        cache = ArtifactCache.for_run_dir(output_folder)
+        key = cache.key_for_bytes(''.join(lines).encode('utf8'), f"{type(self).__name__}.{parse_func.__name__}.v{self.parser_version}")
+        return cache.get_or_compute(key, lambda: parse_func(lines))
@@ -1,12 +1,18 @@
 import os
-import pandas as pd
 from datetime import datetime
-from paramiko import SSHClient, AutoAddPolicy
 from Plugins.Profilers.LogFileProfiler import LogFileProfiler
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from Plugins.Profilers.QuantileSketch import save_sketches, load_sketches, sketches_from_data_frame
 from ProgressManager.Output.OutputProcedure import OutputProcedure
+from ProgressManager.Tracing.Tracer import Tracer
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+pd = lazy_import('pandas')
+paramiko = lazy_import('paramiko')
 
 
 class MoveBaseProfiler(LogFileProfiler):
+    sketch_columns = ['goal_sending_delay_ms', 'goal_processing_s', 'result_delay_ms']
 
     def __init__(self, ip_addr, username, hostname) -> None:
         super().__init__(ip_addr, username, hostname)
@@ -19,10 +25,11 @@ class MoveBaseProfiler(LogFileProfiler):
 
         # SSH to the remote machine
         try:
-            ssh_client = SSHClient()
+            ssh_client = paramiko.SSHClient()
             ssh_client.load_host_keys(f"/home/{os.environ['USERNAME']}/.ssh/known_hosts")
-            ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-            ssh_client.connect(self.ip_addr, username=self.username)
+            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            with Tracer.span('ssh.connect', 'ssh', host=self.ip_addr):
+                ssh_client.connect(self.ip_addr, username=self.username)
             sftp_client = ssh_client.open_sftp()
             
             # If move_base node is executed on this PC, fetch the log file locally
@@ -33,16 +40,18 @@ class MoveBaseProfiler(LogFileProfiler):
                 move_base_log_file = self.open_remote_log_file(ssh_client, sftp_client, "move_base")
 
             # Process log file
-            move_base_df = self.process_move_base_log_file(move_base_log_file)
+            move_base_df = self.parse_log_file(move_base_log_file, output_folder, self.process_move_base_log_file)
 
             # Fetch remotely and process obj_recognition_results log file
             navigation_results_log_file = self.open_remote_log_file(ssh_client, sftp_client, "sherlock_controller")
-            navigation_results_df = self.process_navigation_results(navigation_results_log_file)
+            navigation_results_df = self.parse_log_file(navigation_results_log_file, output_folder, self.process_navigation_results)
 
             # Calculate the delay of receiving the detection result at the side of obj_recognition_results node in ms
             results_df = self.combine_data_frames(move_base_df, navigation_results_df)
 
             results_df.to_csv(os.path.join(output_folder, "move_base_results.csv"), index=False, header=True)
+            # Mergeable distribution summaries, used for percentiles over runs without re-reading the results
+            save_sketches(os.path.join(output_folder, "move_base_sketches.json"), sketches_from_data_frame(results_df, self.sketch_columns))
             OutputProcedure.console_log_OK("MoveBase profiler done")
 
         except BaseException as e:
@@ -150,6 +159,14 @@ class MoveBaseProfiler(LogFileProfiler):
 
     def get_average_results(self, input_folder):
         input_file = os.path.join(input_folder, "move_base_results.csv")
+        cache = ArtifactCache.for_run_dir(input_folder)
+        key = cache.key_for_file(input_file, f"MoveBaseProfiler.get_average_results.v{self.parser_version}")
+        return cache.get_or_compute(key, lambda: self.__compute_average_results(input_file))
+
+    def __compute_average_results(self, input_file):
         results_df = pd.read_csv(input_file)
         return results_df['goal_sending_delay_ms'].mean(), results_df['goal_processing_s'].mean(), results_df['result_delay_ms'].mean()
 
+    def get_percentile_results(self, input_folder, column='result_delay_ms', quantiles=(0.95, 0.99)):
+        sketches = load_sketches(os.path.join(input_folder, "move_base_sketches.json"))
+        return tuple(sketches[column].quantiles(quantiles))
@@ -1,5 +1,7 @@
-import pyshark
 from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+pyshark = lazy_import('pyshark')
 
 class NetworkProfiler:
     __cap = None
@@ -1,56 +1,84 @@
 import subprocess
 import os
-import numpy
-import pandas as pd
+import time
 from ProgressManager.Output.OutputProcedure import OutputProcedure
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from Plugins.Profilers.ProfilerLifecycleManager import trim_to_interval
 from datetime import datetime
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+numpy = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 
 class PowerProfiler:
+    # Bump whenever the result processing changes, so cached results are invalidated
+    parser_version: int = 1
+    # Checked by the preflight probes
+    required_ros_services = ['/start_ina219_measurement', '/stop_ina219_measurement']
 
     def start_measurement(self):
-        try:
-            # Start the measurments
-            start_resource_measurment_service_call = "rosservice call /start_ina219_measurement"
-            process = subprocess.run(start_resource_measurment_service_call.split(), check=True, capture_output=True, text=True)
-            output = process.stdout
-            #if output == "started: True\n":
-            OutputProcedure.console_log_OK("Power profiler started")
-        except BaseException as e:
-            OutputProcedure.console_log_FAIL("Error while starting power profiler")
-            print(e)
+        # Start the measurments
+        start_resource_measurment_service_call = "rosservice call /start_ina219_measurement"
+        process = subprocess.run(start_resource_measurment_service_call.split(), check=True, capture_output=True, text=True)
+        output = process.stdout
+        #if output == "started: True\n":
+        OutputProcedure.console_log_OK("Power profiler started")
 
     def stop_measurement(self, output_dir):
-        try:
-            # Stop the measurement and save results into a file
-            stop_resource_measurement_service_call = "rosservice call /stop_ina219_measurement"
-            process = subprocess.run(stop_resource_measurement_service_call.split(), check=True, capture_output=True, text=True)
-            output = process.stdout
+        # Stop the measurement and save results into a file
+        stop_resource_measurement_service_call = "rosservice call /stop_ina219_measurement"
+        process = subprocess.run(stop_resource_measurement_service_call.split(), check=True, capture_output=True, text=True)
+        output = process.stdout
+
+        data = self.__parse_measurements(output)
+
+        power_df = pd.DataFrame(data)
+        power_df.to_csv(os.path.join(output_dir, "power.csv"), index=False, header=True)
 
-            data = {
-                'timestamp': [], 
-                'power_mW': []
-            }
+        OutputProcedure.console_log_OK("Power profiler stopped")
 
-            timestamps = output[output.index('[') + 1 : output.index(']')].split(", ")
-            data['timestamp'] = [datetime.fromtimestamp(int(x)/1000.0) for x in timestamps]
+    def read_sample(self, window_in_s: float = 1.0) -> float:
+        """Measure for a short window outside of a run and return the average power in mW, e.g. as a cooldown signal"""
+        self.start_sample()
+        time.sleep(window_in_s)
+        power = self.stop_sample()['power_mW']
+        return sum(power) / len(power)
 
-            output = output[output.index(']') + 1 :]
+    def start_sample(self):
+        subprocess.run("rosservice call /start_ina219_measurement".split(), check=True, capture_output=True, text=True, timeout=10)
 
-            power = output[output.index('[') + 1 : output.index(']')].split(", ")
-            data["power_mW"] = [float(x) for x in power]
+    def stop_sample(self) -> dict:
+        """Stop a measurement started with start_sample and return the samples, without writing result files"""
+        process = subprocess.run("rosservice call /stop_ina219_measurement".split(), check=True, capture_output=True, text=True, timeout=10)
+        return self.__parse_measurements(process.stdout)
 
-            power_df = pd.DataFrame(data)
-            power_df.to_csv(os.path.join(output_dir, "power.csv"), index=False, header=True)
+    @staticmethod
+    def __parse_measurements(output: str) -> dict:
+        data = {
+            'timestamp': [], 
+            'power_mW': []
+        }
 
-            OutputProcedure.console_log_OK("Power profiler stopped")
-        except BaseException as e:
-            OutputProcedure.console_log_FAIL("Error while stoping power profiler")
-            print(e)
+        timestamps = output[output.index('[') + 1 : output.index(']')].split(", ")
+        data['timestamp'] = [datetime.fromtimestamp(int(x)/1000.0) for x in timestamps]
 
-    def get_total_results(self, input_folder):
+        output = output[output.index(']') + 1 :]
+
+        power = output[output.index('[') + 1 : output.index(']')].split(", ")
+        data["power_mW"] = [float(x) for x in power]
+        return data
+
+    def get_total_results(self, input_folder, interval=None, window=None):
+        # interval: (start, end) epoch seconds to trim the measurement to, e.g. the common interval of all profilers
+        # window: the window of this profiler (see ProfilerLifecycleManager.get_window), its samples are timestamped by the robot
         input_file = os.path.join(input_folder, "power.csv")
-        results_df = pd.read_csv(input_file)
+        cache = ArtifactCache.for_run_dir(input_folder)
+        key = cache.key_for_file(input_file, f"PowerProfiler.get_total_results.v{self.parser_version}", interval, window)
+        return cache.get_or_compute(key, lambda: self.__compute_total_results(input_file, interval, window))
+
+    def __compute_total_results(self, input_file, interval, window):
+        results_df = trim_to_interval(pd.read_csv(input_file), interval, window)
         timestamps_in_sec = [datetime.strptime(x, '%Y-%m-%d %H:%M:%S.%f').timestamp() for x in results_df['timestamp']]
 
         # Results in J 
@@ -0,0 +1,176 @@
+import csv
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure
+from ProgressManager.Tracing.Tracer import Tracer
+
+
+class ProfilerWindow:
+    called_at:   float = None     # Epoch time the start/stop call was released
+    returned_at: float = None     # Epoch time the start/stop call returned
+
+
+class ProfilerLifecycleManager:
+    """Starts and stops a set of profilers simultaneously to minimise the skew between their measurement windows.
+    A profiler is any object with start_measurement() and stop_measurement(output_dir), and optionally
+    prepare_measurement() for work that should happen before the common start instant.
+    Every profiler runs in its own thread, all threads wait on a barrier and are released at once.
+    The actual start/stop timestamps are recorded, so measurements can be trimmed to the common interval.
+    A profiler that fails to start or stop fails the run, after the other profilers were started or stopped."""
+
+    windows_file_name: str = "profiler_windows.csv"
+
+    __profilers: Dict[str, object]
+    __start_windows: Dict[str, ProfilerWindow]
+    __stop_windows: Dict[str, ProfilerWindow]
+
+    def __init__(self):
+        self.__profilers = {}
+        self.__start_windows = {}
+        self.__stop_windows = {}
+
+    def register_profiler(self, name: str, profiler) -> None:
+        self.__profilers[name] = profiler
+
+    def start_all(self) -> None:
+        self.__start_windows = {}
+        self.__stop_windows = {}
+
+        for profiler in self.__profilers.values():
+            if hasattr(profiler, 'prepare_measurement'):
+                profiler.prepare_measurement()
+
+        self.__start_windows, errors = self.__call_at_barrier('start_measurement', lambda profiler: profiler.start_measurement())
+        OutputProcedure.console_log_OK(f"Profilers started with a skew of {self.__skew(self.__start_windows) * 1000:.1f}ms")
+        self.__raise_first(errors)
+
+    def stop_all(self, output_dir) -> None:
+        self.__stop_windows, errors = self.__call_at_barrier('stop_measurement', lambda profiler: profiler.stop_measurement(output_dir))
+        OutputProcedure.console_log_OK(f"Profilers stopped with a skew of {self.__skew(self.__stop_windows) * 1000:.1f}ms")
+        self.write_windows_to_file(output_dir)
+        self.__raise_first(errors)
+
+    def get_common_interval(self) -> Optional[Tuple[float, float]]:
+        """The interval (epoch seconds) in which all profilers were measuring"""
+        if not self.__start_windows or not self.__stop_windows:
+            return None
+
+        start = max(window.returned_at for window in self.__start_windows.values())
+        end = min(window.called_at for window in self.__stop_windows.values())
+        return (start, end) if start < end else None
+
+    def get_window(self, name: str) -> Optional[Tuple[float, float]]:
+        """The interval (epoch seconds) in which a profiler took its samples, from calling start to stop returning,
+        for trimming profilers that timestamp their samples on another clock (see trim_to_interval)"""
+        start, stop = self.__start_windows.get(name), self.__stop_windows.get(name)
+        if start is None or stop is None or start.called_at is None or stop.returned_at is None:
+            return None
+        return start.called_at, stop.returned_at
+
+    def write_windows_to_file(self, output_dir) -> None:
+        with open(os.path.join(output_dir, self.windows_file_name), 'w', newline='') as windows_file:
+            writer = csv.writer(windows_file)
+            writer.writerow(['profiler', 'start_called_at', 'start_returned_at', 'stop_called_at', 'stop_returned_at'])
+            for name in self.__profilers:
+                start = self.__start_windows.get(name, ProfilerWindow())
+                stop = self.__stop_windows.get(name, ProfilerWindow())
+                writer.writerow([name, start.called_at, start.returned_at, stop.called_at, stop.returned_at])
+
+    @staticmethod
+    def read_common_interval(input_folder) -> Optional[Tuple[float, float]]:
+        """Read the common measurement interval of a run from its profiler windows file"""
+        try:
+            with open(os.path.join(input_folder, ProfilerLifecycleManager.windows_file_name), 'r') as windows_file:
+                rows = list(csv.DictReader(windows_file))
+            start = max(float(row['start_returned_at']) for row in rows)
+            end = min(float(row['stop_called_at']) for row in rows)
+        except (OSError, ValueError):
+            return None
+
+        return (start, end) if start < end else None
+
+    @staticmethod
+    def read_window(input_folder, name: str) -> Optional[Tuple[float, float]]:
+        """Read the window of a profiler of a run from its profiler windows file (see get_window)"""
+        try:
+            with open(os.path.join(input_folder, ProfilerLifecycleManager.windows_file_name), 'r') as windows_file:
+                row = next(row for row in csv.DictReader(windows_file) if row['profiler'] == name)
+            return float(row['start_called_at']), float(row['stop_returned_at'])
+        except (OSError, ValueError, StopIteration):
+            return None
+
+    def __call_at_barrier(self, call_name: str, call) -> Tuple[Dict[str, ProfilerWindow], List[Tuple[str, BaseException]]]:
+        windows = {name: ProfilerWindow() for name in self.__profilers}
+        if not windows:
+            return windows, []
+
+        barrier = threading.Barrier(len(self.__profilers))
+        errors: List[Tuple[str, BaseException]] = []
+
+        def run(name: str, profiler):
+            barrier.wait()
+            windows[name].called_at = time.time()
+            try:
+                with Tracer.span(f"{name}.{call_name}", 'profiler'):
+                    call(profiler)
+            except Exception as e:
+                errors.append((name, e))
+            windows[name].returned_at = time.time()
+
+        threads = [threading.Thread(target=run, args=(name, profiler)) for name, profiler in self.__profilers.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name, error in errors:
+            OutputProcedure.console_log_FAIL(f"Profiler {name} failed: {type(error).__name__}: {error}")
+
+        return windows, errors
+
+    @staticmethod
+    def __raise_first(errors: List[Tuple[str, BaseException]]) -> None:
+        if errors:
+            raise errors[0][1]
+
+    @staticmethod
+    def __skew(windows: Dict[str, ProfilerWindow]) -> float:
+        returned = [window.returned_at for window in windows.values() if window.returned_at is not None]
+        return max(returned) - min(returned) if returned else 0.0
+
+
+def trim_to_interval(data_frame, interval: Optional[Tuple[float, float]], window: Optional[Tuple[float, float]] = None,
+                     timestamp_column: str = 'timestamp', min_kept_fraction: float = 0.5):
+    """Keep only the rows of a profiler data frame with a timestamp within the (epoch seconds) interval.
+    Profilers that timestamp their samples on another clock (e.g. the robot) pass their window (see get_window),
+    the offset between the clocks is estimated from it. A trim that would keep less than min_kept_fraction of the
+    rows is not applied, the interval and the timestamps do not match then and the untrimmed data is used."""
+    if interval is None or data_frame.empty:
+        return data_frame
+
+    timestamps = data_frame[timestamp_column].map(lambda x: datetime.fromisoformat(str(x)).timestamp())
+    if window is not None:
+        offset = estimate_clock_offset(timestamps.min(), timestamps.max(), window)
+        if abs(offset) > 0.001:
+            OutputProcedure.console_log_WARNING(f"Profiler clock is {offset:.3f}s off, correcting its {timestamp_column} column")
+        timestamps = timestamps - offset
+
+    trimmed = data_frame[(timestamps >= interval[0]) & (timestamps <= interval[1])]
+    if len(trimmed) < min_kept_fraction * len(data_frame):
+        OutputProcedure.console_log_WARNING(f"Trimming to the common interval would keep {len(trimmed)} of {len(data_frame)} samples, "
+                                            f"using all samples (are the clocks of the robot and this machine in sync?)")
+        return data_frame
+    return trimmed
+
+
+def estimate_clock_offset(first_sample: float, last_sample: float, window: Tuple[float, float]) -> float:
+    """Offset (seconds) of the clock that timestamped the samples from this machine's clock.
+    The samples were taken within the window, which bounds the offset; clocks that may agree are not corrected."""
+    lowest, highest = last_sample - window[1], first_sample - window[0]
+    if lowest > highest:        # The samples span more than the window, center them in it
+        return (lowest + highest) / 2
+    return min(max(0.0, lowest), highest)
@@ -0,0 +1,169 @@
+import json
+import math
+from typing import Dict, Iterable, List
+
+
+class DDSketch:
+    """Mergeable streaming quantile sketch with relative-error guarantees (DDSketch, Masson et al. 2019).
+    Values are counted in logarithmically sized buckets, so any quantile is reported within
+    relative_accuracy of the exact value, and two sketches merge in O(number of buckets)."""
+
+    relative_accuracy:  float
+    max_num_buckets:    int
+
+    def __init__(self, relative_accuracy: float = 0.01, max_num_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_num_buckets = max_num_buckets
+
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.__positive_buckets: Dict[int, float] = {}
+        self.__negative_buckets: Dict[int, float] = {}
+        self.__zero_count: float = 0.0
+
+        self.count: float = 0.0
+        self.sum:   float = 0.0
+        self.min:   float = math.inf
+        self.max:   float = -math.inf
+
+    @staticmethod
+    def from_values(values: Iterable[float], relative_accuracy: float = 0.01) -> 'DDSketch':
+        sketch = DDSketch(relative_accuracy)
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        # Missing measurements (NaN) are not part of the distribution
+        if value is None or math.isnan(value):
+            return
+
+        if value > 0:
+            self.__add_to_buckets(self.__positive_buckets, self.__key(value), weight)
+        elif value < 0:
+            self.__add_to_buckets(self.__negative_buckets, self.__key(-value), weight)
+        else:
+            self.__zero_count += weight
+
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'DDSketch') -> None:
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+
+        for key, count in other.__positive_buckets.items():
+            self.__add_to_buckets(self.__positive_buckets, key, count)
+        for key, count in other.__negative_buckets.items():
+            self.__add_to_buckets(self.__negative_buckets, key, count)
+
+        self.__zero_count += other.__zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be in the range [0, 1]")
+
+        rank = q * (self.count - 1)
+        cumulative = 0.0
+
+        # Most negative values first (largest key of the absolute value), then zero, then positive values
+        for key in sorted(self.__negative_buckets, reverse=True):
+            cumulative += self.__negative_buckets[key]
+            if cumulative > rank:
+                return self.__clamp(-self.__value(key))
+
+        cumulative += self.__zero_count
+        if cumulative > rank:
+            return 0.0
+
+        for key in sorted(self.__positive_buckets):
+            cumulative += self.__positive_buckets[key]
+            if cumulative > rank:
+                return self.__clamp(self.__value(key))
+
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def to_dict(self) -> dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_num_buckets':   self.max_num_buckets,
+            'positive_buckets':  {str(k): v for k, v in self.__positive_buckets.items()},
+            'negative_buckets':  {str(k): v for k, v in self.__negative_buckets.items()},
+            'zero_count':        self.__zero_count,
+            'count':             self.count,
+            'sum':               self.sum,
+            'min':               self.min if self.count else None,
+            'max':               self.max if self.count else None
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'DDSketch':
+        sketch = DDSketch(data['relative_accuracy'], data['max_num_buckets'])
+        sketch.__positive_buckets = {int(k): v for k, v in data['positive_buckets'].items()}
+        sketch.__negative_buckets = {int(k): v for k, v in data['negative_buckets'].items()}
+        sketch.__zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min'] if data['min'] is not None else math.inf
+        sketch.max = data['max'] if data['max'] is not None else -math.inf
+        return sketch
+
+    def __key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self.__log_gamma)
+
+    def __value(self, key: int) -> float:
+        return 2 * self.__gamma ** key / (self.__gamma + 1)
+
+    def __clamp(self, value: float) -> float:
+        return max(self.min, min(self.max, value))
+
+    def __add_to_buckets(self, buckets: Dict[int, float], key: int, weight: float) -> None:
+        buckets[key] = buckets.get(key, 0.0) + weight
+
+        # Bound the memory: collapse the smallest buckets into one (only low quantiles lose accuracy)
+        if len(buckets) > self.max_num_buckets:
+            keys = sorted(buckets)
+            collapsed = sum(buckets.pop(k) for k in keys[:len(keys) - self.max_num_buckets + 1])
+            lowest = keys[len(keys) - self.max_num_buckets]
+            buckets[lowest] = buckets.get(lowest, 0.0) + collapsed
+
+
+def save_sketches(file_path, sketches: Dict[str, DDSketch]) -> None:
+    with open(file_path, 'w') as sketch_file:
+        json.dump({name: sketch.to_dict() for name, sketch in sketches.items()}, sketch_file)
+
+
+def load_sketches(file_path) -> Dict[str, DDSketch]:
+    with open(file_path, 'r') as sketch_file:
+        return {name: DDSketch.from_dict(data) for name, data in json.load(sketch_file).items()}
+
+
+def sketches_from_data_frame(data_frame, columns: List[str], relative_accuracy: float = 0.01) -> Dict[str, DDSketch]:
+    return {column: DDSketch.from_values(data_frame[column].tolist(), relative_accuracy) for column in columns}
+
+
+def merge_sketch_files(file_paths: Iterable, column: str) -> DDSketch:
+    """Merge the sketch of one column over several runs (e.g. all repetitions of a variation)"""
+    merged = None
+    for file_path in file_paths:
+        sketch = load_sketches(file_path)[column]
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+
+    return merged if merged is not None else DDSketch()
@@ -1,71 +1,98 @@
 import subprocess
 import os
+import time
 from datetime import datetime
 from ProgressManager.Output.OutputProcedure import OutputProcedure
-import pandas as pd
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from Plugins.Profilers.ProfilerLifecycleManager import trim_to_interval
+from Plugins.Profilers.QuantileSketch import save_sketches, load_sketches, sketches_from_data_frame
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+pd = lazy_import('pandas')
 
 
 class ResourceProfiler:
+    # Bump whenever the result processing changes, so cached results are invalidated
+    parser_version: int = 1
+    # Checked by the preflight probes
+    required_ros_services = ['/start_resource_measurements', '/stop_resource_measurements']
+    sketch_columns = ['cpu_util', 'mem_util']
 
     def start_measurement(self):
-        try:
-            # Start the measurments
-            start_resource_measurment_service_call = "rosservice call /start_resource_measurements"
-            process = subprocess.run(start_resource_measurment_service_call.split(), check=True, capture_output=True, text=True)
-            output = process.stdout
-            print(output)
-            #if output == "started: True\n":
-            OutputProcedure.console_log_OK("Resource profiler started")
-        except BaseException as e:
-            OutputProcedure.console_log_FAIL("Error while starting resource profiler")
-            print(e)
+        # Start the measurments
+        start_resource_measurment_service_call = "rosservice call /start_resource_measurements"
+        process = subprocess.run(start_resource_measurment_service_call.split(), check=True, capture_output=True, text=True)
+        output = process.stdout
+        print(output)
+        #if output == "started: True\n":
+        OutputProcedure.console_log_OK("Resource profiler started")
 
     def stop_measurement(self, output_dir):
-        try:
-            # Stop the measurement and save results into a file
-            stop_resource_measurement_service_call = "rosservice call /stop_resource_measurements"
-            process = subprocess.run(stop_resource_measurement_service_call.split(), check=True, capture_output=True, text=True)
-            output = process.stdout
-            #if output == "success: True\n":
-
-            data = {
-                'timestamp': [], 
-                'cpu_util': [],
-                'mem_util': []
-            }
-
-            timestamps = output[output.index('[') + 1 : output.index(']')].split(", ")
-            data['timestamp'] = [datetime.fromtimestamp(int(x)/1000.0) for x in timestamps]
-
-            output = output[output.index(']') + 1 :]
+        # Stop the measurement and save results into a file
+        stop_resource_measurement_service_call = "rosservice call /stop_resource_measurements"
+        process = subprocess.run(stop_resource_measurement_service_call.split(), check=True, capture_output=True, text=True)
+        output = process.stdout
+        #if output == "success: True\n":
 
-            cpu_util = output[output.index('[') + 1 : output.index(']')].split(", ")
-            data["cpu_util"] = [float(x) for x in cpu_util]
+        data = self.__parse_measurements(output)
 
-            output = output[output.index(']') + 1 :]
+        power_df = pd.DataFrame(data)
+        power_df.to_csv(os.path.join(output_dir, "resources.csv"), index=False, header=True)
+        # Mergeable distribution summaries, used for percentiles over runs without re-reading the results
+        save_sketches(os.path.join(output_dir, "resources_sketches.json"), sketches_from_data_frame(power_df, self.sketch_columns))
 
-            mem_util = output[output.index('[') + 1 : output.index(']')].split(", ")
-            data["mem_util"] = [int(x) for x in mem_util]
+        OutputProcedure.console_log_OK("Resource profiler stopped")
 
-            power_df = pd.DataFrame(data)
-            power_df.to_csv(os.path.join(output_dir, "resources.csv"), index=False, header=True)
 
-            OutputProcedure.console_log_OK("Resource profiler stopped")
-        except BaseException as e:
-            OutputProcedure.console_log_FAIL("Error while stoping resource profiler")
-            print(e)
+    def read_sample(self, window_in_s: float = 1.0) -> float:
+        """Measure for a short window outside of a run and return the average CPU utilization, e.g. as a cooldown signal"""
+        self.start_sample()
+        time.sleep(window_in_s)
+        cpu_util = self.stop_sample()['cpu_util']
+        return sum(cpu_util) / len(cpu_util)
 
+    def start_sample(self):
+        subprocess.run("rosservice call /start_resource_measurements".split(), check=True, capture_output=True, text=True, timeout=10)
 
-    def get_average_results(self, input_folder):
-        input_file = os.path.join(input_folder, "resources.csv")
-        results_df = pd.read_csv(input_file)
-        return results_df['cpu_util'].mean(), results_df['mem_util'].mean()
+    def stop_sample(self) -> dict:
+        """Stop a measurement started with start_sample and return the samples, without writing result files"""
+        process = subprocess.run("rosservice call /stop_resource_measurements".split(), check=True, capture_output=True, text=True, timeout=10)
+        return self.__parse_measurements(process.stdout)
 
+    @staticmethod
+    def __parse_measurements(output: str) -> dict:
+        data = {
+            'timestamp': [], 
+            'cpu_util': [],
+            'mem_util': []
+        }
 
+        timestamps = output[output.index('[') + 1 : output.index(']')].split(", ")
+        data['timestamp'] = [datetime.fromtimestamp(int(x)/1000.0) for x in timestamps]
 
+        output = output[output.index(']') + 1 :]
 
+        cpu_util = output[output.index('[') + 1 : output.index(']')].split(", ")
+        data["cpu_util"] = [float(x) for x in cpu_util]
 
+        output = output[output.index(']') + 1 :]
 
+        mem_util = output[output.index('[') + 1 : output.index(']')].split(", ")
+        data["mem_util"] = [int(x) for x in mem_util]
+        return data
 
+    def get_average_results(self, input_folder, interval=None, window=None):
+        # interval: (start, end) epoch seconds to trim the measurement to, e.g. the common interval of all profilers
+        # window: the window of this profiler (see ProfilerLifecycleManager.get_window), its samples are timestamped by the robot
+        input_file = os.path.join(input_folder, "resources.csv")
+        cache = ArtifactCache.for_run_dir(input_folder)
+        key = cache.key_for_file(input_file, f"ResourceProfiler.get_average_results.v{self.parser_version}", interval, window)
+        return cache.get_or_compute(key, lambda: self.__compute_average_results(input_file, interval, window))
 
+    def __compute_average_results(self, input_file, interval, window):
+        results_df = trim_to_interval(pd.read_csv(input_file), interval, window)
+        return results_df['cpu_util'].mean(), results_df['mem_util'].mean()
 
+    def get_percentile_results(self, input_folder, column='cpu_util', quantiles=(0.95, 0.99)):
+        sketches = load_sketches(os.path.join(input_folder, "resources_sketches.json"))
+        return tuple(sketches[column].quantiles(quantiles))
@@ -1,21 +1,53 @@
-import pyshark
 import threading
+import time
 import os
-import pandas as pd
 from ProgressManager.Output.OutputProcedure import OutputProcedure
+from Plugins.Profilers.ArtifactCache import ArtifactCache
+from Plugins.Profilers.ProfilerLifecycleManager import trim_to_interval
+from ExperimentOrchestrator.Misc.ProcessTree import descendants
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+pyshark = lazy_import('pyshark')
+pd = lazy_import('pandas')
 
 
 class WiresharkProfiler:
+    # Bump whenever the result processing changes, so cached results are invalidated
+    parser_version: int = 1
+    capture_startup_timeout_in_s: float = 10.0
 
     def __init__(self, network_interface, pc_ip_address, robot_ip_adress) -> None:
         self.network_interface = network_interface
         self.pc_ip_address = pc_ip_address
         self.robot_ip_adress = robot_ip_adress
         self.profiler_on = False
+        self.recording = False
         self.network_thread = None
         self.data = None
 
+    def prepare_measurement(self) -> None:
+        # tshark needs a moment to open the interface, it is started before the common start instant
+        # so the measurement window only begins once packets are actually captured
+        self.__reset_data()
+        self.recording = False
+        self.profiler_on = True
+        self.network_thread = threading.Thread(target=self.capture_live_packets)
+        self.network_thread.start()
+
+        if self.__wait_for_capture():
+            OutputProcedure.console_log_OK("Network profiler capturing")
+        else:
+            OutputProcedure.console_log_WARNING(f"Network profiler: could not confirm the capture started within "
+                                                f"{self.capture_startup_timeout_in_s}s, the first packets may be missing")
+
     def start_measurement(self) -> None:
+        if self.network_thread is None:     # Not prepared (e.g. used without ProfilerLifecycleManager)
+            self.prepare_measurement()
+
+        self.recording = True
+        OutputProcedure.console_log_OK("Network profiler started")
+
+    def __reset_data(self) -> None:
         # Dictionary for captured packets info
         self.data = {
             'timestamp': [], 
@@ -27,14 +59,40 @@ class WiresharkProfiler:
             'length_B': []
         }
 
-        self.profiler_on = True
-        self.network_thread = threading.Thread(target=self.capture_live_packets)
-        self.network_thread.start()
-        OutputProcedure.console_log_OK("Network profiler started")
+    def __wait_for_capture(self) -> bool:
+        """Wait until the capture process of pyshark (dumpcap, or tshark itself) holds a packet socket"""
+        deadline = time.monotonic() + self.capture_startup_timeout_in_s
+        while time.monotonic() < deadline and self.network_thread.is_alive():
+            if any(WiresharkProfiler.__holds_packet_socket(pid) for pid in descendants(os.getpid())):
+                return True
+            time.sleep(0.05)
+        return False
+
+    @staticmethod
+    def __holds_packet_socket(pid: int) -> bool:
+        try:
+            with open('/proc/net/packet', 'r') as packet_file:
+                inodes = {line.split()[-1] for line in packet_file.readlines()[1:] if line.split()}
+            fds = os.listdir(f"/proc/{pid}/fd")
+        except PermissionError:     # A privileged (setuid) dumpcap cannot be inspected, it is running at least
+            return True
+        except OSError:             # The process exited in the meantime
+            return False
+
+        for fd in fds:
+            try:
+                link = os.readlink(f"/proc/{pid}/fd/{fd}")
+            except OSError:
+                continue
+            if link.startswith('socket:[') and link[8:-1] in inodes:
+                return True
+        return False
 
     def stop_measurement(self, output_folder) -> None:
         self.profiler_on = False
+        self.recording = False
         self.network_thread.join()
+        self.network_thread = None
 
         # Save data frame in the file
         network_df = pd.DataFrame(self.data)
@@ -50,7 +108,8 @@ class WiresharkProfiler:
             if not self.profiler_on:
                 break
 
-            if raw_packet:
+            # Packets captured while preparing, before the common start instant, are not part of the measurement
+            if raw_packet and self.recording:
                 self.add_packet(raw_packet)
         
         capture.clear()
@@ -79,8 +138,14 @@ class WiresharkProfiler:
             OutputProcedure.console_log_FAIL("Error while processing a packet")
             print(packet)
 
-    def get_total_results(self, input_folder):
+    def get_total_results(self, input_folder, interval=None):
+        # interval: (start, end) epoch seconds to trim the measurement to, e.g. the common interval of all profilers
         input_file = os.path.join(input_folder, "network.csv")
-        results_df = pd.read_csv(input_file)
+        cache = ArtifactCache.for_run_dir(input_folder)
+        key = cache.key_for_file(input_file, f"WiresharkProfiler.get_total_results.v{self.parser_version}", interval)
+        return cache.get_or_compute(key, lambda: self.__compute_total_results(input_file, interval))
+
+    def __compute_total_results(self, input_file, interval):
+        results_df = trim_to_interval(pd.read_csv(input_file), interval)
         return results_df['length_B'].count(), results_df['length_B'].sum()
         
\ No newline at end of file
@@ -0,0 +1,110 @@
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from ConfigValidator.CustomErrors.RunErrors import ReadinessTimeoutError
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Tracing.Tracer import Tracer
+
+
+class ReadinessProbe:
+    """Waits until all named components announced they are ready on an output stream (e.g. the stdout of a roslaunch
+    over SSH, or of a local subprocess), or a deadline passes.
+    All patterns are compiled into a single regex with a named group per component, so every line is scanned once.
+    Echo modes: 'all' prints every line, 'throttled' prints matching lines and at most one other line per
+    echo_interval_in_s, 'matches' prints matching lines only and 'none' prints nothing."""
+
+    __END_OF_STREAM = object()
+
+    def __init__(self, patterns: Dict[str, str], timeout_in_s: float = 120.0, literal: bool = True,
+                 echo: str = 'throttled', echo_interval_in_s: float = 1.0):
+        # patterns: component name -> text (literal=True) or regular expression announcing the component is ready
+        self.patterns = {name: re.escape(pattern) if literal else pattern for name, pattern in patterns.items()}
+        self.timeout_in_s = timeout_in_s
+        self.echo = echo
+        self.echo_interval_in_s = echo_interval_in_s
+        self.latencies: Dict[str, float] = {}
+
+    def wait(self, stream) -> Dict[str, float]:
+        """Read the stream until all components are ready and return their readiness latency in seconds.
+        Raises ReadinessTimeoutError when the deadline passes or the stream ends first."""
+        self.latencies = {}
+        start, start_us = time.monotonic(), time.time_ns() // 1000
+        deadline = start + self.timeout_in_s
+
+        groups = {f"c{i}": name for i, name in enumerate(self.patterns)}
+        matcher = self.__compile(groups)
+
+        lines: queue.Queue = queue.Queue()
+        done = threading.Event()
+        threading.Thread(target=self.__read, args=(stream, lines, done), daemon=True).start()
+
+        last_echo, suppressed, stream_ended = 0.0, 0, False
+        try:
+            while matcher is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    line = lines.get(timeout=max(remaining, 0)) if remaining > 0 else None
+                except queue.Empty:
+                    line = None
+                if line is None or line is ReadinessProbe.__END_OF_STREAM:
+                    stream_ended = line is not None
+                    break
+
+                newly_ready = [groups[group] for match in matcher.finditer(line)
+                               for group, value in match.groupdict().items() if value is not None and group in groups]
+                now = time.monotonic()
+
+                # Echo the output, throttled so a chatty launch does not flood the console
+                if self.echo == 'all' or (newly_ready and self.echo != 'none') or \
+                        (self.echo == 'throttled' and now - last_echo >= self.echo_interval_in_s):
+                    if suppressed:
+                        print(f"... {suppressed} lines suppressed ...")
+                        suppressed = 0
+                    print(line, end="" if line.endswith("\n") else "\n")
+                    last_echo = now
+                elif self.echo == 'throttled':
+                    suppressed += 1
+
+                for name in dict.fromkeys(newly_ready):
+                    self.latencies[name] = now - start
+                    output.console_log_OK(f"{name} ready after {self.latencies[name]:.2f}s")
+                    if Tracer.is_traced('readiness'):
+                        Tracer.add_event({'name': f"{name} ready", 'cat': 'readiness', 'ph': 'X', 'ts': start_us,
+                                          'dur': int(self.latencies[name] * 1e6), 'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {}})
+
+                # Only the components that are not ready yet are matched from now on
+                if newly_ready:
+                    groups = {group: name for group, name in groups.items() if name not in self.latencies}
+                    matcher = self.__compile(groups)
+        finally:
+            done.set()
+
+        missing = [name for name in self.patterns if name not in self.latencies]
+        if missing:
+            raise ReadinessTimeoutError(self.timeout_in_s, missing, stream_ended)
+        return self.latencies
+
+    def __compile(self, groups: Dict[str, str]) -> Optional[re.Pattern]:
+        if not groups:
+            return None
+        return re.compile('|'.join(f"(?P<{group}>{self.patterns[name]})" for group, name in groups.items()))
+
+    @staticmethod
+    def __read(stream, lines: queue.Queue, done: threading.Event):
+        # Blocking reads happen in this thread, so the deadline is enforced even when the stream goes silent
+        try:
+            for line in iter(stream.readline, ''):
+                if isinstance(line, bytes):
+                    if not line:
+                        break
+                    line = line.decode(errors='replace')
+                lines.put(line)
+                if done.is_set():
+                    return
+        except (OSError, ValueError):
+            pass    # The stream was closed
+        lines.put(ReadinessProbe.__END_OF_STREAM)
@@ -1,5 +1,6 @@
 import time
 import rospy
+from pathlib import Path
 from rospy import ServiceProxy
 from std_srvs.srv import (Empty, EmptyRequest)
 from rospy.timer import Rate
@@ -10,6 +11,7 @@ from ConfigValidator.Config.Models.RobotRunnerContext import RobotRunnerContext
 from Plugins.Systems.TurtleBot3.modules.sensors.CameraSensor import CameraSensor
 from Plugins.Systems.TurtleBot3.modules.recording.MetricsRecorder import MetricsRecorder
 from Plugins.Systems.TurtleBot3.modules.movement.MovementController import MovementController
+from Plugins.Systems.TurtleBot3.modules.movement.ControlLoopMonitor import ControlLoopMonitor
 from Plugins.Systems.TurtleBot3.modules.movement.RotationDirection import RotationDirection
 from Plugins.Systems.TurtleBot3.modules.sensors.OdomSensor import OdomSensor
 
@@ -18,8 +20,10 @@ class BasicTurtleBot3:
     odom_controller: OdomSensor
     camera_controller: CameraSensor
     mvmnt_controller: MovementController
+    loop_monitor: ControlLoopMonitor
     mvmnt_command: Twist
     ros_rate: Rate
+    run_dir: Path
 
     service_computation_start: ServiceProxy
     service_computation_stop: ServiceProxy
@@ -34,7 +38,9 @@ class BasicTurtleBot3:
         self.odom_controller = OdomSensor()
         self.camera_controller = CameraSensor()
         self.ros_rate = rospy.Rate(10)
-        self.mvmnt_controller = MovementController(self.ros_rate)
+        self.loop_monitor = ControlLoopMonitor(target_rate_hz=10)
+        self.mvmnt_controller = MovementController(self.ros_rate, self.loop_monitor)
+        self.run_dir = context.run_dir
 
         self.service_computation_start = rospy.ServiceProxy('/computation/start', Empty)
         self.service_computation_stop = rospy.ServiceProxy('/computation/stop', Empty)
@@ -50,17 +56,16 @@ class BasicTurtleBot3:
 
     def stop_run_mission(self):
         self.mvmnt_controller.stop()
+        self.loop_monitor.write_to_file(str(self.run_dir.absolute()) + '/control_loop.json')
 
     def launch_mini_mission_real_world(self, context: RobotRunnerContext):
         def drive_forward_10_seconds():
             print("driving forwards 10 seconds")
+            self.mvmnt_controller.wait_for_first_odometry()
             roll, pitch, yaw = self.odom_controller.get_odometry_as_tuple()
             self.current_heading = yaw
 
-            start_time = time.time()
-            while time.time() - start_time < 10:                
-                self.mvmnt_controller.drive_to_heading_with_speed(self.current_heading, 0.6)
-
+            self.mvmnt_controller.drive_to_heading_with_speed_for_seconds(self.current_heading, 0.6, 10)
             self.mvmnt_controller.stop()
             print("stopped driving")
 
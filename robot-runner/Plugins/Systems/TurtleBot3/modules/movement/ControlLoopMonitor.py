@@ -0,0 +1,112 @@
+import json
+import math
+import time
+from typing import Dict
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """Fixed-width millisecond histogram, the last bin collects all overflowing values"""
+
+    bin_width_ms: float
+    counts: np.ndarray
+
+    def __init__(self, bin_width_ms: float = 0.5, max_ms: float = 1000.0):
+        self.bin_width_ms = bin_width_ms
+        self.counts = np.zeros(int(math.ceil(max_ms / bin_width_ms)) + 1, dtype=np.int64)
+        self.total_ms = 0.0
+        self.max_value_ms = 0.0
+
+    def add(self, value_ms: float) -> None:
+        index = min(int(max(value_ms, 0.0) / self.bin_width_ms), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total_ms += value_ms
+        self.max_value_ms = max(self.max_value_ms, value_ms)
+
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def count_above(self, value_ms: float) -> int:
+        return int(self.counts[int(value_ms / self.bin_width_ms) + 1:].sum())
+
+    def percentile(self, q: float) -> float:
+        total = self.count()
+        if total == 0:
+            return math.nan
+        index = int(np.searchsorted(np.cumsum(self.counts), q * total, side='left'))
+        return (index + 1) * self.bin_width_ms     # Upper edge of the bin
+
+    def to_dict(self) -> dict:
+        total = self.count()
+        non_zero = np.nonzero(self.counts)[0]
+        return {
+            'count':        total,
+            'mean_ms':      self.total_ms / total if total else None,
+            'max_ms':       self.max_value_ms if total else None,
+            'p50_ms':       self.percentile(0.50) if total else None,
+            'p95_ms':       self.percentile(0.95) if total else None,
+            'p99_ms':       self.percentile(0.99) if total else None,
+            'bin_width_ms': self.bin_width_ms,
+            # Sparse representation, only non-empty bins: {bin_index: count}
+            'bins':         {str(int(i)): int(self.counts[i]) for i in non_zero}
+        }
+
+
+class ControlLoopMonitor:
+    """Per-iteration timing of a rate-limited control loop (e.g. a rospy.Rate loop).
+    Records the busy time of each iteration, the achieved period versus the target period,
+    and the age of the sensor data the control decision was based on."""
+
+    target_period_ms: float
+    histograms: Dict[str, LatencyHistogram]
+
+    def __init__(self, target_rate_hz: float, bin_width_ms: float = 0.5, max_ms: float = 1000.0):
+        self.target_period_ms = 1000.0 / target_rate_hz
+        self.__bin_width_ms = bin_width_ms
+        self.__max_ms = max_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self.histograms = {
+            'iteration_ms':   LatencyHistogram(self.__bin_width_ms, self.__max_ms),
+            'period_ms':      LatencyHistogram(self.__bin_width_ms, self.__max_ms),
+            'sensor_age_ms':  LatencyHistogram(self.__bin_width_ms, self.__max_ms)
+        }
+        self.__last_wake = None
+        self.__last_decision = None
+
+    def before_sleep(self, sensor_age_s: float = math.nan) -> None:
+        """Call right after the control command is issued, before the rate sleep"""
+        now = time.monotonic()
+        if self.__last_wake is not None:
+            self.histograms['iteration_ms'].add((now - self.__last_wake) * 1000)
+        if self.__last_decision is not None:
+            self.histograms['period_ms'].add((now - self.__last_decision) * 1000)
+        if not math.isnan(sensor_age_s):
+            self.histograms['sensor_age_ms'].add(sensor_age_s * 1000)
+
+        self.__last_decision = now
+
+    def after_sleep(self) -> None:
+        """Call right after the rate sleep returns"""
+        self.__last_wake = time.monotonic()
+
+    def end_loop(self) -> None:
+        """Call when a control loop ends, so the pause until the next loop is not counted as a period"""
+        self.__last_wake = None
+        self.__last_decision = None
+
+    def to_dict(self) -> dict:
+        period = self.histograms['period_ms']
+        return {
+            'target_period_ms':     self.target_period_ms,
+            'achieved_period_ms':   period.total_ms / period.count() if period.count() else None,
+            # An iteration overran if its period exceeded the target by more than 10%
+            'overruns':             period.count_above(self.target_period_ms * 1.1),
+            'histograms':           {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+        }
+
+    def write_to_file(self, file_path: str) -> None:
+        with open(file_path, 'w') as output_file:
+            json.dump(self.to_dict(), output_file, indent=2)
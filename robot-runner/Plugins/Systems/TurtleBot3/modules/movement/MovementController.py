@@ -10,6 +10,7 @@ from ExperimentOrchestrator.Architecture.Singleton import Singleton
 from Plugins.Systems.TurtleBot3.modules.utilties.Utilities import rotation_is_close
 from Plugins.Systems.TurtleBot3.modules.sensors.OdomSensor import OdomSensor
 from Plugins.Systems.TurtleBot3.modules.movement.RotationDirection import RotationDirection
+from Plugins.Systems.TurtleBot3.modules.movement.ControlLoopMonitor import ControlLoopMonitor
 
 class MovementController(metaclass=Singleton):
     # Controllers
@@ -18,6 +19,7 @@ class MovementController(metaclass=Singleton):
     # Publishers
     __cmd_pub: Publisher
     ros_rate: Rate
+    loop_monitor: ControlLoopMonitor = None
 
     # Rotation variables
     default_traverse_time:          float = 2.5
@@ -33,15 +35,29 @@ class MovementController(metaclass=Singleton):
     rotation_to_target_threshold:   float = 0.4 # Was 0.3
     rotation_minimal_speed:         float = 0.01 # NEEDED: robot does otherwise not have enough torque to reach target.
 
-    def __init__(self, ros_rate: Rate):
+    # Odometry waits
+    first_odometry_timeout:         float = 10.0  # Seconds to wait for the first /odom message
+    odometry_update_timeout:        float = 0.1   # Seconds to wait for a newer /odom message in a control loop
+
+    def __init__(self, ros_rate: Rate, loop_monitor: ControlLoopMonitor = None):
         self.odom_controller = OdomSensor()
         self.__cmd_pub = rospy.Publisher('/cmd_vel', Twist, queue_size=1)
         self.ros_rate = ros_rate
+        self.loop_monitor = loop_monitor
 
     def publish(self, cmd: Twist) -> None:
-        """Handle all publishing responsibility for movement"""
+        """Handle all publishing responsibility for movement, this is the only place the control loops sleep"""
         self.__cmd_pub.publish(cmd)
+
+        if self.loop_monitor:
+            self.loop_monitor.before_sleep(self.odom_controller.get_odometry_age())
         self.ros_rate.sleep()
+        if self.loop_monitor:
+            self.loop_monitor.after_sleep()
+
+    def wait_for_first_odometry(self) -> None:
+        if not self.odom_controller.wait_for_first_odometry(self.first_odometry_timeout):
+            raise TimeoutError(f"No odometry received on /odom within {self.first_odometry_timeout}s")
 
     def calculate_self_steering_angular_vel(self, current_heading, yaw) -> int:
         return (self.self_steering_modifier * self.calculate_self_steering_speed(current_heading, yaw))
@@ -49,6 +65,9 @@ class MovementController(metaclass=Singleton):
     def stop(self) -> None:
         self.publish(Twist()) # Empty twist has all values 0.0, thus motors stop.
 
+        if self.loop_monitor:
+            self.loop_monitor.end_loop()
+
     def drive(self, cmd: Twist) -> None:
         self.publish(cmd)
 
@@ -69,6 +88,8 @@ class MovementController(metaclass=Singleton):
         old_time = time.time()
         cmd = Twist()
         while time.time() - old_time <= seconds:
+            # Steer on fresh odometry only, sleeping until it arrives (at most one control period)
+            self.odom_controller.wait_for_odometry_update(timeout=self.odometry_update_timeout)
             roll, pitch, yaw = self.odom_controller.get_odometry_as_tuple()
             cmd.linear.x = speed
             cmd.angular.z = self.calculate_self_steering_angular_vel(heading, yaw)
@@ -80,9 +101,8 @@ class MovementController(metaclass=Singleton):
 
         self.stop()
 
-        roll = pitch = yaw = 0.0
-        while yaw == 0.0:
-            (roll, pitch, yaw) = self.odom_controller.get_odometry_as_tuple()
+        self.wait_for_first_odometry()
+        (roll, pitch, yaw) = self.odom_controller.get_odometry_as_tuple()
 
         old_heading = yaw
         old_time = time.time()
@@ -111,7 +131,6 @@ class MovementController(metaclass=Singleton):
             print(f"Speed= {speed} | Target={old_heading} | Current={yaw} | Approx={rotation_is_close(old_heading, yaw)}")
 
             self.publish(cmd)
-            self.ros_rate.sleep()
 
             if (time.time() - old_time > self.full_rotation_time_threshold) and rotation_is_close(old_heading, yaw):
                 break
@@ -130,9 +149,7 @@ class MovementController(metaclass=Singleton):
         turn_degrees = turn_degrees * (math.pi / 180)
         print(f"Turning radians: {turn_degrees} {direction}")
         
-        roll = pitch = yaw = 0.0
-        while yaw == 0.0:
-            (roll, pitch, yaw) = self.odom_controller.get_odometry_as_tuple()
+        self.wait_for_first_odometry()
 
         if direction == RotationDirection.CLCKWISE:
             target_rad = heading - turn_degrees
@@ -170,7 +187,6 @@ class MovementController(metaclass=Singleton):
 
             cmd.angular.z = speed
             self.publish(cmd)
-            self.ros_rate.sleep()
 
             if (time.time() - old_time > self.rotation_time_threshold) and rotation_is_close(target_rad, yaw):
                 break
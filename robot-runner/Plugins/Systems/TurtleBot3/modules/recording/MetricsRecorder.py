@@ -1,47 +1,126 @@
 from Plugins.Systems.TurtleBot3.modules.sensors.CPUSensor import CPUSensor
 from Plugins.Systems.TurtleBot3.modules.sensors.RAMSensor import RAMSensor
 from Plugins.Systems.TurtleBot3.modules.sensors.BatterySensor import BatterySensor
+from Plugins.Systems.TurtleBot3.modules.recording.SampleRingBuffer import SampleRingBuffer
 
+import json
 import threading
 import time
+import numpy as np
 
 class MetricsRecorder:
+    # Fields of a sample, in a binary recording a little-endian float64 each
+    record_fields = ['timestamp', 'cpu_usage', 'ram_usage', 'bat_percentage']
+    # Fields of a line in a text recording (cpu,ram,bat), the format it always had
+    text_fields = ['cpu_usage', 'ram_usage', 'bat_percentage']
+
     __cpu_sensor: CPUSensor
     __ram_sensor: RAMSensor
     __bat_sensor: BatterySensor
 
-    __may_threads_exist: bool
-    __is_recording: bool
-    __recording_thread: threading.Thread
+    __sampling_period: float
+    __flush_batch_size: int
+    __sample_buffer: SampleRingBuffer
+    __stop_sampling: threading.Event
+    __stop_writing: threading.Event
+    __sampling_thread: threading.Thread
+    __writing_thread: threading.Thread
+    __missed_deadlines: int
 
     __metrics_file = None
     __file_location: str
+    __binary: bool
 
-    def __init__(self, file_location: str):
+    def __init__(self, file_location: str, sampling_rate_hz: float = 10.0, buffer_capacity: int = 65536, flush_batch_size: int = 4096,
+                 binary: bool = False):
+        # binary: write raw records (incl. the timestamp) instead of text lines, its fields are described in <file>.fields.json
         self.__cpu_sensor = CPUSensor()
         self.__ram_sensor = RAMSensor()
         self.__bat_sensor = BatterySensor()
         self.__file_location = file_location
+        self.__binary = binary
+
+        self.__sampling_period = 1.0 / sampling_rate_hz
+        self.__flush_batch_size = min(flush_batch_size, buffer_capacity)
+        self.__sample_buffer = SampleRingBuffer(buffer_capacity, len(self.record_fields))
 
     def stop_recording(self):
         print("Stop recording metrics")
-        self.__is_recording = False
-        time.sleep(1) # grace period
+        self.__stop_sampling.set()
+        self.__sampling_thread.join()
+
+        # The writer drains everything that is still buffered before it exits
+        self.__stop_writing.set()
+        self.__writing_thread.join()
         self.__metrics_file.close()
 
+        if self.__missed_deadlines or self.__sample_buffer.get_dropped_count():
+            print(f"Metrics recorder missed {self.__missed_deadlines} sampling deadlines and dropped {self.__sample_buffer.get_dropped_count()} samples")
+
     def start_recording(self):
-        self.__metrics_file = open(self.__file_location, 'w+')
-        self.__is_recording = True
-        self.__recording_thread = threading.Thread(target=self.__recording)
-        self.__recording_thread.start()
-
-    def __recording(self):
-        while self.__is_recording:
-            cpu_usage:      float = self.__cpu_sensor.get_percentage()
-            ram_usage:      float = self.__ram_sensor.get_percentage()
-            bat_percentage: float = self.__bat_sensor.get_percentage()
-
-            self.__metrics_file.write(str(cpu_usage) + "," + str(ram_usage) + "," + str(bat_percentage) + "\n")
-            time.sleep(0.1)
-        
-        print("Stopped recording thread")
\ No newline at end of file
+        if self.__binary:
+            with open(self.__file_location + '.fields.json', 'w') as fields_file:
+                json.dump({'fields': self.record_fields, 'dtype': '<f8'}, fields_file)
+        self.__metrics_file = open(self.__file_location, 'wb' if self.__binary else 'w')
+        self.__missed_deadlines = 0
+        self.__stop_sampling = threading.Event()
+        self.__stop_writing = threading.Event()
+
+        self.__writing_thread = threading.Thread(target=self.__writing)
+        self.__sampling_thread = threading.Thread(target=self.__sampling)
+        self.__writing_thread.start()
+        self.__sampling_thread.start()
+
+    def __sampling(self):
+        # Deadlines are scheduled on the monotonic clock, so the rate does not drift with the sampling duration.
+        # Wall-clock timestamps are derived from the same clock to keep the samples equidistant.
+        start_monotonic = time.monotonic()
+        start_wall = time.time()
+        next_deadline = start_monotonic
+
+        while not self.__stop_sampling.is_set():
+            now = time.monotonic()
+            self.__sample_buffer.push((
+                start_wall + (now - start_monotonic),
+                self.__cpu_sensor.get_percentage(),
+                self.__ram_sensor.get_percentage(),
+                self.__bat_sensor.get_percentage()
+            ))
+
+            next_deadline += self.__sampling_period
+            now = time.monotonic()
+            if next_deadline < now:
+                # Overran one or more periods, skip them instead of bursting to catch up
+                missed = int((now - next_deadline) / self.__sampling_period) + 1
+                self.__missed_deadlines += missed
+                next_deadline += missed * self.__sampling_period
+
+            self.__stop_sampling.wait(next_deadline - time.monotonic())
+
+        print("Stopped recording thread")
+
+    def __writing(self):
+        # Flush in large batches, or at the latest every second
+        while not self.__stop_writing.is_set():
+            self.__sample_buffer.wait_for_samples(self.__flush_batch_size, timeout=1.0)
+            self.__flush()
+
+        self.__flush()
+
+    def __flush(self):
+        batch = self.__sample_buffer.pop_batch()
+        if not len(batch):
+            return
+
+        if self.__binary:
+            self.__metrics_file.write(batch.astype('<f8').tobytes())
+        else:
+            # Formatted here, in the writer thread, so the sampling thread only pushes numbers
+            self.__metrics_file.write("".join(",".join(str(value) for value in row[1:]) + "\n" for row in batch.tolist()))
+
+    @staticmethod
+    def read_metrics_file(file_location: str, binary: bool = False) -> np.ndarray:
+        """Read a recorded metrics file as an (N, len(text_fields)) array, or (N, len(record_fields)) when binary"""
+        if binary:
+            return np.fromfile(file_location, dtype='<f8').reshape(-1, len(MetricsRecorder.record_fields))
+        return np.loadtxt(file_location, delimiter=',', ndmin=2)
@@ -0,0 +1,60 @@
+import threading
+import numpy as np
+
+
+class SampleRingBuffer:
+    """Preallocated ring buffer of fixed-width float64 samples (one row per sample).
+    Meant for one producer (sampler) and one consumer (writer), pushing a sample never allocates."""
+
+    __buffer: np.ndarray
+    __capacity: int
+    __head: int = 0     # Total number of samples pushed
+    __tail: int = 0     # Total number of samples consumed
+    __dropped: int = 0
+
+    def __init__(self, capacity: int, num_of_fields: int):
+        self.__buffer = np.zeros((capacity, num_of_fields), dtype=np.float64)
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__data_available = threading.Condition(self.__lock)
+
+    def push(self, sample) -> bool:
+        with self.__lock:
+            if self.__head - self.__tail >= self.__capacity:
+                # Consumer fell a full buffer behind, keep the already buffered samples
+                self.__dropped += 1
+                return False
+
+            self.__buffer[self.__head % self.__capacity] = sample
+            self.__head += 1
+            self.__data_available.notify()
+            return True
+
+    def wait_for_samples(self, min_samples: int, timeout: float) -> int:
+        with self.__lock:
+            self.__data_available.wait_for(lambda: self.__head - self.__tail >= min_samples, timeout)
+            return self.__head - self.__tail
+
+    def pop_batch(self) -> np.ndarray:
+        """Return a copy of all buffered samples (oldest first) and release their slots"""
+        with self.__lock:
+            head, tail = self.__head, self.__tail
+
+        if head == tail:
+            return self.__buffer[:0].copy()
+
+        start, end = tail % self.__capacity, head % self.__capacity
+        if start < end:
+            batch = self.__buffer[start:end].copy()
+        else:
+            batch = np.concatenate((self.__buffer[start:], self.__buffer[:end]))
+
+        with self.__lock:
+            self.__tail = head
+        return batch
+
+    def get_dropped_count(self) -> int:
+        return self.__dropped
+
+    def __len__(self) -> int:
+        return self.__head - self.__tail
@@ -3,16 +3,24 @@ from rospy.topics import Subscriber
 from sensor_msgs.msg import BatteryState
 
 from ExperimentOrchestrator.Architecture.Singleton import Singleton
+from Plugins.Systems.TurtleBot3.modules.sensors.SensorCache import SensorCache
 
 class BatterySensor(metaclass=Singleton):
     __battery_sub: Subscriber
-    __battery_percentage: float = 0.0
+    __cache: SensorCache
 
-    def __init__(self):
+    def __init__(self, history_size: int = 4096):
+        self.__cache = SensorCache(['percentage', 'voltage'], history_size)
         self.__battery_sub = rospy.Subscriber('/battery_state', BatteryState, self.__battery_callback)
 
     def __battery_callback(self, msg: BatteryState):
-        self.__battery_percentage = msg.percentage
+        self.__cache.push((msg.percentage, msg.voltage), msg.header.stamp.to_sec())
 
     def get_percentage(self) -> float:
-        return self.__battery_percentage
\ No newline at end of file
+        return self.__cache.get_latest('percentage')
+
+    def get_voltage(self) -> float:
+        return self.__cache.get_latest('voltage')
+
+    def get_cache(self) -> SensorCache:
+        return self.__cache
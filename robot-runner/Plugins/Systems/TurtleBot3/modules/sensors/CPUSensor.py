@@ -3,16 +3,24 @@ from std_msgs.msg import Float64
 from rospy import Subscriber
 
 from ExperimentOrchestrator.Architecture.Singleton import Singleton
+from Plugins.Systems.TurtleBot3.modules.sensors.SensorCache import SensorCache
 
 class CPUSensor(metaclass=Singleton):
     __cpu_sub: Subscriber
-    __cpu_percentage: float = 0.0
+    __cache: SensorCache
 
-    def __init__(self):
+    def __init__(self, history_size: int = 4096):
+        self.__cache = SensorCache(['percentage'], history_size)
         self.__cpu_sub = rospy.Subscriber('/cpu_usage', Float64, self.__cpu_usage_clbk)
 
     def __cpu_usage_clbk(self, msg: Float64):
-        self.__cpu_percentage = msg.data
+        self.__cache.push((msg.data,))
 
     def get_percentage(self) -> float:
-        return self.__cpu_percentage
\ No newline at end of file
+        return self.__cache.get_latest('percentage')
+
+    def get_mean_percentage(self, t0: float, t1: float) -> float:
+        return self.__cache.mean_between('percentage', t0, t1)
+
+    def get_cache(self) -> SensorCache:
+        return self.__cache
@@ -1,23 +1,62 @@
+import math
+import time
 from typing import Tuple
+import numpy as np
 import rospy
 from rospy.topics import Subscriber
 from nav_msgs.msg import Odometry
-from squaternion import Quaternion
 
 from ExperimentOrchestrator.Architecture.Singleton import Singleton
+from Plugins.Systems.TurtleBot3.modules.sensors.SensorCache import SensorCache
+
+def quaternion_rows_to_roll(q: np.ndarray) -> np.ndarray:
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+
+def quaternion_rows_to_pitch(q: np.ndarray) -> np.ndarray:
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+
+def quaternion_rows_to_yaw(q: np.ndarray) -> np.ndarray:
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
 
 class OdomSensor(metaclass=Singleton):
     __odom_sub: Subscriber
-    __roll = __pitch = __yaw = 0.0
+    __cache: SensorCache
 
-    def __init__(self):
+    def __init__(self, history_size: int = 4096):
+        # Only the raw orientation is stored on receive, Euler angles are computed when read
+        self.__cache = SensorCache(['w', 'x', 'y', 'z'], history_size, derived={
+            'roll':  quaternion_rows_to_roll,
+            'pitch': quaternion_rows_to_pitch,
+            'yaw':   quaternion_rows_to_yaw
+        })
         self.__odom_sub = rospy.Subscriber('/odom', Odometry, self.__odom_callback)
         
     def __odom_callback(self, msg: Odometry):
         orientation_q = msg.pose.pose.orientation
-        q = Quaternion(orientation_q.w, orientation_q.x, orientation_q.y, orientation_q.z)
-        (self.__roll, self.__pitch, self.__yaw) = q.to_euler()
-        # VERBOSE: print(self.roll, self.pitch, self.yaw)
+        self.__cache.push((orientation_q.w, orientation_q.x, orientation_q.y, orientation_q.z), msg.header.stamp.to_sec())
 
     def get_odometry_as_tuple(self) -> Tuple[float, float, float]:
-        return (self.__roll, self.__pitch, self.__yaw)
\ No newline at end of file
+        return (self.__cache.get_latest('roll'), self.__cache.get_latest('pitch'), self.__cache.get_latest('yaw'))
+
+    def get_odometry_age(self) -> float:
+        """Seconds since the latest odometry message was received (NaN if none was received)"""
+        return time.time() - self.__cache.get_latest_receive_time()
+
+    def wait_for_first_odometry(self, timeout: float = None) -> bool:
+        return self.__cache.wait_for_sample(timeout)
+
+    def wait_for_odometry_update(self, timeout: float = None) -> bool:
+        """Block until an odometry message newer than the latest one read is received"""
+        return self.__cache.wait_for_new_sample(self.__cache.get_count(), timeout)
+
+    def wait_until_yaw_within(self, target: float, tolerance: float, timeout: float = None) -> bool:
+        return self.__cache.wait_until('yaw', lambda yaw: abs(math.remainder(yaw - target, 2 * math.pi)) <= tolerance, timeout)
+
+    def get_yaw_at(self, t: float) -> float:
+        return self.__cache.value_at('yaw', t, use_header_time=True)
+
+    def get_cache(self) -> SensorCache:
+        return self.__cache
@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+class SensorCache:
+    """Thread-safe history of raw sensor samples in fixed-size NumPy ring buffers.
+    Every sample is stored with its receive time and (if available) its message header time.
+    Derived values (e.g. Euler angles from a quaternion) are computed lazily on read, vectorised
+    over the requested samples, so subscriber callbacks only copy the raw fields."""
+
+    __fields: List[str]
+    __derived: Dict[str, Callable[[np.ndarray], np.ndarray]]
+    __capacity: int
+    __count: int = 0
+
+    def __init__(self, fields: List[str], capacity: int = 4096, derived: Dict[str, Callable[[np.ndarray], np.ndarray]] = None):
+        self.__fields = list(fields)
+        self.__derived = derived or {}
+        self.__capacity = capacity
+
+        self.__receive_times = np.full(capacity, np.nan)
+        self.__header_times = np.full(capacity, np.nan)
+        self.__values = np.zeros((capacity, len(self.__fields)), dtype=np.float64)
+
+        self.__lock = threading.Lock()
+        self.__sample_received = threading.Condition(self.__lock)
+        self.__latest_derived: Dict[str, Tuple[int, float]] = {}
+
+    def push(self, raw_values: Tuple[float, ...], header_time: float = math.nan) -> None:
+        receive_time = time.time()
+        with self.__lock:
+            index = self.__count % self.__capacity
+            self.__receive_times[index] = receive_time
+            self.__header_times[index] = header_time
+            self.__values[index] = raw_values
+            self.__count += 1
+            self.__sample_received.notify_all()
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def has_samples(self) -> bool:
+        return self.__count > 0
+
+    def wait_for_sample(self, timeout: float = None) -> bool:
+        """Block until at least one sample is received, False on timeout"""
+        return self.wait_for_new_sample(0, timeout)
+
+    def wait_for_new_sample(self, after_count: int, timeout: float = None) -> bool:
+        """Block until more than after_count samples are received in total, False on timeout"""
+        with self.__sample_received:
+            return self.__sample_received.wait_for(lambda: self.__count > after_count, timeout)
+
+    def wait_until(self, name: str, predicate: Callable[[float], bool], timeout: float = None) -> bool:
+        """Block until the latest value of name satisfies predicate, re-evaluated on every new sample"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            count = self.__count
+            if count > 0 and predicate(self.get_latest(name)):
+                return True
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self.wait_for_new_sample(count, remaining)
+
+    def get_latest_receive_time(self) -> float:
+        with self.__lock:
+            if self.__count == 0:
+                return math.nan
+            return float(self.__receive_times[(self.__count - 1) % self.__capacity])
+
+    def get_latest(self, name: str, default: float = 0.0) -> float:
+        """Latest value of a raw field or derived value, derived values are computed at most once per sample"""
+        with self.__lock:
+            if self.__count == 0:
+                return default
+
+            sequence = self.__count
+            cached = self.__latest_derived.get(name)
+            if cached is not None and cached[0] == sequence:
+                return cached[1]
+
+            latest_row = self.__values[(sequence - 1) % self.__capacity].copy()
+
+        value = float(self.__evaluate(name, latest_row[np.newaxis, :])[0])
+        with self.__lock:
+            self.__latest_derived[name] = (sequence, value)
+        return value
+
+    def value_at(self, name: str, t: float, use_header_time: bool = False) -> float:
+        """Value of the last sample received at or before time t (NaN if none is buffered)"""
+        times, values = self.__chronological(use_header_time)
+        index = np.searchsorted(times, t, side='right') - 1
+        if index < 0:
+            return math.nan
+        return float(self.__evaluate(name, values[index:index + 1])[0])
+
+    def mean_between(self, name: str, t0: float, t1: float, use_header_time: bool = False) -> float:
+        """Mean over all samples with t0 <= time <= t1 (NaN if none is buffered)"""
+        return self.__reduce_between(name, t0, t1, use_header_time, np.mean)
+
+    def max_between(self, name: str, t0: float, t1: float, use_header_time: bool = False) -> float:
+        return self.__reduce_between(name, t0, t1, use_header_time, np.max)
+
+    def window(self, name: str, t0: float, t1: float, use_header_time: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Times and values of all buffered samples with t0 <= time <= t1"""
+        times, values = self.__chronological(use_header_time)
+        start, end = np.searchsorted(times, t0, side='left'), np.searchsorted(times, t1, side='right')
+        return times[start:end], self.__evaluate(name, values[start:end])
+
+    def __reduce_between(self, name, t0, t1, use_header_time, reduce_func) -> float:
+        _, values = self.window(name, t0, t1, use_header_time)
+        if len(values) == 0:
+            return math.nan
+        return float(reduce_func(values))
+
+    def __chronological(self, use_header_time: bool) -> Tuple[np.ndarray, np.ndarray]:
+        with self.__lock:
+            count = min(self.__count, self.__capacity)
+            start = self.__count % self.__capacity if self.__count > self.__capacity else 0
+            order = (np.arange(count) + start) % self.__capacity
+            times = (self.__header_times if use_header_time else self.__receive_times)[order]
+            values = self.__values[order]
+
+        # Header times can arrive out of order, queries need a sorted time axis
+        if use_header_time:
+            valid = ~np.isnan(times)
+            times, values = times[valid], values[valid]
+            sort = np.argsort(times, kind='stable')
+            times, values = times[sort], values[sort]
+
+        return times, values
+
+    def __evaluate(self, name: str, rows: np.ndarray) -> np.ndarray:
+        if name in self.__derived:
+            return self.__derived[name](rows)
+        return rows[:, self.__fields.index(name)]
@@ -6,9 +6,13 @@ from ProgressManager.Output.BaseOutputManager import BaseOutputManager
 from tempfile import NamedTemporaryFile
 import shutil
 import csv
-from typing import Dict, List
+import json
+from typing import Dict, List, Optional
 
 class CSVOutputManager(BaseOutputManager):
+    # Run ids of the rows that are not DONE yet, in run table order, so a restart can skip straight to them
+    progress_index_file_name: str = 'progress_index.json'
+
     def read_run_table_from_csv(self) -> List[Dict]:
         read_run_table = []
         try:
@@ -40,6 +44,20 @@ class CSVOutputManager(BaseOutputManager):
         except:
             raise ExperimentOutputFileDoesNotExistError
 
+        self.write_progress_index([row['__run_id'] for row in run_table if row['__done'] != RunProgress.DONE.name])
+
+    def write_progress_index(self, pending_run_ids: List[str]):
+        with open(self._experiment_path + '/' + self.progress_index_file_name, 'w') as index_file:
+            json.dump({'pending': pending_run_ids}, index_file)
+
+    def read_pending_run_ids(self) -> Optional[List[str]]:
+        """The run ids that are not DONE yet, None if the experiment has no (valid) progress index"""
+        try:
+            with open(self._experiment_path + '/' + self.progress_index_file_name, 'r') as index_file:
+                return list(json.load(index_file)['pending'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
     # TODO: Nice To have
     def shuffle_experiment_run_table(self):
         pass
@@ -61,6 +79,17 @@ class CSVOutputManager(BaseOutputManager):
                     writer.writerow(row)
 
         shutil.move(tempfile.name, self._experiment_path + '/run_table.csv')
+
+        # Updated after the CSV, a crash in between can only leave a DONE row pending (and run it again)
+        pending_run_ids = self.read_pending_run_ids()
+        if pending_run_ids is not None:
+            is_done = getattr(updated_row['__done'], 'name', updated_row['__done']) == RunProgress.DONE.name
+            if is_done and updated_row['__run_id'] in pending_run_ids:
+                pending_run_ids.remove(updated_row['__run_id'])
+                self.write_progress_index(pending_run_ids)
+            elif not is_done and updated_row['__run_id'] not in pending_run_ids:
+                pending_run_ids.append(updated_row['__run_id'])
+                self.write_progress_index(pending_run_ids)
         output.console_log_WARNING(f"CSVManager: Updated row {updated_row['__run_id']}")
 
         # with open(self.experiment_path + '/run_table.csv', 'w', newline='') as myfile:
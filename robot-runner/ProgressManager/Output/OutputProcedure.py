@@ -1,7 +1,9 @@
 import time
-from tabulate import tabulate
 from ExperimentOrchestrator.Misc.DictConversion import class_to_dict
 from ExperimentOrchestrator.Misc.BashHeaders import BashHeaders
+from ExperimentOrchestrator.Misc.LazyImport import lazy_import
+
+tabulate = lazy_import('tabulate')
 
 ###     =========================================================
 ###     |                                                       |
@@ -47,11 +49,11 @@ class OutputProcedure:
     def console_log_tabulate_dict(d: dict):     # Used to output dictionary as readable, pretty table
         headers = ['Key', 'Value']
         data = [(k, v) for k, v in d.items()]
-        print(f"\n\n{tabulate(data, headers=headers)}\n\n")
+        print(f"\n\n{tabulate.tabulate(data, headers=headers)}\n\n")
 
     @staticmethod
     def console_log_tabulate_class(class_to_dict):
         d = class_to_dict(class_to_dict)
         headers = ['Key', 'Value']
         data = [(k, v) for k, v in d.items()]
-        print(f"\n\n{tabulate(data, headers=headers)}\n\n")
\ No newline at end of file
+        print(f"\n\n{tabulate.tabulate(data, headers=headers)}\n\n")
\ No newline at end of file
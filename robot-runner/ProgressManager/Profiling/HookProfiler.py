@@ -0,0 +1,210 @@
+import cProfile
+import fnmatch
+import glob
+import json
+import os
+import pstats
+import re
+import threading
+import tracemalloc
+from typing import Callable, Dict, List
+from ConfigValidator.CustomErrors.ConfigErrors import ConfigAttributeInvalidError
+
+###     =========================================================
+###     |                                                       |
+###     |                      HookProfiler                     |
+###     |       - Opt-in profiling of the event callbacks       |
+###     |         (config hooks) inside the run process         |
+###     |       - 'cprofile': deterministic profile, written    |
+###     |         as .pstats and collapsed stacks (flamegraph)  |
+###     |       - 'tracemalloc': top-N allocations per hook     |
+###     |       - Run reports are merged into an experiment     |
+###     |         level view                                    |
+###     |                                                       |
+###     =========================================================
+class HookProfiler:
+    available_modes:        List[str] = ['cprofile', 'tracemalloc']
+    folder_name:            str = 'profiling'
+
+    __modes:                List[str] = []
+    __top_n:                int = 25
+    __active:               bool = False
+    __lock = threading.Lock()
+    __local = threading.local()
+    __stats:                'pstats.Stats' = None
+    __allocations:          Dict[str, Dict[str, List[int]]] = {}    # hook -> location -> [size_diff, count_diff]
+
+    @staticmethod
+    def configure(modes: List[str] = None, top_n: int = 25):
+        unknown = [mode for mode in (modes or []) if mode not in HookProfiler.available_modes]
+        if unknown:
+            raise ConfigAttributeInvalidError('profiling_modes', modes, HookProfiler.available_modes)
+
+        HookProfiler.__modes = list(modes or [])
+        HookProfiler.__top_n = top_n
+
+    @staticmethod
+    def is_enabled(mode: str = None) -> bool:
+        return mode in HookProfiler.__modes if mode else bool(HookProfiler.__modes)
+
+    @staticmethod
+    def begin_run():
+        """Start collecting in the current (run) process, hooks outside of a run are not profiled"""
+        HookProfiler.__stats = None
+        HookProfiler.__allocations = {}
+        HookProfiler.__active = HookProfiler.is_enabled()
+
+        if HookProfiler.is_enabled('tracemalloc') and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    @staticmethod
+    def call(hook_name: str, func: Callable, *args):
+        """Call func(*args), profiled as hook_name when profiling is active"""
+        # Nested hooks (an event raised from within a hook) are part of the outer profile
+        if not HookProfiler.__active or getattr(HookProfiler.__local, 'depth', 0) > 0:
+            return func(*args)
+
+        HookProfiler.__local.depth = 1
+        profiler = cProfile.Profile() if HookProfiler.is_enabled('cprofile') else None
+        # NOTE: tracemalloc is process wide, allocations of concurrent hooks are attributed to all of them
+        snapshot_before = HookProfiler.__take_snapshot() if HookProfiler.is_enabled('tracemalloc') else None
+
+        try:
+            return profiler.runcall(func, *args) if profiler else func(*args)
+        finally:
+            snapshot_after = HookProfiler.__take_snapshot() if snapshot_before else None
+            HookProfiler.__local.depth = 0
+
+            with HookProfiler.__lock:
+                if profiler:
+                    if HookProfiler.__stats is None:
+                        HookProfiler.__stats = pstats.Stats(profiler)
+                    else:
+                        HookProfiler.__stats.add(profiler)
+                if snapshot_after:
+                    HookProfiler.__add_allocations(hook_name, snapshot_after.compare_to(snapshot_before, 'lineno'))
+
+    @staticmethod
+    def end_run(run_dir: str):
+        """Stop collecting and write the reports of this run into <run_dir>/profiling"""
+        if not HookProfiler.__active:
+            return
+
+        HookProfiler.__active = False
+        if HookProfiler.is_enabled('tracemalloc') and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        output_dir = os.path.join(run_dir, HookProfiler.folder_name)
+        os.makedirs(output_dir, exist_ok=True)
+        HookProfiler.__write_reports(output_dir, HookProfiler.__stats, HookProfiler.__allocations, HookProfiler.__top_n)
+
+    @staticmethod
+    def merge_run_reports(experiment_path: str):
+        """Merge the reports of all runs of the experiment into <experiment_path>/profiling"""
+        if not HookProfiler.is_enabled():
+            return
+
+        run_folders = sorted(glob.glob(os.path.join(experiment_path, '*', HookProfiler.folder_name)))
+        pstats_files = [os.path.join(folder, 'hooks.pstats') for folder in run_folders if os.path.isfile(os.path.join(folder, 'hooks.pstats'))]
+        stats = pstats.Stats(*pstats_files) if pstats_files else None
+
+        allocations: Dict[str, Dict[str, List[int]]] = {}
+        for folder in run_folders:
+            try:
+                with open(os.path.join(folder, 'allocations.json'), 'r') as allocations_file:
+                    run_allocations = json.load(allocations_file)
+            except (OSError, ValueError):
+                continue
+
+            for hook_name, locations in run_allocations.items():
+                merged = allocations.setdefault(hook_name, {})
+                for location, (size_diff, count_diff) in locations.items():
+                    totals = merged.setdefault(location, [0, 0])
+                    totals[0] += size_diff
+                    totals[1] += count_diff
+
+        output_dir = os.path.join(experiment_path, HookProfiler.folder_name)
+        os.makedirs(output_dir, exist_ok=True)
+        HookProfiler.__write_reports(output_dir, stats, allocations, HookProfiler.__top_n)
+
+    @staticmethod
+    def to_collapsed_stacks(stats: 'pstats.Stats') -> List[str]:
+        """Reconstruct 'caller;callee <microseconds>' lines (flamegraph.pl / speedscope input) from the call graph.
+        cProfile only records caller-callee edges, so the time of a function is attributed to its call paths
+        proportionally to the cumulative time of every edge."""
+        callees: Dict[tuple, Dict[tuple, tuple]] = {}
+        for func, (_, _, _, _, callers) in stats.stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, {})[func] = edge
+
+        lines: Dict[str, float] = {}
+
+        def visit(func, stack: List[str], path_cumulative: float):
+            _, _, total_time, cumulative_time, _ = stats.stats[func]
+            if cumulative_time <= 0 or path_cumulative < 1e-6 or len(stack) >= 128:
+                return
+
+            frame = HookProfiler.__frame_name(func)
+            path = stack + [frame]
+            key = ';'.join(path)
+            lines[key] = lines.get(key, 0.0) + path_cumulative * (total_time / cumulative_time)
+
+            scale = path_cumulative / cumulative_time
+            for callee, edge in callees.get(func, {}).items():
+                if callee in stats.stats and HookProfiler.__frame_name(callee) not in path:    # Break recursion
+                    visit(callee, path, edge[3] * scale)
+
+        roots = [func for func, (_, _, _, _, callers) in stats.stats.items() if not callers]
+        for root in roots:
+            visit(root, [], stats.stats[root][3])
+
+        return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in sorted(lines.items()) if int(seconds * 1e6) > 0]
+
+    @staticmethod
+    def __take_snapshot() -> 'tracemalloc.Snapshot':
+        # Allocations of the profiling machinery itself are not reported
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, fnmatch.__file__),                       # Used by the filters on first use
+            tracemalloc.Filter(False, os.path.join(os.path.dirname(re.__file__), '*'))
+        ])
+
+    @staticmethod
+    def __add_allocations(hook_name: str, differences):
+        locations = HookProfiler.__allocations.setdefault(hook_name, {})
+        for difference in differences:
+            if difference.size_diff == 0:
+                continue
+            frame = difference.traceback[0]
+            totals = locations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+            totals[0] += difference.size_diff
+            totals[1] += difference.count_diff
+
+    @staticmethod
+    def __write_reports(output_dir: str, stats: 'pstats.Stats', allocations: Dict[str, Dict[str, List[int]]], top_n: int):
+        if stats is not None:
+            stats.dump_stats(os.path.join(output_dir, 'hooks.pstats'))
+            with open(os.path.join(output_dir, 'hooks.collapsed'), 'w') as collapsed_file:
+                collapsed_file.write('\n'.join(HookProfiler.to_collapsed_stacks(stats)) + '\n')
+
+        if allocations:
+            with open(os.path.join(output_dir, 'allocations.json'), 'w') as allocations_file:
+                json.dump(allocations, allocations_file)
+
+            with open(os.path.join(output_dir, 'allocations.txt'), 'w') as report_file:
+                for hook_name, locations in allocations.items():
+                    report_file.write(f"== {hook_name} (top {top_n}) ==\n")
+                    top = sorted(locations.items(), key=lambda item: abs(item[1][0]), reverse=True)[:top_n]
+                    for location, (size_diff, count_diff) in top:
+                        report_file.write(f"{size_diff / 1024:>12.1f} KiB {count_diff:>+9d} blocks  {location}\n")
+                    report_file.write("\n")
+
+    @staticmethod
+    def __frame_name(func: tuple) -> str:
+        filename, line, name = func
+        if filename == '~':     # Built-in functions
+            return name
+        return f"{name} ({os.path.basename(filename)}:{line})"
@@ -2,4 +2,6 @@ from enum import Enum
 
 class RunProgress(Enum):
     TODO = 1
-    DONE = 2
\ No newline at end of file
+    DONE = 2
+    FAILED = 3      # The run process raised an error or exited with a non-zero exit code
+    TIMEOUT = 4     # The run (or one of its events) exceeded its timeout and was terminated
\ No newline at end of file
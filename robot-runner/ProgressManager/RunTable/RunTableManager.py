@@ -1,11 +1,195 @@
-from ConfigValidator.Config.RobotRunnerConfig import RobotRunnerConfig
-from ProgressManager.Output.CSVOutputManager import CSVOutputManager
+import csv
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from ConfigValidator.Config.Models.RunTableModel import RunTableModel
+from ProgressManager.RunTable.Models.RunProgress import RunProgress
+from ExperimentOrchestrator.Misc.SelfOverheadMonitor import SelfOverheadMonitor
+from ExperimentOrchestrator.Experiment.Run.RunRetryQueue import RunRetryQueue
+
+###     =========================================================
+###     |                                                       |
+###     |                    RunTableManager                    |
+###     |       - Stores a fingerprint of the design (factors,  |
+###     |         treatments, exclusions, repetitions, seed     |
+###     |         and columns) in the experiment folder         |
+###     |       - Validates a restart against it, without       |
+###     |         creating the run table or reading the CSV     |
+###     |       - Migrates the run table of an experiment to a  |
+###     |         changed design, keeping the completed rows    |
+###     |       - Adds the reserved columns robot-runner fills  |
+###     |         in itself, which are not part of the design   |
+###     |                                                       |
+###     =========================================================
 class RunTableManager:
+    fingerprint_file_name: str = 'design_fingerprint.json'
+
+    @staticmethod
+    def get_model(design: Union[RunTableModel, List[Dict]]) -> Optional[RunTableModel]:
+        """create_run_table returns either a RunTableModel, or the rows it created (which remember their model)"""
+        return design if isinstance(design, RunTableModel) else getattr(design, 'model', None)
+
+    @staticmethod
+    def get_run_table(design: Union[RunTableModel, List[Dict]]) -> List[Dict]:
+        if isinstance(design, RunTableModel):
+            if not design.get_experiment_run_table():
+                design.create_experiment_run_table()
+            return design.get_experiment_run_table()
+        return design
+
+    @staticmethod
+    def get_fingerprint(design: Union[RunTableModel, List[Dict]]) -> str:
+        model = RunTableManager.get_model(design)
+        if model is not None:
+            return model.get_fingerprint()
+
+        # Run tables not created by a RunTableModel: only the columns are known
+        return hashlib.sha256(json.dumps(sorted(RunTableManager.get_design_columns(design))).encode()).hexdigest()
+
+    @staticmethod
+    def write_fingerprint(experiment_path: str, design: Union[RunTableModel, List[Dict]]) -> None:
+        model = RunTableManager.get_model(design)
+        with open(Path(experiment_path) / RunTableManager.fingerprint_file_name, 'w') as fingerprint_file:
+            json.dump({
+                'fingerprint': RunTableManager.get_fingerprint(design),
+                'design': model.get_design() if model is not None else {'columns': RunTableManager.get_design_columns(design)}
+            }, fingerprint_file, indent=2)
+
+    @staticmethod
+    def read_fingerprint(experiment_path: str) -> Optional[Dict]:
+        try:
+            with open(Path(experiment_path) / RunTableManager.fingerprint_file_name, 'r') as fingerprint_file:
+                return json.load(fingerprint_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def are_config_and_restart_design_equal(experiment_path: str, design: Union[RunTableModel, List[Dict]]) -> bool:
+        stored = RunTableManager.read_fingerprint(experiment_path)
+        if stored is not None:
+            if stored.get('fingerprint') == RunTableManager.get_fingerprint(design):
+                return True
+
+            # Experiments created while the reserved columns were part of the design: compare the stored design without them
+            model = RunTableManager.get_model(design)
+            stored_design = stored.get('design')
+            if model is None or not isinstance(stored_design, dict) or 'columns' not in stored_design:
+                return False
+            stored_design = dict(stored_design, columns=[column for column in stored_design['columns'] if not RunTableManager.is_reserved_column(column)])
+            return stored_design == json.loads(json.dumps(model.get_design()))
+
+        # Experiments started before fingerprints were stored: compare the columns with the CSV header,
+        # without the reserved columns that were added since (see add_missing_reserved_columns)
+        column_names = RunTableManager.get_design_columns(design)
+        try:
+            with open(Path(experiment_path) / 'run_table.csv', 'r') as csvfile:
+                csv_column_names = next(csv.reader(csvfile), [])
+        except OSError:
+            return False
+
+        return {column for column in csv_column_names if not RunTableManager.is_reserved_column(column)} == \
+               {column for column in column_names if not RunTableManager.is_reserved_column(column)}
+
     @staticmethod
-    def are_config_and_restart_csv_equal(config: RobotRunnerConfig) -> bool:
-        data_manager = CSVOutputManager()
-        csv_run_table = data_manager.read_run_table_from_csv()
-        config_run_table = config.create_run_table()
+    def get_design_columns(design: Union[RunTableModel, List[Dict]]) -> List[str]:
+        """The columns of the design, without the reserved columns added to its rows"""
+        model = RunTableManager.get_model(design)
+        if model is not None:
+            return model.get_column_names()
+        return [column for column in design[-1].keys() if not RunTableManager.is_reserved_column(column)]
+
+    @staticmethod
+    def get_reserved_columns() -> Dict[str, Any]:
+        """The reserved columns of every run table, with the value of a run that did not fill them in (yet)"""
+        reserved_columns = {column: " " for column in SelfOverheadMonitor.reserved_columns + RunRetryQueue.reserved_columns}
+        reserved_columns[RunRetryQueue.attempts_column] = 0
+        return reserved_columns
+
+    @staticmethod
+    def is_reserved_column(column: str) -> bool:
+        """Columns robot-runner fills in itself (e.g. __attempts), other than the __run_id and __done it always had"""
+        return column.startswith('__') and column not in ['__run_id', '__done']
+
+    @staticmethod
+    def add_missing_reserved_columns(run_table: List[Dict], extra_columns: List[str] = ()) -> List[str]:
+        """Add the reserved columns, and the extra (optional) reserved columns in use by the config (e.g. the idle
+        baseline columns), that the run table does not have yet: to a new run table, or to the one of an experiment
+        created before they existed. Returns the added columns."""
+        if not run_table:
+            return []
+
+        reserved_columns = RunTableManager.get_reserved_columns()
+        missing = [column for column in list(reserved_columns) + list(extra_columns) if column not in run_table[0]]
+        for row in run_table:
+            for column in missing:
+                row[column] = reserved_columns.get(column, " ")
+        return missing
+
+    @staticmethod
+    def migrate_run_table(experiment_path: str, design: Union[RunTableModel, List[Dict]], old_run_table: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """Build the run table of the new design, re-using the rows of the old run table with the same treatments
+        (and repetition). Kept rows keep their run id, progress and data; new rows get fresh run ids.
+        The old run table and fingerprint are backed up. Returns the new run table and a summary of the migration."""
+        model = RunTableManager.get_model(design)
+        if model is None:
+            raise ValueError("a design migration needs create_run_table to return a RunTableModel (or its rows)")
+
+        factor_names = [factor.get_factor_name() for factor in model.get_factors()]
+        column_names = model.get_column_names()
+        has_repetitions = 'repetition' in column_names
+
+        # The reserved columns are not in the design, the kept runs keep them and the new runs start with their defaults
+        old_columns = list(old_run_table[0].keys()) if old_run_table else []
+        column_names += [column for column in old_columns if RunTableManager.is_reserved_column(column) and column not in column_names]
+        reserved_columns = RunTableManager.get_reserved_columns()
+
+        def match_key(row: Dict) -> Optional[Tuple]:
+            if any(factor_name not in row for factor_name in factor_names):
+                return None     # Rows from before a factor was added match nothing
+            key = tuple(str(row[factor_name]) for factor_name in factor_names)
+            # A design without repetitions has a single (first) repetition
+            return key + (str(row.get('repetition', 1)) if has_repetitions else '1',)
+
+        old_rows = {}
+        for row in old_run_table:
+            if has_repetitions or str(row.get('repetition', 1)) == '1':
+                old_rows.setdefault(match_key(row), row)
+
+        next_run_nr = max([int(str(row['__run_id']).rsplit('_', 1)[-1]) for row in old_run_table
+                           if str(row['__run_id']).rsplit('_', 1)[-1].isdigit()] + [0]) + 1
+
+        kept, added = [], []
+        for new_row in RunTableManager.get_run_table(design):
+            old_row = old_rows.pop(match_key(new_row), None)
+            if old_row is not None:
+                # Values of kept columns are preserved, new columns start empty
+                kept.append({column: old_row.get(column, new_row.get(column, reserved_columns.get(column, " "))) for column in column_names})
+            else:
+                added.append(dict({column: new_row.get(column, reserved_columns.get(column, " ")) for column in column_names},
+                                  __run_id=f'run_{next_run_nr}'))
+                next_run_nr += 1
+
+        # Kept rows first, in their original order, so the run table reads as the old one extended with new rows
+        old_order = {row['__run_id']: i for i, row in enumerate(old_run_table)}
+        kept.sort(key=lambda row: old_order[row['__run_id']])
+        kept_run_ids = {row['__run_id'] for row in kept}
+
+        backup_suffix = time.strftime('%Y%m%d_%H%M%S')
+        for file_name in ['run_table.csv', RunTableManager.fingerprint_file_name]:
+            if (Path(experiment_path) / file_name).exists():
+                shutil.copy(Path(experiment_path) / file_name, Path(experiment_path) / f"{Path(file_name).stem}.backup_{backup_suffix}{Path(file_name).suffix}")
 
-        return set(csv_run_table[-1].keys()) == set(config_run_table[-1].keys())
\ No newline at end of file
+        summary = {
+            'kept_done':        sum(1 for row in kept if row['__done'] == RunProgress.DONE),
+            'kept_todo':        sum(1 for row in kept if row['__done'] != RunProgress.DONE),
+            'added':            len(added),
+            'dropped':          [row['__run_id'] for row in old_run_table if row['__run_id'] not in kept_run_ids],
+            'added_columns':    [column for column in column_names if column not in old_columns],
+            'dropped_columns':  [column for column in old_columns if column not in column_names],
+            'backup_suffix':    backup_suffix
+        }
+        return kept + added, summary
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, List
+
+###     =========================================================
+###     |                                                       |
+###     |                         Tracer                        |
+###     |       - Records nested timing spans of the            |
+###     |         orchestration (experiment, run, events,       |
+###     |         hooks, profilers, SSH)                        |
+###     |       - Writes them as Chrome trace event JSON,       |
+###     |         which can be opened in Perfetto               |
+###     |         (ui.perfetto.dev) or chrome://tracing         |
+###     |                                                       |
+###     =========================================================
+class Tracer:
+    __events: List[dict] = []
+    __lock = threading.Lock()
+    __enabled: bool = True
+    __categories: List[str] = None      # None means all categories are traced
+
+    @staticmethod
+    def configure(enabled: bool = True, categories: List[str] = None):
+        Tracer.__enabled = enabled
+        Tracer.__categories = categories
+
+    @staticmethod
+    def is_traced(category: str) -> bool:
+        return Tracer.__enabled and (Tracer.__categories is None or category in Tracer.__categories)
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, category: str = 'orchestration', **args):
+        """Time the enclosed block as a complete ('X') event, spans nest by time per process and thread"""
+        if not Tracer.is_traced(category):
+            yield
+            return
+
+        start_us = time.time_ns() // 1000
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Tracer.add_event({
+                'name': name,
+                'cat':  category,
+                'ph':   'X',
+                'ts':   start_us,
+                'dur':  int((time.perf_counter() - start) * 1e6),
+                'pid':  os.getpid(),
+                'tid':  threading.get_ident(),
+                'args': {key: str(value) for key, value in args.items()}
+            })
+
+    @staticmethod
+    def traced(name: str = None, category: str = 'orchestration') -> Callable:
+        """Decorator variant of span, the span is named after the function by default"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with Tracer.span(name or func.__qualname__, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def add_event(event: dict):
+        with Tracer.__lock:
+            Tracer.__events.append(event)
+
+    @staticmethod
+    def add_events(events: List[dict]):
+        with Tracer.__lock:
+            Tracer.__events.extend(events)
+
+    @staticmethod
+    def get_events() -> List[dict]:
+        with Tracer.__lock:
+            return list(Tracer.__events)
+
+    @staticmethod
+    def reset():
+        with Tracer.__lock:
+            Tracer.__events = []
+
+    @staticmethod
+    def swap_events(events: List[dict]) -> List[dict]:
+        """Record into events from now on and return the events recorded so far, e.g. to keep a trace per experiment"""
+        with Tracer.__lock:
+            previous, Tracer.__events = Tracer.__events, list(events)
+            return previous
+
+    @staticmethod
+    def write_to_file(file_path: str, process_name: str = None):
+        events = Tracer.get_events()
+        if process_name:
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': process_name}})
+
+        with open(file_path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    @staticmethod
+    def read_events_from_file(file_path: str) -> List[dict]:
+        try:
+            with open(file_path, 'r') as trace_file:
+                return json.load(trace_file)['traceEvents']
+        except (OSError, ValueError, KeyError):
+            return []